@@ -531,7 +531,37 @@ app.post('/api/v1/marketplace/listings/:listingId/bids/:bidId/accept', (req, res
   });
 });
 
+// Optional mandi price series exported by chart_simulator/price_model.py (PRICE_SERIES=path),
+// loaded once and served from memory
+let priceSeries = null;
+if (process.env.PRICE_SERIES) {
+  priceSeries = JSON.parse(require('fs').readFileSync(process.env.PRICE_SERIES, 'utf8'));
+  priceSeries.commodityIndex = Object.fromEntries(priceSeries.commodities.map((name, i) => [name, i]));
+  priceSeries.marketIndex = Object.fromEntries(priceSeries.markets.map((name, i) => [name, i]));
+  // Clamp to the exported days, so a series whose startDate lies in the future still serves its first day
+  priceSeries.today = Math.max(0, Math.min(
+    Math.floor((Date.now() - Date.parse(priceSeries.startDate)) / 86400000),
+    priceSeries.prices[0][0].length - 1
+  ));
+}
+
 app.get('/api/v1/marketplace/prices', (req, res) => {
+  if (priceSeries) {
+    const { product, location } = req.query;
+    const markets = location in priceSeries.marketIndex ? [priceSeries.marketIndex[location]] : [0];
+    const commodities = product in priceSeries.commodityIndex
+      ? [priceSeries.commodityIndex[product]]
+      : priceSeries.commodities.map((_, i) => i);
+    const prices = [];
+    markets.forEach(m => commodities.forEach(c => prices.push({
+      product: priceSeries.commodities[c],
+      price: priceSeries.prices[c][m][priceSeries.today],
+      unit: priceSeries.unit,
+      location: priceSeries.markets[m]
+    })));
+    return res.json({ success: true, data: { prices } });
+  }
+
   res.json({
     success: true,
     data: {
@@ -544,6 +574,22 @@ app.get('/api/v1/marketplace/prices', (req, res) => {
 });
 
 app.get('/api/v1/marketplace/price-trends', (req, res) => {
+  if (priceSeries) {
+    const { product, location } = req.query;
+    const days = Math.max(1, parseInt(req.query.days, 10) || 30);
+    const c = priceSeries.commodityIndex[product] ?? 0;
+    const m = priceSeries.marketIndex[location] ?? 0;
+    const start = Date.parse(priceSeries.startDate);
+    const trends = [];
+    for (let day = Math.max(0, priceSeries.today - days + 1); day <= priceSeries.today; day++) {
+      trends.push({
+        date: new Date(start + day * 86400000).toISOString().slice(0, 10),
+        price: priceSeries.prices[c][m][day]
+      });
+    }
+    return res.json({ success: true, data: { trends } });
+  }
+
   res.json({
     success: true,
     data: {
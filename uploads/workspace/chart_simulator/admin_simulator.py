@@ -12,15 +12,29 @@ from datetime import datetime, timedelta
 import threading
 from typing import Dict, List, Any
 
+from world_model import PRODUCTS
+from order_lifecycle import VILLAGE_HUBS
+from windows import TimeWindow
+from alert_store import AlertStore
+from sim_log import CONSOLE
+
 class AdminChartSimulator:
-    def __init__(self, base_url: str = "http://localhost:3000/api/v1", user_id: str = "admin_001"):
+    # Seconds between events when running on its own
+    think_seconds = (2, 4)
+
+    def __init__(self, base_url: str = "http://localhost:3000/api/v1", user_id: str = "admin_001", token_pool=None, world=None,
+                 aggregator=None, alert_burst: int = 1, alert_page_size: int = 10, max_alerts: int = 10000,
+                 log=None):
         self.base_url = base_url
         self.user_id = user_id
+        self.log = (log if log is not None else CONSOLE).bind("admin", user_id)
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Authorization': f'Bearer fake_token_{user_id}'
         })
+        if token_pool is not None:
+            token_pool.attach(self.session, user_id)
         
         # Initial data state
         self.total_users = 15420
@@ -62,77 +76,96 @@ class AdminChartSimulator:
             {"name": "Pulses", "value": 350000},
         ]
         
-        self.system_alerts = [
-            {
-                "id": "1",
-                "type": "error",
-                "title": "Payment Gateway Issue",
-                "description": "Some transactions are failing due to gateway timeout",
-                "timestamp": datetime.now().isoformat(),
-                "resolved": False
-            },
-            {
-                "id": "2",
-                "type": "warning",
-                "title": "High Server Load",
-                "description": "API response times are above normal thresholds",
-                "timestamp": datetime.now().isoformat(),
-                "resolved": False
-            }
-        ]
+        # Monthly series roll over by calendar month; events land in the month they happened
+        self.user_growth_window = TimeWindow.monthly()
+        self.user_growth_window.seed(month["value"] for month in self.user_growth)
+        self.transaction_window = TimeWindow.monthly()
+        self.transaction_window.seed(month["value"] for month in self.transaction_volume)
+        
+        # Platform totals come from the shared world when one is given, and the
+        # time series from the aggregator's rollups of its events
+        self.world = world
+        self.aggregator = aggregator
+        if world is not None:
+            world.add_user(user_id, "admin")
+            self.sync_from_world()
+        
+        # Alerts are indexed so incident-sized volumes stay cheap to raise, resolve and page through;
+        # each alert event raises `alert_burst` alerts
+        self.alert_store = AlertStore(max_alerts=max_alerts)
+        self.alert_burst = alert_burst
+        self.alert_page_size = alert_page_size
+        self.alert_store.add("error", "Payment Gateway Issue", "Some transactions are failing due to gateway timeout")
+        self.alert_store.add("warning", "High Server Load", "API response times are above normal thresholds")
+        self.system_alerts = self.alert_store.page(1, alert_page_size)
         
         self.running = False
 
+    def sync_from_world(self):
+        """Derive platform totals and distributions from the shared world"""
+        world = self.world
+        self.total_users = world.user_count()
+        self.total_transactions = world.total_transactions
+        self.platform_revenue = world.platform_revenue
+        self.active_listings = world.active_listing_count()
+        
+        role_names = {
+            "Farmers": "farmer",
+            "Buyers": "buyer",
+            "Hub Operators": "hub_operator",
+            "SHG Leaders": "shg_leader",
+            "Aggregators": "aggregator"
+        }
+        for user_data in self.user_distribution:
+            user_data["value"] = world.user_count(role_names[user_data["name"]])
+        for revenue_data in self.revenue_by_category:
+            revenue_data["value"] = world.revenue_by_category.get(revenue_data["name"], 0)
+        
+        if self.aggregator is not None:
+            self.sync_from_aggregates()
+
+    def sync_from_aggregates(self):
+        """Build every chart series from the incremental aggregator"""
+        aggregator = self.aggregator
+        self.user_growth = aggregator.monthly_series(aggregator.new_users_by_month)
+        self.transaction_volume = aggregator.monthly_series(aggregator.by_month)
+        self.user_distribution = aggregator.user_distribution()
+        self.revenue_by_category = aggregator.category_revenue([c["name"] for c in self.revenue_by_category])
+
     def generate_new_user(self) -> Dict[str, Any]:
         """Generate a new user registration simulation"""
         roles = ["farmer", "buyer", "hub_operator", "shg_leader", "aggregator"]
-        villages = ["Khetri", "Rampur", "Bharatpur", "Alwar", "Jaipur", "Udaipur", "Jodhpur"]
+        village = self.world.random_village() if self.world is not None else random.choice(list(VILLAGE_HUBS))
         
         return {
             "user_id": f"user_{int(time.time())}",
             "role": random.choice(roles),
-            "village": random.choice(villages),
+            "village": village,
             "registration_date": datetime.now().isoformat()
         }
 
     def update_user_growth(self):
         """Update user growth data"""
-        for month_data in self.user_growth:
-            # Growth variation (-2% to +8%)
-            variation = random.uniform(-0.02, 0.08)
-            month_data["value"] = int(month_data["value"] * (1 + variation))
-        
-        # Add new month if we're at the end
-        if len(self.user_growth) >= 12:
-            self.user_growth.pop(0)
+        if self.aggregator is not None:
+            self.user_growth = self.aggregator.monthly_series(self.aggregator.new_users_by_month)
+            return
         
-        new_month = datetime.now().strftime("%b")
-        if not any(m["name"] == new_month for m in self.user_growth):
-            self.user_growth.append({
-                "name": new_month,
-                "value": random.randint(2000, 3000)
-            })
+        self.user_growth = self.user_growth_window.series(6)
 
     def update_transaction_volume(self):
         """Update transaction volume data"""
-        for month_data in self.transaction_volume:
-            # Volume variation (-5% to +12%)
-            variation = random.uniform(-0.05, 0.12)
-            month_data["value"] = int(month_data["value"] * (1 + variation))
+        if self.aggregator is not None:
+            self.transaction_volume = self.aggregator.monthly_series(self.aggregator.by_month)
+            return
         
-        # Add new month if we're at the end
-        if len(self.transaction_volume) >= 12:
-            self.transaction_volume.pop(0)
-        
-        new_month = datetime.now().strftime("%b")
-        if not any(m["name"] == new_month for m in self.transaction_volume):
-            self.transaction_volume.append({
-                "name": new_month,
-                "value": random.randint(600000, 800000)
-            })
+        self.transaction_volume = self.transaction_window.series(6)
 
     def update_user_distribution(self):
         """Update user distribution based on new registrations"""
+        if self.world is not None:
+            self.sync_from_world()
+            return
+        
         # Slight variations in user distribution
         for user_data in self.user_distribution:
             variation = random.uniform(-0.01, 0.02)
@@ -141,6 +174,10 @@ class AdminChartSimulator:
 
     def update_revenue_by_category(self):
         """Update revenue by category"""
+        if self.world is not None:
+            self.sync_from_world()
+            return
+        
         for revenue_data in self.revenue_by_category:
             # Revenue variation (-3% to +10%)
             variation = random.uniform(-0.03, 0.10)
@@ -149,7 +186,16 @@ class AdminChartSimulator:
     def simulate_new_user_registration(self):
         """Simulate a new user registration"""
         new_user = self.generate_new_user()
+        if self.world is not None:
+            # The world picks the id under its lock, so concurrent admins never register the same user twice
+            new_user["user_id"] = self.world.register_user(new_user["role"], new_user["village"])
+            self.sync_from_world()
+            self.log.info("new_user", "👤 New user registered: {role} from {village}", role=new_user['role'],
+                          village=self.world.user_village_name(new_user['user_id']))
+            return
+        
         self.total_users += 1
+        self.user_growth_window.add(time.time())
         
         # Update user distribution
         role = new_user["role"]
@@ -167,13 +213,26 @@ class AdminChartSimulator:
                 user_dist["value"] += 1
                 break
         
-        print(f"👤 New user registered: {role} from {new_user['village']}")
+        self.log.info("new_user", "👤 New user registered: {role} from {village}", role=role, village=new_user['village'])
 
     def simulate_new_transaction(self):
         """Simulate a new transaction"""
+        if self.world is not None:
+            listing = self.world.random_active_listing()
+            buyer = self.world.random_user("buyer")
+            if listing is None or buyer is None:
+                return
+            order = self.world.purchase(buyer, listing, quantity=random.randint(10, 200))
+            if order is not None:
+                self.sync_from_world()
+                self.log.info("new_transaction", "💳 New transaction: ₹{amount:,} in {category}", amount=order['amount'],
+                              category=order['category'])
+            return
+        
         transaction_amount = random.randint(1000, 50000)
         self.total_transactions += 1
         self.platform_revenue += int(transaction_amount * 0.05)  # 5% platform fee
+        self.transaction_window.add(time.time(), transaction_amount)
         
         # Update revenue by category
         categories = ["Cereals", "Vegetables", "Fruits", "Pulses"]
@@ -183,12 +242,22 @@ class AdminChartSimulator:
                 rev_data["value"] += transaction_amount
                 break
         
-        print(f"💳 New transaction: ₹{transaction_amount:,} in {category}")
+        self.log.info("new_transaction", "💳 New transaction: ₹{amount:,} in {category}", amount=transaction_amount,
+                      category=category)
 
     def simulate_new_listing(self):
         """Simulate a new listing being created"""
+        if self.world is not None:
+            farmer = self.world.random_user("farmer")
+            if farmer is None:
+                return
+            self.world.add_listing(farmer, random.choice(list(PRODUCTS)), random.randint(20, 500), random.randint(15, 120))
+            self.sync_from_world()
+            self.log.info("new_listing", "📝 New listing created! Total active: {active}", active=self.active_listings)
+            return
+        
         self.active_listings += 1
-        print(f"📝 New listing created! Total active: {self.active_listings}")
+        self.log.info("new_listing", "📝 New listing created! Total active: {active}", active=self.active_listings)
 
     def simulate_system_alert(self):
         """Simulate a new system alert"""
@@ -215,30 +284,25 @@ class AdminChartSimulator:
         alert_title = random.choice(alert_titles)
         alert_description = random.choice(alert_descriptions)
         
-        new_alert = {
-            "id": f"alert_{int(time.time())}",
-            "type": alert_type,
-            "title": alert_title,
-            "description": alert_description,
-            "timestamp": datetime.now().isoformat(),
-            "resolved": False
-        }
+        for _ in range(self.alert_burst):
+            self.alert_store.add(alert_type, alert_title, alert_description)
         
-        self.system_alerts.append(new_alert)
-        
-        # Keep only last 10 alerts
-        if len(self.system_alerts) > 10:
-            self.system_alerts.pop(0)
-        
-        print(f"🚨 New {alert_type} alert: {alert_title}")
+        if self.alert_burst > 1:
+            self.log.info("new_alert", "🚨 {count} new {alert_type} alerts: {title} ({open} open)", count=self.alert_burst,
+                          alert_type=alert_type, title=alert_title, open=self.alert_store.open_count)
+        else:
+            self.log.info("new_alert", "🚨 New {alert_type} alert: {title}", alert_type=alert_type, title=alert_title)
 
     def simulate_alert_resolution(self):
         """Simulate resolving an alert"""
-        unresolved_alerts = [alert for alert in self.system_alerts if not alert["resolved"]]
-        if unresolved_alerts and random.random() < 0.3:  # 30% chance
-            alert = random.choice(unresolved_alerts)
-            alert["resolved"] = True
-            print(f"✅ Alert resolved: {alert['title']}")
+        if random.random() < 0.3:  # 30% chance
+            for _ in range(self.alert_burst):
+                alert = self.alert_store.random_open()
+                if alert is None:
+                    break
+                self.alert_store.resolve(alert["id"])
+            else:
+                self.log.info("alert_resolved", "✅ Alert resolved: {title}", title=alert['title'])
 
     def send_analytics_update(self):
         """Send updated analytics data to the API"""
@@ -248,6 +312,9 @@ class AdminChartSimulator:
             self.update_transaction_volume()
             self.update_user_distribution()
             self.update_revenue_by_category()
+            self.alert_store.expire()
+            alert_feed = self.alert_store.feed(1, self.alert_page_size)
+            self.system_alerts = alert_feed.pop("alerts")
             
             payload = {
                 "success": True,
@@ -260,7 +327,8 @@ class AdminChartSimulator:
                     "transactionVolume": self.transaction_volume,
                     "userDistribution": self.user_distribution,
                     "revenueByCategory": self.revenue_by_category,
-                    "systemAlerts": self.system_alerts
+                    "systemAlerts": self.system_alerts,
+                    "alertFeed": alert_feed
                 },
                 "timestamp": datetime.now().isoformat()
             }
@@ -273,12 +341,29 @@ class AdminChartSimulator:
             )
             
             if response.status_code in [200, 201]:
-                print(f"✅ Analytics updated for admin {self.user_id}")
+                self.log.info("analytics_updated", "✅ Analytics updated for admin {user}", user=self.user_id)
             else:
-                print(f"⚠️ Analytics update failed: {response.status_code}")
+                self.log.warning("analytics_failed", "⚠️ Analytics update failed: {status}", status=response.status_code)
                 
         except requests.exceptions.RequestException as e:
-            print(f"❌ Network error: {e}")
+            self.log.error("network_error", "❌ Network error: {error}", error=e)
+
+    def run_event(self):
+        """Trigger one event from the admin dashboard mix"""
+        event_probability = random.random()
+
+        if event_probability < 0.25:  # 25% chance - new user
+            self.simulate_new_user_registration()
+        elif event_probability < 0.45:  # 20% chance - new transaction
+            self.simulate_new_transaction()
+        elif event_probability < 0.55:  # 10% chance - new listing
+            self.simulate_new_listing()
+        elif event_probability < 0.70:  # 15% chance - system alert
+            self.simulate_system_alert()
+        elif event_probability < 0.80:  # 10% chance - alert resolution
+            self.simulate_alert_resolution()
+        else:  # 20% chance - analytics update
+            self.send_analytics_update()
 
     def run_simulation(self, duration_minutes: int = 10):
         """Run the simulation for specified duration"""
@@ -293,29 +378,16 @@ class AdminChartSimulator:
         while self.running and time.time() < end_time:
             try:
                 # Randomly trigger different events
-                event_probability = random.random()
-                
-                if event_probability < 0.25:  # 25% chance - new user
-                    self.simulate_new_user_registration()
-                elif event_probability < 0.45:  # 20% chance - new transaction
-                    self.simulate_new_transaction()
-                elif event_probability < 0.55:  # 10% chance - new listing
-                    self.simulate_new_listing()
-                elif event_probability < 0.70:  # 15% chance - system alert
-                    self.simulate_system_alert()
-                elif event_probability < 0.80:  # 10% chance - alert resolution
-                    self.simulate_alert_resolution()
-                else:  # 20% chance - analytics update
-                    self.send_analytics_update()
+                self.run_event()
                 
                 # Wait 2-4 seconds before next event
-                time.sleep(random.uniform(2, 4))
+                time.sleep(random.uniform(*self.think_seconds))
                 
             except KeyboardInterrupt:
                 print("\n🛑 Simulation stopped by user")
                 break
             except Exception as e:
-                print(f"❌ Error in simulation: {e}")
+                self.log.error("simulation_error", "❌ Error in simulation: {error}", error=e)
                 time.sleep(1)
         
         print(f"✅ Admin simulation completed after {duration_minutes} minutes")
@@ -335,10 +407,15 @@ def main():
                        help='Admin user ID')
     parser.add_argument('--duration', type=int, default=10, 
                        help='Simulation duration in minutes')
+    parser.add_argument('--alert-burst', type=int, default=1,
+                       help='Alerts raised (and resolved) per alert event, to emulate incidents')
+    parser.add_argument('--alert-page-size', type=int, default=10,
+                       help='Alerts per page in the dashboard feed')
     
     args = parser.parse_args()
     
-    simulator = AdminChartSimulator(args.url, args.user_id)
+    simulator = AdminChartSimulator(args.url, args.user_id, alert_burst=args.alert_burst,
+                                    alert_page_size=args.alert_page_size)
     
     try:
         simulator.run_simulation(args.duration)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Incremental Aggregation Engine
+Maintains running sums, counts and distributions from world events so dashboards derive from real activity
+"""
+
+import math
+import threading
+import time
+from typing import Callable, Dict, List, Any, Optional
+
+from windows import TimeWindow
+
+# Share of order value a hub books as handling revenue
+HUB_HANDLING_FEE = 0.02
+
+ROLE_LABELS = {
+    "farmer": "Farmers",
+    "buyer": "Buyers",
+    "hub_operator": "Hub Operators",
+    "shg_leader": "SHG Leaders",
+    "aggregator": "Aggregators",
+}
+
+class RunningStats:
+    """Count, sum, mean/variance (Welford) and a log2 histogram, updated in O(1)"""
+
+    __slots__ = ("count", "total", "mean", "m2", "minimum", "maximum", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.histogram: Dict[int, int] = {}
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        bucket = int(math.log2(value)) if value >= 1 else 0
+        self.histogram[bucket] = self.histogram.get(bucket, 0) + 1
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": round(self.mean, 2),
+            "stddev": round(self.stddev, 2),
+            "min": self.minimum,
+            "max": self.maximum,
+            "histogram": {f"{2 ** b}-{2 ** (b + 1)}": n for b, n in sorted(self.histogram.items())},
+        }
+
+class IncrementalAggregator:
+    """Consumes world events and keeps per-category, per-hub, per-village and per-day rollups
+
+    Per-dimension rollups are dicts of RunningStats, so each event costs a
+    handful of dict lookups regardless of history size. Time series live in
+    fixed-size TimeWindow rings (30 days, 12 months) keyed by event timestamp,
+    so memory stays bounded on long soak runs.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time, days: int = 30, months: int = 12):
+        self.clock = clock
+        self.days = days
+        self.months = months
+        self.events_consumed = 0
+        self.users_by_role: Dict[str, int] = {}
+        self.total_users = 0
+        self.platform_revenue = 0
+        self.listings_created = 0
+
+        self.orders = RunningStats()
+        self.by_category: Dict[str, RunningStats] = {}
+        self.by_hub: Dict[str, RunningStats] = {}
+        self.by_village: Dict[str, RunningStats] = {}
+        self.new_users_by_village: Dict[str, int] = {}
+
+        self.by_day = TimeWindow.daily(days, clock)
+        self.by_hub_day: Dict[str, TimeWindow] = {}
+        self.by_month = TimeWindow.monthly(months, clock)
+        self.new_users_by_month = TimeWindow.monthly(months, clock)
+
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Rollups without the lock, for copy.deepcopy"""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _stats(self, rollup: Dict, key) -> RunningStats:
+        stats = rollup.get(key)
+        if stats is None:
+            stats = rollup[key] = RunningStats()
+        return stats
+
+    def consume(self, event: Dict[str, Any]):
+        """World listener: fold one event into every rollup"""
+        with self._lock:
+            self.events_consumed += 1
+            event_type = event["type"]
+            if event_type == "purchase":
+                self._consume_purchase(event)
+            elif event_type == "user_registered":
+                self._consume_user(event)
+            elif event_type == "listing_created":
+                self.listings_created += 1
+
+    def _consume_purchase(self, event: Dict[str, Any]):
+        amount = event["amount"]
+        ts = event["ts"]
+        hub_id = event["hub_id"]
+        self.platform_revenue += event.get("platform_fee", 0)
+        self.orders.add(amount)
+        self._stats(self.by_category, event["category"]).add(amount)
+        self._stats(self.by_hub, hub_id).add(amount)
+        self._stats(self.by_village, event["village"]).add(amount)
+        self.by_day.add(ts, amount)
+        self.by_month.add(ts, amount)
+        hub_days = self.by_hub_day.get(hub_id)
+        if hub_days is None:
+            hub_days = self.by_hub_day[hub_id] = TimeWindow.daily(self.days, self.clock)
+        hub_days.add(ts, amount)
+
+    def _consume_user(self, event: Dict[str, Any]):
+        role = event["role"]
+        self.total_users += 1
+        self.users_by_role[role] = self.users_by_role.get(role, 0) + 1
+        self.new_users_by_month.add(event["ts"])
+        village = event.get("village")
+        if village is not None:
+            self.new_users_by_village[village] = self.new_users_by_village.get(village, 0) + 1
+
+    # ---- payload views ----
+
+    def monthly_series(self, window: TimeWindow, count: int = 6, attribute: str = "sum") -> List[Dict[str, Any]]:
+        """Last `count` months as chart points, zero-filled"""
+        with self._lock:
+            return window.series(count, attribute)
+
+    def daily_series(self, hub_id: Optional[str] = None, days: int = 7, attribute: str = "sum",
+                     scale: float = 1.0) -> List[Dict[str, Any]]:
+        """Last `days` days (oldest first) as weekday-labelled chart points"""
+        with self._lock:
+            window = self.by_day if hub_id is None else self.by_hub_day.get(hub_id)
+            if window is None:
+                window = self.by_hub_day[hub_id] = TimeWindow.daily(self.days, self.clock)
+            return window.series(days, attribute, scale)
+
+    def category_revenue(self, categories: List[str]) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{"name": c, "value": int(self.by_category[c].total) if c in self.by_category else 0}
+                    for c in categories]
+
+    def user_distribution(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [{"name": label, "value": self.users_by_role.get(role, 0)}
+                    for role, label in ROLE_LABELS.items()]
+
+    def hub_revenue(self, hub_id: str) -> int:
+        with self._lock:
+            stats = self.by_hub.get(hub_id)
+            return int(stats.total * HUB_HANDLING_FEE) if stats is not None else 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Full rollup dump for reports"""
+        with self._lock:
+            return {
+                "eventsConsumed": self.events_consumed,
+                "totalUsers": self.total_users,
+                "usersByRole": dict(self.users_by_role),
+                "platformRevenue": self.platform_revenue,
+                "orders": self.orders.snapshot(),
+                "volumeLast7Days": int(self.by_day.total(7)),
+                "volumeLast30Days": int(self.by_day.total(30)),
+                "byCategory": {k: v.snapshot() for k, v in self.by_category.items()},
+                "byHub": {k: v.snapshot() for k, v in self.by_hub.items()},
+                "byVillage": {k: v.snapshot() for k, v in self.by_village.items()},
+            }
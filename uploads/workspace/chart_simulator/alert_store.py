@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+System Alert Store
+Indexed alert table with O(1) insert/resolve, severity+age priority and count/time retention
+"""
+
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Any, Optional
+
+# Lower rank sorts first in the feed
+SEVERITY_RANK = {"error": 0, "warning": 1, "info": 2}
+
+class AlertStore:
+    """Alerts indexed by ID, by unresolved severity and in arrival order
+
+    - `alerts` is in arrival order, so retention evicts from the front.
+    - `open_by_severity` holds one arrival-ordered dict per severity. The feed
+      therefore walks errors oldest-first, then warnings, then infos, with no
+      sort.
+    - `open_ids` plus `open_pos` form a swap-remove array for O(1) random
+      picks of an unresolved alert.
+    - `resolved` is in resolution order.
+    """
+
+    def __init__(self, max_alerts: int = 10000, max_age_seconds: float = 24 * 3600,
+                 clock: Callable[[], float] = time.time):
+        self.max_alerts = max_alerts
+        self.max_age_seconds = max_age_seconds
+        self.clock = clock
+        self.alerts: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.open_by_severity: Dict[str, "OrderedDict[str, Dict[str, Any]]"] = {
+            severity: OrderedDict() for severity in SEVERITY_RANK
+        }
+        self.resolved: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.open_ids: List[str] = []
+        self.open_pos: Dict[str, int] = {}
+        self.created_total = 0
+        self.resolved_total = 0
+        self.evicted_total = 0
+        self.next_id = 1
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Alerts and indexes without the lock, for copy.deepcopy"""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.alerts)
+
+    @property
+    def open_count(self) -> int:
+        return len(self.open_ids)
+
+    def add(self, alert_type: str, title: str, description: str, timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """Record a new unresolved alert; returns it"""
+        now = timestamp if timestamp is not None else self.clock()
+        with self._lock:
+            alert_id = f"alert_{self.next_id}"
+            self.next_id += 1
+            alert = {
+                "id": alert_id,
+                "type": alert_type,
+                "title": title,
+                "description": description,
+                "timestamp": datetime.fromtimestamp(now).isoformat(),
+                "created_at": now,
+                "resolved": False,
+            }
+            self.alerts[alert_id] = alert
+            self.open_by_severity[alert_type][alert_id] = alert
+            self.open_pos[alert_id] = len(self.open_ids)
+            self.open_ids.append(alert_id)
+            self.created_total += 1
+            self._expire(now)
+            return alert
+
+    def _close(self, alert_id: str, alert: Dict[str, Any]):
+        """Drop an alert from the unresolved indexes"""
+        del self.open_by_severity[alert["type"]][alert_id]
+        index = self.open_pos.pop(alert_id)
+        last = self.open_ids.pop()
+        if last != alert_id:
+            self.open_ids[index] = last
+            self.open_pos[last] = index
+
+    def resolve(self, alert_id: str) -> Optional[Dict[str, Any]]:
+        """Mark an alert resolved; returns it, or None if unknown or already resolved"""
+        with self._lock:
+            alert = self.alerts.get(alert_id)
+            if alert is None or alert["resolved"]:
+                return None
+            self._close(alert_id, alert)
+            alert["resolved"] = True
+            alert["resolved_at"] = self.clock()
+            self.resolved[alert_id] = alert
+            self.resolved_total += 1
+            return alert
+
+    def random_open(self, rng=random) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if not self.open_ids:
+                return None
+            return self.alerts[self.open_ids[rng.randrange(len(self.open_ids))]]
+
+    def _expire(self, now: float):
+        """Evict from the oldest end while over the count limit or past the age limit"""
+        cutoff = now - self.max_age_seconds
+        while self.alerts:
+            alert_id, alert = next(iter(self.alerts.items()))
+            if len(self.alerts) <= self.max_alerts and alert["created_at"] >= cutoff:
+                break
+            self.alerts.popitem(last=False)
+            if alert["resolved"]:
+                del self.resolved[alert_id]
+            else:
+                self._close(alert_id, alert)
+            self.evicted_total += 1
+
+    def expire(self):
+        """Apply time-based retention without adding an alert"""
+        with self._lock:
+            self._expire(self.clock())
+
+    def _by_priority(self) -> Iterator[Dict[str, Any]]:
+        for severity in SEVERITY_RANK:
+            yield from self.open_by_severity[severity].values()
+        yield from reversed(self.resolved.values())
+
+    def page(self, page: int = 1, page_size: int = 10) -> List[Dict[str, Any]]:
+        """One page of the feed: unresolved by severity then age, followed by recently resolved"""
+        start = (page - 1) * page_size
+        feed = []
+        with self._lock:
+            for index, alert in enumerate(self._by_priority()):
+                if index >= start + page_size:
+                    break
+                if index >= start:
+                    feed.append({k: v for k, v in alert.items() if k not in ("created_at", "resolved_at")})
+        return feed
+
+    def feed(self, page: int = 1, page_size: int = 10) -> Dict[str, Any]:
+        """Paginated feed with the counts a dashboard needs to render pagers and badges"""
+        alerts = self.page(page, page_size)
+        with self._lock:
+            total = len(self.alerts)
+            return {
+                "page": page,
+                "pageSize": page_size,
+                "totalAlerts": total,
+                "totalPages": max(1, -(-total // page_size)),
+                "openAlerts": len(self.open_ids),
+                "openBySeverity": {s: len(bucket) for s, bucket in self.open_by_severity.items()},
+                "alerts": alerts,
+            }
+
+def main():
+    """Quick capacity check: incident-sized alert churn"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='System Alert Store capacity check')
+    parser.add_argument('--alerts', type=int, default=500_000,
+                       help='Alerts to raise')
+    parser.add_argument('--max-alerts', type=int, default=50_000,
+                       help='Retention limit')
+    parser.add_argument('--resolve-ratio', type=float, default=0.6,
+                       help='Resolutions per raised alert')
+
+    args = parser.parse_args()
+
+    store = AlertStore(max_alerts=args.max_alerts)
+    severities = list(SEVERITY_RANK)
+    started = time.perf_counter()
+    for i in range(args.alerts):
+        store.add(random.choice(severities), "Load test alert", f"Alert {i}")
+        if random.random() < args.resolve_ratio:
+            alert = store.random_open()
+            if alert is not None:
+                store.resolve(alert["id"])
+    elapsed = time.perf_counter() - started
+    print(f"🚨 Raised {args.alerts:,} alerts in {elapsed:.2f}s ({args.alerts / elapsed:,.0f}/s)")
+
+    started = time.perf_counter()
+    feed = store.feed(page=1, page_size=25)
+    print(f"📄 First feed page in {(time.perf_counter() - started) * 1000:.2f}ms")
+    print(f"📊 Stored: {len(store):,}, open: {feed['openAlerts']:,}, evicted: {store.evicted_total:,}, "
+          f"by severity: {feed['openBySeverity']}")
+
+if __name__ == "__main__":
+    main()
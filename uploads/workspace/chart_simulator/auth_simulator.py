@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+OTP Authentication Load Simulator
+Runs the full OTP login flow for many users with a configurable login-storm ramp
+"""
+
+import requests
+import json
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+from load_stats import LatencyRecorder, summarize
+
+# Predefined test users in the mock backend (see project_analysis.md)
+KNOWN_TEST_MOBILES = ["9876543210", "9876543211", "9999999999", "8888888888", "7777777777", "6666666666"]
+DEFAULT_OTP = "123456"
+
+def parse_retry_after(response: requests.Response, default: float = 1.0) -> float:
+    """Seconds to wait before retrying a rate-limited request"""
+    # express-rate-limit sends Retry-After, newer versions also RateLimit-Reset
+    for header in ("Retry-After", "RateLimit-Reset", "X-RateLimit-Reset"):
+        value = response.headers.get(header)
+        if not value:
+            continue
+        try:
+            seconds = float(value)
+        except ValueError:
+            continue
+        # X-RateLimit-Reset may be an epoch timestamp
+        if seconds > 10 ** 9:
+            seconds = seconds - time.time()
+        return max(0.0, seconds)
+    return default
+
+def extract_token(response: requests.Response) -> Optional[str]:
+    """Pull the auth token out of a login/verify response body"""
+    try:
+        body = response.json()
+    except ValueError:
+        return None
+    data = body.get("data") or {}
+    return data.get("token") or body.get("token")
+
+class AuthLoadSimulator:
+    def __init__(self, base_url: str = "http://localhost:3000/api/v1", users: int = 500,
+                 start_rate: float = 1.0, peak_rate: float = 50.0, ramp_seconds: float = 60.0,
+                 concurrency: int = 100, new_user_ratio: float = 0.2, resend_ratio: float = 0.1,
+                 max_rate_limit_retries: int = 3, max_retry_wait: float = 30.0, otp: str = DEFAULT_OTP):
+        self.base_url = base_url
+        self.users = users
+        self.start_rate = max(0.01, start_rate)
+        self.peak_rate = max(self.start_rate, peak_rate)
+        self.ramp_seconds = max(0.0, ramp_seconds)
+        self.concurrency = concurrency
+        self.new_user_ratio = new_user_ratio
+        self.resend_ratio = resend_ratio
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.max_retry_wait = max_retry_wait
+        self.otp = otp
+
+        self.recorder = LatencyRecorder()
+        self.time_to_authenticated: List[float] = []
+        self.results: Dict[str, int] = {"authenticated": 0, "rate_limited": 0, "failed": 0}
+        self.rate_limited_responses = 0
+        self.authenticated_after_429 = 0
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.running = False
+
+    def get_session(self) -> requests.Session:
+        """One session per worker thread (requests.Session is not thread-safe)"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({'Content-Type': 'application/json'})
+            self._local.session = session
+        return session
+
+    def generate_identities(self) -> List[Dict[str, Any]]:
+        """Mix of registered test users and first-time mobile numbers"""
+        identities = []
+        for i in range(self.users):
+            if random.random() < self.new_user_ratio:
+                mobile = f"9{random.randint(100000000, 999999999)}"
+                identities.append({"mobile_number": mobile, "is_new": True})
+            else:
+                mobile = KNOWN_TEST_MOBILES[i % len(KNOWN_TEST_MOBILES)]
+                identities.append({"mobile_number": mobile, "is_new": False})
+        return identities
+
+    def login_storm_schedule(self) -> List[float]:
+        """Launch offsets (seconds) for each user following a linear ramp"""
+        offsets = []
+        t = 0.0
+        for _ in range(self.users):
+            offsets.append(t)
+            if self.ramp_seconds > 0 and t < self.ramp_seconds:
+                rate = self.start_rate + (self.peak_rate - self.start_rate) * (t / self.ramp_seconds)
+            else:
+                rate = self.peak_rate
+            t += 1.0 / rate
+        return offsets
+
+    def post_step(self, step: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST one auth step, backing off on 429 as the rate limiter asks"""
+        session = self.get_session()
+        saw_rate_limit = False
+
+        for attempt in range(self.max_rate_limit_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = session.post(f"{self.base_url}/auth/{step}", json=payload, timeout=10)
+            except requests.exceptions.RequestException:
+                self.recorder.count_outcome(step, "network_error")
+                return {"outcome": "failed", "response": None, "rate_limited": saw_rate_limit}
+            latency = time.perf_counter() - started
+
+            if response.status_code == 429:
+                saw_rate_limit = True
+                self.recorder.record(step, latency, "rate_limited")
+                with self._lock:
+                    self.rate_limited_responses += 1
+                if attempt == self.max_rate_limit_retries:
+                    return {"outcome": "rate_limited", "response": response, "rate_limited": True}
+                time.sleep(min(parse_retry_after(response), self.max_retry_wait))
+                continue
+
+            if response.status_code in [200, 201]:
+                self.recorder.record(step, latency, "ok")
+                return {"outcome": "ok", "response": response, "rate_limited": saw_rate_limit}
+
+            self.recorder.record(step, latency, f"http_{response.status_code}")
+            return {"outcome": "failed", "response": response, "rate_limited": saw_rate_limit}
+
+        return {"outcome": "rate_limited", "response": None, "rate_limited": True}
+
+    def authenticate(self, identity: Dict[str, Any]) -> str:
+        """Run the OTP flow for one user and classify the result"""
+        mobile = identity["mobile_number"]
+        started = time.perf_counter()
+        saw_rate_limit = False
+
+        steps = [("login", {"mobile_number": mobile})]
+        if random.random() < self.resend_ratio:
+            steps.append(("resend-otp", {"mobile_number": mobile}))
+        # First-time numbers complete sign-up via verify-otp, registered ones log in
+        verify_step = "verify-otp" if identity["is_new"] else "login-otp"
+        steps.append((verify_step, {"mobile_number": mobile, "otp": self.otp}))
+
+        result = None
+        for step, payload in steps:
+            result = self.post_step(step, payload)
+            saw_rate_limit = saw_rate_limit or result["rate_limited"]
+            if result["outcome"] != "ok":
+                return self.finish(result["outcome"])
+
+        if not extract_token(result["response"]):
+            return self.finish("failed")
+
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.time_to_authenticated.append(elapsed)
+            if saw_rate_limit:
+                self.authenticated_after_429 += 1
+        return self.finish("authenticated")
+
+    def finish(self, outcome: str) -> str:
+        """Count the final classification for one user"""
+        with self._lock:
+            self.results[outcome] += 1
+        return outcome
+
+    def run_storm(self) -> Dict[str, Any]:
+        """Launch all users according to the ramp and wait for them to finish"""
+        identities = self.generate_identities()
+        offsets = self.login_storm_schedule()
+
+        print(f"🚀 Starting OTP login storm: {self.users} users")
+        print(f"📈 Ramp: {self.start_rate:.1f} → {self.peak_rate:.1f} logins/s over {self.ramp_seconds:.0f}s")
+        print(f"🌐 API Base URL: {self.base_url}")
+
+        self.running = True
+        run_started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for identity, offset in zip(identities, offsets):
+                if not self.running:
+                    break
+                delay = offset - (time.perf_counter() - run_started)
+                if delay > 0:
+                    time.sleep(delay)
+                executor.submit(self.authenticate, identity)
+
+        report = self.build_report(time.perf_counter() - run_started)
+        self.print_report(report)
+        return report
+
+    def build_report(self, wall_seconds: float) -> Dict[str, Any]:
+        """Assemble the storm results"""
+        with self._lock:
+            time_to_auth = list(self.time_to_authenticated)
+            results = dict(self.results)
+        return {
+            "users": self.users,
+            "wallSeconds": round(wall_seconds, 2),
+            "results": results,
+            "rateLimitedResponses": self.rate_limited_responses,
+            "authenticatedAfter429": self.authenticated_after_429,
+            "timeToAuthenticated": summarize(time_to_auth),
+            "steps": self.recorder.report(),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def print_report(self, report: Dict[str, Any]):
+        """Print a readable summary of the storm"""
+        results = report["results"]
+        print("=" * 60)
+        print(f"✅ Authenticated: {results['authenticated']}")
+        print(f"⏳ Gave up on rate limit (429): {results['rate_limited']}")
+        print(f"❌ Failed: {results['failed']}")
+        print(f"🚦 429 responses seen: {report['rateLimitedResponses']} "
+              f"({report['authenticatedAfter429']} users authenticated after backing off)")
+
+        tta = report["timeToAuthenticated"]
+        if tta["count"]:
+            print(f"⏱️ Time to authenticated: p50 {tta['p50_ms']}ms, p90 {tta['p90_ms']}ms, "
+                  f"p99 {tta['p99_ms']}ms, max {tta['max_ms']}ms")
+
+        for step, stats in report["steps"].items():
+            latency = stats["latency"]
+            p95 = latency.get("p95_ms", "-")
+            print(f"   /auth/{step}: {stats['outcomes']} p95 {p95}ms")
+
+    def stop(self):
+        """Stop launching new users"""
+        self.running = False
+
+def main():
+    """Main function to run the OTP login storm"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='OTP Authentication Load Simulator')
+    parser.add_argument('--url', default='http://localhost:3000/api/v1',
+                       help='API base URL')
+    parser.add_argument('--users', type=int, default=500,
+                       help='Number of users to authenticate')
+    parser.add_argument('--start-rate', type=float, default=1.0,
+                       help='Logins per second at the start of the ramp')
+    parser.add_argument('--peak-rate', type=float, default=50.0,
+                       help='Logins per second at the end of the ramp')
+    parser.add_argument('--ramp', type=float, default=60.0,
+                       help='Ramp duration in seconds')
+    parser.add_argument('--concurrency', type=int, default=100,
+                       help='Maximum concurrent logins in flight')
+    parser.add_argument('--new-user-ratio', type=float, default=0.2,
+                       help='Fraction of first-time mobile numbers')
+    parser.add_argument('--resend-ratio', type=float, default=0.1,
+                       help='Fraction of users that request an OTP resend')
+    parser.add_argument('--max-429-retries', type=int, default=3,
+                       help='Retries per step after a 429 before giving up')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+
+    args = parser.parse_args()
+
+    simulator = AuthLoadSimulator(
+        args.url, users=args.users, start_rate=args.start_rate, peak_rate=args.peak_rate,
+        ramp_seconds=args.ramp, concurrency=args.concurrency, new_user_ratio=args.new_user_ratio,
+        resend_ratio=args.resend_ratio, max_rate_limit_retries=args.max_429_retries
+    )
+
+    try:
+        report = simulator.run_storm()
+    except KeyboardInterrupt:
+        print("\n🛑 Login storm interrupted")
+        simulator.stop()
+        return
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Simulator Benchmark Suite
+Generator-only events/sec and memory use for every simulate_*, update_* and analytics payload method, with networking disabled
+"""
+
+import copy
+import gc
+import json
+import math
+import random
+import re
+import signal
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Any, Optional, Tuple
+
+import requests
+from requests.adapters import BaseAdapter
+
+from sim_log import NullLog
+from results_store import ResultsStore, benchmark_result
+
+# Methods benchmarked on each simulator
+BENCHMARKED_METHOD = re.compile(r"^(simulate_\w+|update_\w+|send_analytics_update)$")
+# Events where fewer calls than this do any work are flagged: their rate is mostly an early return
+MIN_EFFECTIVE = 0.5
+# Two-sided 95% Student t quantiles by degrees of freedom (normal beyond 30)
+T_95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262, 10: 2.228,
+        12: 2.179, 15: 2.131, 20: 2.086, 25: 2.060, 30: 2.042}
+
+def t_quantile(df: int) -> float:
+    for bound in sorted(T_95):
+        if df <= bound:
+            return T_95[bound]
+    return 1.96
+
+class OfflineAdapter(BaseAdapter):
+    """Answers every request with an empty 200 without touching a socket
+
+    Requests are still prepared, so JSON payloads are encoded and headers
+    merged exactly as they would be for a real backend. Only the network is
+    left out. `sent` counts requests, for telling work from early returns.
+    """
+
+    sent = 0
+
+    def send(self, request, **kwargs):
+        OfflineAdapter.sent += 1
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"success":true}'
+        response.headers["Content-Type"] = "application/json"
+        response.encoding = "utf-8"
+        response.request = request
+        response.url = request.url
+        return response
+
+    def close(self):
+        pass
+
+def go_offline(simulator: Any):
+    adapter = OfflineAdapter()
+    simulator.session.mount("http://", adapter)
+    simulator.session.mount("https://", adapter)
+
+class CountingLog(NullLog):
+    """Drops every message but counts them, for telling work from early returns"""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def log(self, level: int, role: str, user_id: str, event_type: str, template: str, fields: Dict[str, Any]):
+        self.count += 1
+
+def kind_of(method: str) -> str:
+    if method == "send_analytics_update":
+        return "payload"
+    return "chart_drift" if method.startswith("update_") else "event"
+
+def summarize_rates(rates: List[float]) -> Dict[str, float]:
+    """Median, mean, sample stdev and a 95% confidence interval of the mean for per-repetition rates"""
+    mean = statistics.fmean(rates)
+    stdev = statistics.stdev(rates) if len(rates) > 1 else 0.0
+    half_width = t_quantile(len(rates) - 1) * stdev / math.sqrt(len(rates)) if len(rates) > 1 else 0.0
+    return {
+        "median": round(statistics.median(rates), 1),
+        "mean": round(mean, 1),
+        "stdev": round(stdev, 1),
+        "ci95Low": round(mean - half_width, 1),
+        "ci95High": round(mean + half_width, 1),
+        "min": round(min(rates), 1),
+        "max": round(max(rates), 1),
+        "cv": round(stdev / mean, 4) if mean else 0.0,
+    }
+
+class Benchmark:
+    """Times simulator methods in-process against an offline session
+
+    Every case gets a warmup (its length in calls is recorded as
+    `warmupCalls`), then `repetitions` timed runs of a batch sized during
+    warmup so that one run takes about `run_seconds`. Before each run, every
+    simulator and everything they share (world, orders, rollups, queues,
+    loans) is restored from a snapshot taken after setup, and the RNG is
+    reseeded, so each run starts from the same state with the same random
+    stream. Two extra untimed batches follow the timed runs:
+    - a traced one, so tracemalloc does not slow the timed runs. It records
+      the peak KiB above the starting level over the whole batch, and the
+      net memory blocks left behind per call (state growth or leaks). These
+      are not allocation counts;
+    - for simulate_* events, one that counts the calls which logged or sent
+      a request. The rest returned early, e.g. on a probability gate or with
+      nothing to act on. Cases where fewer than MIN_EFFECTIVE of the calls
+      did work are flagged, since their rate mostly times the early return.
+    Setup seeds what the gated events act on: listings for the farmer,
+    purchases (so in-flight orders) for the buyer, open alerts for the admin
+    and orders at every stage for the hub. Without it they would time
+    nothing but their early return. Hubs run on the order lifecycle engine
+    rather than the queue model, whose events only read counts that its own
+    clock moves.
+    Within a run, state is also put back outside the timed part:
+    - simulate_* events get the full snapshot every 1024 calls, or every
+      eighth of the batch for fast events, so restoring stays cheap. Purchases
+      and transactions use up the seeded listings within a few thousand
+      calls, after which an event would only time its early return;
+    - update_* drift gets its chart series (the simulator's list attributes)
+      back every 256 calls. Back-to-back drift steps compound a few percent
+      each, and would otherwise leave the values, and the cost of the
+      arithmetic, far outside anything a real run reaches.
+    """
+
+    def __init__(self, seed: int = 42, repetitions: int = 10, warmup_seconds: float = 0.2,
+                 run_seconds: float = 0.2, world_users: int = 1000, villages: int = 2000):
+        from main_simulator import ChartSimulatorOrchestrator, SIMULATOR_ROLES
+
+        self.seed = seed
+        self.repetitions = repetitions
+        self.warmup_seconds = warmup_seconds
+        self.run_seconds = run_seconds
+        random.seed(seed)
+        # One world shared by all roles, like a real run, with a geography so nearby search has work to do
+        self.log = CountingLog()
+        orchestrator = ChartSimulatorOrchestrator("http://offline.invalid/api/v1", world_users=world_users,
+                                                  history_days=30, queue_hubs=0, villages=villages, hubs=50,
+                                                  log=self.log)
+        # The orchestrator's shutdown handlers only stop its own threads, so Ctrl+C would never stop the benchmark
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        self.simulators = dict(zip(SIMULATOR_ROLES.values(), orchestrator.simulators))
+        for simulator in self.simulators.values():
+            go_offline(simulator)
+        self._seed()
+        self.state = copy.deepcopy(self._state())
+        self.config = {"seed": seed, "repetitions": repetitions, "warmupSeconds": warmup_seconds,
+                       "runSeconds": run_seconds, "worldUsers": world_users, "villages": villages}
+
+    def _seed(self, count: int = 50):
+        """Give the gated events something to act on, before the snapshot every run starts from"""
+        farmer, buyer, admin, hub = (self.simulators[role] for role in ("farmer", "buyer", "admin", "hub_operator"))
+        for _ in range(count):
+            farmer.simulate_new_listing()
+        for _ in range(count):
+            buyer.simulate_new_purchase()
+            admin.simulate_system_alert()
+        # Listings from farmers in the hub's villages, bought into orders and moved along its stages
+        world = hub.world
+        local = [user for user in {world.random_user("farmer") for _ in range(count * 100)}
+                 if world.hub_for_village(world.user_village_name(user)) == hub.user_id]
+        for _ in range(count * 4 if local else 0):
+            listing = farmer.generate_new_listing()
+            world.add_listing(random.choice(local), listing["product_name"], listing["quantity"], listing["asking_price"])
+        for step, calls in ((hub.simulate_new_order_arrival, 3), (hub.simulate_order_pickup, 3),
+                            (hub.simulate_quality_check, 2)):
+            for _ in range(count * calls):
+                step()
+
+    def cases(self, roles: Optional[List[str]] = None, pattern: Optional[str] = None) -> List[tuple]:
+        selected = []
+        for role, simulator in self.simulators.items():
+            if roles and role not in roles:
+                continue
+            for name in sorted(dir(simulator)):
+                if BENCHMARKED_METHOD.match(name) and (pattern is None or re.search(pattern, name)):
+                    selected.append((role, name, getattr(simulator, name)))
+        return selected
+
+    def _timed(self, method, calls: int, restore: Callable[[], None], chunk: Callable[[int], int]) -> float:
+        """Seconds spent in `calls` calls, calling `restore` (untimed) every `chunk(calls)` calls after the first"""
+        elapsed = 0.0
+        step = chunk(calls)
+        first = True
+        while calls > 0:
+            if not first:
+                restore()
+            first = False
+            count = min(step, calls)
+            started = time.perf_counter()
+            for _ in range(count):
+                method()
+            elapsed += time.perf_counter() - started
+            calls -= count
+        return elapsed
+
+    def _batch_size(self, method, restore: Callable[[], None], chunk: Callable[[int], int]) -> Tuple[int, int]:
+        """Calls per timed run, found by doubling during warmup until a batch takes `run_seconds`
+
+        Returns the batch and the number of warmup calls made before it was
+        settled, which the result records as the warmup boundary.
+        """
+        batch, calls = 1, 0
+        warm_until = time.perf_counter() + self.warmup_seconds
+        while True:
+            restore()
+            elapsed = self._timed(method, batch, restore, chunk)
+            calls += batch
+            if elapsed >= self.run_seconds or batch >= 1 << 20:
+                if time.perf_counter() >= warm_until:
+                    return batch, calls
+            else:
+                batch *= 2
+
+    def _state(self) -> Dict[str, Dict[str, Any]]:
+        # One dict, so a deepcopy keeps the world, orders and rollups shared between roles
+        return {role: {name: value for name, value in vars(simulator).items() if name not in ("session", "log")}
+                for role, simulator in self.simulators.items()}
+
+    def _restore_state(self):
+        """Put every simulator back to the snapshot taken after setup"""
+        for role, attributes in copy.deepcopy(self.state).items():
+            for name, value in attributes.items():
+                setattr(self.simulators[role], name, value)
+
+    def _charts(self, role: str) -> Dict[str, list]:
+        simulator = self.simulators[role]
+        return {name: copy.deepcopy(value) for name, value in vars(simulator).items() if isinstance(value, list)}
+
+    def _restore(self, role: str, charts: Dict[str, list]):
+        for name, value in charts.items():
+            setattr(self.simulators[role], name, copy.deepcopy(value))
+
+    def run_case(self, role: str, name: str, method) -> Dict[str, Any]:
+        self._restore_state()
+        charts = self._charts(role)
+        random.seed(self.seed)
+        if kind_of(name) == "chart_drift":
+            # Drift compounds a few percent per call, so it runs from fresh series every few hundred calls
+            restore, chunk = lambda: self._restore(role, charts), lambda calls: 256
+        elif kind_of(name) == "event":
+            # Events use up listings, so the whole world comes back well before they run out
+            restore, chunk = self._restore_state, lambda calls: max(1024, calls // 8)
+        else:
+            restore, chunk = self._restore_state, lambda calls: calls
+        batch, warmup_calls = self._batch_size(method, restore, chunk)
+        rates = []
+        gc.collect()
+        for repetition in range(self.repetitions):
+            self._restore_state()
+            random.seed(self.seed + repetition)
+            rates.append(batch / self._timed(method, batch, restore, chunk))
+
+        self._restore_state()
+        random.seed(self.seed)
+        gc.collect()
+        blocks = sys.getallocatedblocks()
+        tracemalloc.start()
+        base, _ = tracemalloc.get_traced_memory()
+        for _ in range(min(batch, chunk(batch))):
+            method()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        gc.collect()
+        retained = sys.getallocatedblocks() - blocks
+        effective = self._effective(method, min(batch, chunk(batch))) if kind_of(name) == "event" else 1.0
+        self._restore_state()
+
+        rate = summarize_rates(rates)
+        return {
+            "role": role,
+            "method": name,
+            "kind": kind_of(name),
+            "batch": batch,
+            "warmupCalls": warmup_calls,
+            "eventsPerSecond": rate,
+            "samples": [round(value, 1) for value in rates],
+            "usPerEvent": round(1e6 / rate["median"], 3),
+            "tracedCalls": min(batch, chunk(batch)),
+            "peakKiBPerBatch": round((peak - base) / 1024, 1),
+            "netBlocksPerEvent": round(retained / min(batch, chunk(batch)), 3),
+            "effectiveFraction": round(effective, 3),
+            "mostlyEarlyReturns": effective < MIN_EFFECTIVE,
+        }
+
+    def _effective(self, method, calls: int) -> float:
+        """Fraction of `calls` calls, from a restored state, that logged or sent a request"""
+        self._restore_state()
+        random.seed(self.seed)
+        effective = 0
+        for _ in range(calls):
+            before = self.log.count + OfflineAdapter.sent
+            method()
+            effective += self.log.count + OfflineAdapter.sent > before
+        return effective / calls
+
+    def run(self, roles: Optional[List[str]] = None, pattern: Optional[str] = None, progress=print) -> Dict[str, Any]:
+        results = []
+        for role, name, method in self.cases(roles, pattern):
+            result = self.run_case(role, name, method)
+            results.append(result)
+            if progress is not None:
+                rate = result["eventsPerSecond"]
+                flag = f"  ⚠️ {result['effectiveFraction']:.0%} of calls did work" if result["mostlyEarlyReturns"] else ""
+                progress(f"   {role:<13} {name:<34} {rate['median']:>12,.0f}/s ±{rate['cv'] * 100:4.1f}%  "
+                         f"{result['peakKiBPerBatch']:8.1f} KiB batch peak  "
+                         f"{result['netBlocksPerEvent']:7.2f} blocks/call{flag}")
+        return {"suite": "generator", "config": self.config, "results": results}
+
+def main():
+    """Run the generator benchmark suite and write JSON results"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Simulator Benchmark Suite (no network)')
+    parser.add_argument('--output', default=None,
+                       help='JSON results file to write, e.g. benchmark_results.json')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Random seed')
+    parser.add_argument('--repeat', type=int, default=10,
+                       help='Timed repetitions per case')
+    parser.add_argument('--warmup', type=float, default=0.2,
+                       help='Warmup seconds per case')
+    parser.add_argument('--run-seconds', type=float, default=0.2,
+                       help='Target seconds per timed repetition')
+    parser.add_argument('--role', action='append', default=None,
+                       help='Only this role (repeatable): buyer, farmer, admin, hub_operator, shg_leader')
+    parser.add_argument('--filter', default=None,
+                       help='Only methods matching this regular expression')
+    parser.add_argument('--world-users', type=int, default=1000,
+                       help='Users seeded into the shared world')
+    parser.add_argument('--results', default=None,
+                       help='Results directory to save this run in, e.g. results')
+    parser.add_argument('--name', default='',
+                       help='Label for the saved result')
+
+    args = parser.parse_args()
+
+    print("🏁 Building world (networking disabled)")
+    benchmark = Benchmark(args.seed, args.repeat, args.warmup, args.run_seconds, args.world_users)
+    started = time.perf_counter()
+    report = benchmark.run(args.role, args.filter)
+    print(f"📝 {len(report['results'])} cases in {time.perf_counter() - started:.0f}s")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Results in {args.output}")
+    flagged = [f"{result['role']}.{result['method']}" for result in report["results"] if result["mostlyEarlyReturns"]]
+    if flagged:
+        print(f"⚠️ Mostly early returns, so their rate is not an event rate: {', '.join(flagged)}")
+    if args.results:
+        path = ResultsStore(args.results).save(benchmark_result(report, args.name))
+        print(f"🗄️ Saved {path} (compare with: python results_store.py compare {path})")
+
+if __name__ == "__main__":
+    main()
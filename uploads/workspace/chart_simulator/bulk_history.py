@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Bulk Historical Dataset Generator
+Streams years of users, villages, listings, bids, orders and payments as COPY/CSV files for seeding PostgreSQL
+"""
+
+import csv
+import math
+import os
+import time
+from multiprocessing import Pool
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from geography import Geography, STATE, max_hubs
+from price_model import PriceModel, COMMODITY_PRICES
+from windows import UTC_OFFSET
+from world_model import ROLE_WEIGHTS
+
+MASK = (1 << 64) - 1
+FIRST_NAMES = ["Rajesh", "Sunita", "Amit", "Priya", "Vikram", "Meena", "Suresh", "Kavita", "Ramesh", "Anita",
+               "Mahesh", "Geeta", "Dinesh", "Pooja", "Mukesh", "Rekha", "Sanjay", "Lakshmi", "Ajay", "Savita"]
+LAST_NAMES = ["Kumar", "Devi", "Singh", "Sharma", "Patel", "Meena", "Choudhary", "Yadav", "Gupta", "Jat"]
+QUALITY_GRADES = ("A", "A", "B", "B", "B", "C")
+PAYMENT_METHODS = ("upi",) * 7 + ("bank_transfer",) * 2 + ("cash",)
+ADMINS = 5
+# Order statuses as in the design's Order entity, indexed by HistorySpec.order()
+ORDER_STATUSES = ("pending", "confirmed", "picked_up", "picked_up", "delivered", "completed", "cancelled")
+
+# Tables in foreign-key order with the columns written for each. villages.hub_id and
+# orders.payment_id close reference cycles, so they are filled by UPDATEs in load.sql.
+TABLES = {
+    "products": ("product_id", "sku_code", "name", "category", "unit", "is_active", "created_at"),
+    "villages": ("village_id", "name", "state", "district", "block", "pincode", "coordinates", "is_active",
+                 "created_at"),
+    "users": ("user_id", "mobile_number", "name", "role", "language_preference", "kyc_status", "village_id",
+              "created_at", "updated_at", "is_active"),
+    "hubs": ("hub_id", "name", "village_id", "operator_id", "location", "capacity_tonnes", "status", "created_at"),
+    "village_hubs": ("village_id", "hub_id"),
+    "farms": ("farm_id", "farmer_id", "village_id", "acreage", "location", "created_at"),
+    "listings": ("listing_id", "farmer_id", "product_id", "farm_id", "quantity", "quality_grade", "asking_price",
+                 "harvest_date", "expiry_date", "status", "hub_id", "created_at"),
+    "bids": ("bid_id", "listing_id", "buyer_id", "bid_price", "quantity", "status", "created_at"),
+    "orders": ("order_id", "buyer_id", "listing_id", "farmer_id", "quantity", "agreed_price", "status",
+               "pickup_date", "hub_id", "created_at", "updated_at"),
+    "payments": ("payment_id", "order_id", "payer_id", "payee_id", "amount", "payment_method", "status",
+                 "initiated_at", "completed_at"),
+}
+TABLE_TAG = {table: i + 1 for i, table in enumerate(TABLES)}
+TABLE_TAG["village_hubs"] = TABLE_TAG["villages"]
+
+SM_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+SM_MUL1 = np.uint64(0xBF58476D1CE4E5B9)
+SM_MUL2 = np.uint64(0x94D049BB133111EB)
+BATCH_ROWS = 20_000
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer over a uint64 array (multiplication wraps mod 2**64)"""
+    x = x + SM_GAMMA
+    x = (x ^ (x >> np.uint64(30))) * SM_MUL1
+    x = (x ^ (x >> np.uint64(27))) * SM_MUL2
+    return x ^ (x >> np.uint64(31))
+
+def row_ids(table: str, rows: np.ndarray) -> List[str]:
+    """Deterministic UUID-shaped primary keys, so children can reference parents by index"""
+    prefix = f"{TABLE_TAG[table]:08x}-0000-4000-8000-"
+    return [prefix + format(row, "012x") for row in rows.tolist()]
+
+def timestamps(ts: np.ndarray) -> List[str]:
+    return [t + "+00:00" for t in np.datetime_as_string(ts.astype("datetime64[s]"), unit="s").tolist()]
+
+def dates(ts: np.ndarray) -> List[str]:
+    return np.datetime_as_string(ts.astype("datetime64[s]"), unit="D").tolist()
+
+def points(lat: np.ndarray, lon: np.ndarray) -> List[str]:
+    return [f"SRID=4326;POINT({x:.6f} {y:.6f})" for x, y in zip(lon.tolist(), lat.tolist())]
+
+def prices(values: np.ndarray) -> List[str]:
+    return [f"{v:.2f}" for v in values.tolist()]
+
+def choose(options, index: np.ndarray) -> List[str]:
+    return np.asarray(options, dtype=object)[index].tolist()
+
+class HistorySpec:
+    """Sizes of every table and the pure per-row functions that define the dataset
+
+    Every attribute of a row is a hash of (seed, table, row, field), so any row
+    can be produced without the rows before it. Children find a parent's
+    attributes by recomputing them from its index. Nothing is kept in memory
+    apart from the geography and the price series, so any row range can be
+    written by any worker. Rows are computed as numpy columns a batch at a
+    time.
+    """
+
+    def __init__(self, users: int = 100_000, villages: int = 5000, hubs: int = 200, years: float = 3.0,
+                 listings_per_farmer: float = 12.0, bids_per_listing: float = 2.0, order_ratio: float = 0.7,
+                 seed: int = 42, end: Optional[float] = None):
+        self.seed = seed
+        self.end = end if end is not None else time.time()
+        self.start = self.end - years * 365 * 86400
+        self.geography = Geography.generate(villages, hubs, seed)
+        self.prices = PriceModel(history_days=int(years * 365) + 1, horizon_days=1, seed=seed, now=self.end)
+        self.products = list(COMMODITY_PRICES)
+
+        geo = self.geography
+        self.village_lat = np.frombuffer(geo.village_index.lat, dtype=np.float64)
+        self.village_lon = np.frombuffer(geo.village_index.lon, dtype=np.float64)
+        self.village_hub = np.array(geo.village_hub, dtype=np.int64)
+        self.village_district = np.array(geo.village_district, dtype=np.int64)
+
+        # Users are laid out in role blocks; registration times are hashed, so the blocks are invisible
+        self.role_start: Dict[str, int] = {}
+        self.role_count: Dict[str, int] = {}
+        offset = 0
+        for role, weight in ROLE_WEIGHTS.items():
+            self.role_start[role] = offset
+            self.role_count[role] = max(1, int(users * weight))
+            offset += self.role_count[role]
+        self.role_start["admin"], self.role_count["admin"] = offset, ADMINS
+        self.role_bounds = np.array(list(self.role_start.values()))
+        self.role_names = list(self.role_start)
+
+        self.counts = {
+            "products": len(self.products),
+            "villages": len(geo),
+            "users": offset + ADMINS,
+            "hubs": len(geo.hub_ids),
+            "village_hubs": len(geo),
+            "farms": self.role_count["farmer"],
+            "listings": int(self.role_count["farmer"] * listings_per_farmer),
+        }
+        self.counts["bids"] = int(self.counts["listings"] * bids_per_listing)
+        self.counts["orders"] = min(self.counts["listings"], int(self.counts["listings"] * order_ratio))
+        self.counts["payments"] = self.counts["orders"]
+
+        # Each sold listing has exactly one order: order i buys listing (i * stride + offset) mod listings,
+        # a permutation, so a listing knows it was sold by inverting it
+        listings = max(1, self.counts["listings"])
+        self.order_stride = (0x9E3779B1 + seed) % listings or 1
+        while math.gcd(self.order_stride, listings) != 1:
+            self.order_stride += 1
+        self.order_offset = (seed * 7919) % listings
+        self.order_stride_inverse = pow(self.order_stride, -1, listings)
+
+    def unit(self, table: str, rows: np.ndarray, field: int) -> np.ndarray:
+        """Uniform [0, 1) values for one field of the given rows"""
+        key = np.uint64(((self.seed << 52) ^ (TABLE_TAG[table] << 44) ^ field) & MASK)
+        return (_mix((rows.astype(np.uint64) << np.uint64(4)) ^ key) >> np.uint64(11)) * 2.0 ** -53
+
+    def pick(self, table: str, rows: np.ndarray, field: int, n: int) -> np.ndarray:
+        return (self.unit(table, rows, field) * n).astype(np.int64)
+
+    # ---- parent attributes children need ----
+
+    def user_village(self, users: np.ndarray) -> np.ndarray:
+        return self.pick("users", users, 1, len(self.geography))
+
+    def user_created(self, users: np.ndarray) -> np.ndarray:
+        return self.start + self.unit("users", users, 2) * (self.end - self.start)
+
+    def role_user(self, role: str, table: str, rows: np.ndarray, field: int) -> np.ndarray:
+        return self.role_start[role] + self.pick(table, rows, field, self.role_count[role])
+
+    def listing(self, rows: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """(farmer, product, created_at, quantity, asking price) columns of listings"""
+        farmer = self.role_user("farmer", "listings", rows, 0)
+        product = self.pick("listings", rows, 1, len(self.products))
+        registered = self.user_created(farmer)
+        created = registered + self.unit("listings", rows, 2) * (self.end - registered)
+        quantity = 20 + self.pick("listings", rows, 3, 481)
+        market = self.village_district[self.user_village(farmer)]
+        model = self.prices
+        day = np.clip(((created + UTC_OFFSET) // 86400).astype(np.int64) - model.start_day, 0, model.days - 1)
+        price = model.prices[day, product, market] * (0.95 + 0.2 * self.unit("listings", rows, 4))
+        return farmer, product, created, quantity, np.round(price, 2)
+
+    def order_listing(self, orders: np.ndarray) -> np.ndarray:
+        return (orders * self.order_stride + self.order_offset) % max(1, self.counts["listings"])
+
+    def listing_sold(self, listings: np.ndarray) -> np.ndarray:
+        """Whether each listing has an order, i.e. was sold"""
+        order = ((listings - self.order_offset) * self.order_stride_inverse) % max(1, self.counts["listings"])
+        return order < self.counts["orders"]
+
+    def order(self, rows: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """(listing, buyer, farmer, quantity, agreed price, status, created_at, updated_at) columns of orders"""
+        listing = self.order_listing(rows)
+        farmer, _, listed, quantity, price = self.listing(listing)
+        created = np.minimum(self.end, listed + self.unit("orders", rows, 1) * 7 * 86400)
+        quantity = np.maximum(1, (quantity * (0.2 + 0.8 * self.unit("orders", rows, 2))).astype(np.int64))
+        agreed = np.round(price * (0.9 + 0.1 * self.unit("orders", rows, 3)), 2)
+        age_days = (self.end - created) / 86400
+        # Young orders are still moving through the lifecycle; old ones completed unless cancelled
+        status = np.minimum(4, (age_days / 2).astype(np.int64))
+        status[age_days > 10] = 5
+        status[self.unit("orders", rows, 4) < 0.04] = 6
+        updated = created + np.minimum(age_days, 10) * 86400 * self.unit("orders", rows, 5)
+        buyer = self.role_user("buyer", "orders", rows, 6)
+        return listing, buyer, farmer, quantity, agreed, status, created, updated
+
+    # ---- rows ----
+
+    def columns(self, table: str, start: int, end: int) -> List[list]:
+        """Column lists for rows [start, end) of a table, in TABLES order"""
+        return getattr(self, f"_{table}")(np.arange(start, end, dtype=np.int64))
+
+    def _products(self, rows: np.ndarray):
+        names = [self.products[row] for row in rows.tolist()]
+        categories = [COMMODITY_PRICES[name][0] for name in names]
+        n = len(rows)
+        return [row_ids("products", rows), [f"{c[:3].upper()}-{row + 1:05d}" for c, row in zip(categories, rows.tolist())],
+                names, [c.lower() for c in categories], ["kg"] * n, ["t"] * n,
+                timestamps(np.full(n, self.start))]
+
+    def _villages(self, rows: np.ndarray):
+        geo = self.geography
+        records = [geo.village(row) for row in rows.tolist()]
+        n = len(rows)
+        return [row_ids("villages", rows), [r["name"] for r in records], [STATE] * n,
+                [r["district"] for r in records], [r["block"] for r in records], [r["pincode"] for r in records],
+                points(self.village_lat[rows], self.village_lon[rows]), ["t"] * n,
+                timestamps(np.full(n, self.start))]
+
+    def _users(self, rows: np.ndarray):
+        created = self.user_created(rows)
+        first = choose(FIRST_NAMES, self.pick("users", rows, 3, len(FIRST_NAMES)))
+        last = choose(LAST_NAMES, self.pick("users", rows, 4, len(LAST_NAMES)))
+        role = choose(self.role_names, np.searchsorted(self.role_bounds, rows, side="right") - 1)
+        updated = created + self.unit("users", rows, 7) * (self.end - created)
+        return [row_ids("users", rows), [f"9{row:09d}" for row in rows.tolist()],
+                [f"{a} {b}" for a, b in zip(first, last)], role,
+                choose(("hi", "en"), (self.unit("users", rows, 5) >= 0.8).astype(np.int64)),
+                choose(("verified", "pending"), (self.unit("users", rows, 6) >= 0.85).astype(np.int64)),
+                row_ids("villages", self.user_village(rows)), timestamps(created), timestamps(updated),
+                ["t"] * len(rows)]
+
+    def _hubs(self, rows: np.ndarray):
+        geo = self.geography
+        records = [geo.hub(row) for row in rows.tolist()]
+        villages = np.array([geo.hub_village[row] for row in rows.tolist()], dtype=np.int64)
+        operators = self.role_start["hub_operator"] + rows % self.role_count["hub_operator"]
+        n = len(rows)
+        return [row_ids("hubs", rows), [r["name"] for r in records], row_ids("villages", villages),
+                row_ids("users", operators), points(self.village_lat[villages], self.village_lon[villages]),
+                [str(r["capacity_tonnes"]) for r in records], [r["status"] for r in records],
+                timestamps(np.full(n, self.start))]
+
+    def _village_hubs(self, rows: np.ndarray):
+        return [row_ids("villages", rows), row_ids("hubs", self.village_hub[rows])]
+
+    def _farms(self, rows: np.ndarray):
+        # Farm n belongs to the n-th farmer, in the farmer's village
+        farmers = self.role_start["farmer"] + rows
+        villages = self.user_village(farmers)
+        lat = self.village_lat[villages] + (self.unit("farms", rows, 0) - 0.5) * 0.02
+        lon = self.village_lon[villages] + (self.unit("farms", rows, 1) - 0.5) * 0.02
+        return [row_ids("farms", rows), row_ids("users", farmers), row_ids("villages", villages),
+                prices(0.5 + 9.5 * self.unit("farms", rows, 2) ** 2), points(lat, lon),
+                timestamps(self.user_created(farmers))]
+
+    def _listings(self, rows: np.ndarray):
+        farmer, product, created, quantity, price = self.listing(rows)
+        expiry = created + 14 * 86400
+        state = self.unit("listings", rows, 5)
+        # Listings with an order are sold; unsold ones expired (a few cancelled) or, if still live, active
+        status = np.where(self.listing_sold(rows), 1,
+                          np.where(expiry < self.end, np.where(state < 0.8, 2, 3), 0))
+        hubs = self.village_hub[self.user_village(farmer)]
+        return [row_ids("listings", rows), row_ids("users", farmer), row_ids("products", product),
+                row_ids("farms", farmer - self.role_start["farmer"]), quantity.tolist(),
+                choose(QUALITY_GRADES, self.pick("listings", rows, 6, len(QUALITY_GRADES))), prices(price),
+                dates(created - self.unit("listings", rows, 7) * 5 * 86400), dates(expiry),
+                choose(("active", "sold", "expired", "cancelled"), status), row_ids("hubs", hubs),
+                timestamps(created)]
+
+    def _bids(self, rows: np.ndarray):
+        listing = self.pick("bids", rows, 0, self.counts["listings"])
+        _, _, listed, quantity, price = self.listing(listing)
+        created = np.minimum(self.end, listed + self.unit("bids", rows, 1) * 3 * 86400)
+        status = np.where(created > self.end - 86400, 0, np.where(self.unit("bids", rows, 2) < 0.35, 1, 2))
+        return [row_ids("bids", rows), row_ids("listings", listing),
+                row_ids("users", self.role_user("buyer", "bids", rows, 3)),
+                prices(price * (0.85 + 0.17 * self.unit("bids", rows, 4))),
+                np.maximum(1, (quantity * self.unit("bids", rows, 5)).astype(np.int64)).tolist(),
+                choose(("pending", "accepted", "rejected"), status), timestamps(created)]
+
+    def _orders(self, rows: np.ndarray):
+        listing, buyer, farmer, quantity, agreed, status, created, updated = self.order(rows)
+        pickup = created + 86400 * (1 + self.pick("orders", rows, 7, 3))
+        return [row_ids("orders", rows), row_ids("users", buyer), row_ids("listings", listing),
+                row_ids("users", farmer), quantity.tolist(), prices(agreed), choose(ORDER_STATUSES, status),
+                dates(pickup), row_ids("hubs", self.village_hub[self.user_village(farmer)]),
+                timestamps(created), timestamps(updated)]
+
+    def _payments(self, rows: np.ndarray):
+        _, buyer, farmer, quantity, agreed, status, created, _ = self.order(rows)
+        # pending orders are unpaid, cancelled ones refunded, the rest settled (a few failed)
+        payment_status = np.where(self.unit("payments", rows, 0) < 0.02, 3, 1)
+        payment_status[status == 0] = 0
+        payment_status[status == 6] = 2
+        completed = timestamps(created + 60 + self.unit("payments", rows, 1) * 3600)
+        settled = ((payment_status == 1) | (payment_status == 2)).tolist()
+        return [row_ids("payments", rows), row_ids("orders", rows), row_ids("users", buyer), row_ids("users", farmer),
+                prices(quantity * agreed), choose(PAYMENT_METHODS, self.pick("payments", rows, 2, len(PAYMENT_METHODS))),
+                choose(("pending", "completed", "refunded", "failed"), payment_status), timestamps(created),
+                [c if s else None for c, s in zip(completed, settled)]]
+
+# ---- writers ----
+
+def write_part(spec: HistorySpec, table: str, start: int, end: int, path: str, fmt: str) -> int:
+    """Stream rows [start, end) of one table to `path` in batches; returns bytes written
+
+    Generated values never contain tabs, newlines or backslashes, so COPY
+    text lines are joined without escaping; only NULLs need a marker.
+    """
+    null = "" if fmt == "csv" else "\\N"
+    with open(path, "w", newline="", buffering=1 << 20) as f:
+        writer = csv.writer(f) if fmt == "csv" else None
+        if writer is not None:
+            writer.writerow(TABLES[table])
+        for batch in range(start, end, BATCH_ROWS):
+            columns = spec.columns(table, batch, min(batch + BATCH_ROWS, end))
+            columns = [[null if v is None else v for v in column] if None in column else column
+                       for column in columns]
+            if writer is not None:
+                writer.writerows(zip(*columns))
+            else:
+                f.write("\n".join("\t".join(map(str, row)) for row in zip(*columns)) + "\n")
+        return f.tell()
+
+_worker_spec: Optional[HistorySpec] = None
+
+def _init_worker(spec_args: Dict[str, Any]):
+    global _worker_spec
+    _worker_spec = HistorySpec(**spec_args)
+
+def _run_task_with(spec: HistorySpec, task: Tuple[str, int, int, str, str]) -> Tuple[str, int, int]:
+    table, start, end, path, fmt = task
+    return table, end - start, write_part(spec, table, start, end, path, fmt)
+
+def _run_task(task: Tuple[str, int, int, str, str]) -> Tuple[str, int, int]:
+    return _run_task_with(_worker_spec, task)
+
+def load_script(parts: Dict[str, List[str]], fmt: str) -> str:
+    """psql script that loads every part in foreign-key order inside one transaction"""
+    options = "(FORMAT csv, HEADER true)" if fmt == "csv" else "(FORMAT text)"
+    lines = [
+        "-- Generated by bulk_history.py; run from the output directory: psql -f load.sql",
+        "\\set ON_ERROR_STOP on",
+        "BEGIN;",
+    ]
+    for table, columns in TABLES.items():
+        if table == "village_hubs":
+            lines.append("CREATE TEMP TABLE village_hubs ON COMMIT DROP AS "
+                         "SELECT village_id, hub_id FROM villages WITH NO DATA;")
+        for path in parts[table]:
+            lines.append(f"\\copy {table} ({', '.join(columns)}) FROM '{os.path.basename(path)}' WITH {options}")
+        if table == "village_hubs":
+            lines.append("UPDATE villages v SET hub_id = vh.hub_id FROM village_hubs vh "
+                         "WHERE v.village_id = vh.village_id;")
+    lines.append("UPDATE orders o SET payment_id = p.payment_id FROM payments p WHERE p.order_id = o.order_id;")
+    lines.append("COMMIT;")
+    lines.append("ANALYZE;")
+    return "\n".join(lines) + "\n"
+
+def generate(spec_args: Dict[str, Any], output_dir: str, fmt: str = "copy", workers: int = 1,
+             chunk_rows: int = 250_000) -> Dict[str, Any]:
+    """Write every table in parts of `chunk_rows` rows across `workers` processes"""
+    spec = HistorySpec(**spec_args)
+    os.makedirs(output_dir, exist_ok=True)
+    extension = "csv" if fmt == "csv" else "tsv"
+    tasks, parts = [], {}
+    for order, table in enumerate(TABLES):
+        parts[table] = []
+        for part, start in enumerate(range(0, spec.counts[table], chunk_rows)):
+            path = os.path.join(output_dir, f"{order:02d}_{table}.part{part:04d}.{extension}")
+            parts[table].append(path)
+            tasks.append((table, start, min(start + chunk_rows, spec.counts[table]), path, fmt))
+
+    rows: Dict[str, int] = {table: 0 for table in TABLES}
+    written = 0
+    started = time.perf_counter()
+    if workers <= 1:
+        for table, count, size in (_run_task_with(spec, task) for task in tasks):
+            rows[table] += count
+            written += size
+    else:
+        with Pool(workers, initializer=_init_worker, initargs=(spec_args,)) as pool:
+            for table, count, size in pool.imap_unordered(_run_task, tasks):
+                rows[table] += count
+                written += size
+    elapsed = time.perf_counter() - started
+
+    with open(os.path.join(output_dir, "load.sql"), "w") as f:
+        f.write(load_script(parts, fmt))
+    return {"rows": rows, "bytes": written, "seconds": elapsed, "parts": len(tasks)}
+
+def main():
+    """Generate a historical dataset and a psql load script"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Bulk Historical Dataset Generator')
+    parser.add_argument('--output', default='history',
+                       help='Output directory for the table parts and load.sql')
+    parser.add_argument('--users', type=int, default=100_000,
+                       help='Users (role mix as in the world model)')
+    parser.add_argument('--villages', type=int, default=5000,
+                       help='Villages')
+    parser.add_argument('--hubs', type=int, default=200,
+                       help='Hubs')
+    parser.add_argument('--years', type=float, default=3.0,
+                       help='Years of history ending now')
+    parser.add_argument('--listings-per-farmer', type=float, default=12.0,
+                       help='Listings per farmer over the whole history')
+    parser.add_argument('--bids-per-listing', type=float, default=2.0,
+                       help='Bids per listing')
+    parser.add_argument('--order-ratio', type=float, default=0.7,
+                       help='Share of listings sold, each with one order and payment (at most 1)')
+    parser.add_argument('--format', choices=['copy', 'csv'], default='copy',
+                       help='PostgreSQL COPY text format or CSV with headers')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                       help='Worker processes')
+    parser.add_argument('--chunk-rows', type=int, default=250_000,
+                       help='Rows per output part')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Random seed (same seed, same dataset)')
+
+    args = parser.parse_args()
+    if not 1 <= args.hubs <= max_hubs(args.villages):
+        parser.error("--hubs must be at least 1 and at most --villages")
+
+    spec_args = {
+        "users": args.users, "villages": args.villages, "hubs": args.hubs, "years": args.years,
+        "listings_per_farmer": args.listings_per_farmer, "bids_per_listing": args.bids_per_listing,
+        "order_ratio": args.order_ratio, "seed": args.seed, "end": time.time(),
+    }
+    print(f"🏗️ Generating {args.years:g} years of history for {args.users:,} users with {args.workers} workers...")
+    result = generate(spec_args, args.output, args.format, args.workers, args.chunk_rows)
+    total = sum(result["rows"].values())
+    for table, count in result["rows"].items():
+        print(f"   {table:<13} {count:>12,} rows")
+    print(f"✅ {total:,} rows, {result['bytes'] / 1e6:,.1f} MB in {result['parts']} parts, "
+          f"{result['seconds']:.1f}s ({total / result['seconds']:,.0f} rows/s)")
+    print(f"💾 Load with: cd {args.output} && psql -f load.sql")
+
+if __name__ == "__main__":
+    main()
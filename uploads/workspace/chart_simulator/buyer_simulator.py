@@ -12,21 +12,46 @@ from datetime import datetime, timedelta
 import threading
 from typing import Dict, List, Any
 
+from order_lifecycle import OrderLifecycleEngine, ORDER_STATES, VILLAGE_HUBS
+from windows import TimeWindow
+from sim_log import CONSOLE
+
 class BuyerChartSimulator:
-    def __init__(self, base_url: str = "http://localhost:3000/api/v1", user_id: str = "buyer_001"):
+    # Seconds between events when running on its own
+    think_seconds = (2, 5)
+
+    def __init__(self, base_url: str = "http://localhost:3000/api/v1", user_id: str = "buyer_001", token_pool=None,
+                 order_engine: OrderLifecycleEngine = None, world=None, price_model=None, log=None):
         self.base_url = base_url
         self.user_id = user_id
+        self.log = (log if log is not None else CONSOLE).bind("buyer", user_id)
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Authorization': f'Bearer fake_token_{user_id}'
         })
+        if token_pool is not None:
+            token_pool.attach(self.session, user_id)
+        
+        # Purchases go through the shared world (listings, farmers, hubs) when one is given
+        self.world = world
+        if world is not None:
+            world.add_user(user_id, "buyer")
+            order_engine = world.orders
+        
+        # Agreed prices follow the mandi price model when one is given
+        self.price_model = price_model
+        
+        # Orders progress confirmed → picked_up → quality_checked → delivered in the engine
+        self.order_engine = order_engine if order_engine is not None else OrderLifecycleEngine()
         
         # Initial data state
-        self.total_spent = 285000
-        self.active_orders = 5
-        self.completed_purchases = 42
+        self.total_spent = 285000 if world is None else world.spent(user_id)
+        self.base_completed_purchases = 42 if world is None else 0
         self.saved_listings = 12
+        if world is None:
+            for _ in range(5):
+                self.order_engine.create(self.user_id, "Rajesh Kumar", "hub_001", random.randint(2000, 20000))
         
         # Chart data
         self.monthly_spending = [
@@ -38,12 +63,19 @@ class BuyerChartSimulator:
             {"name": "Jun", "value": 41000},
         ]
         
+        # Purchases land in their calendar month; old months roll out of the ring
+        self.spending_window = TimeWindow.monthly()
+        if world is None:
+            self.spending_window.seed(month["value"] for month in self.monthly_spending)
+        
         self.category_spending = [
             {"name": "Cereals", "value": 120000},
             {"name": "Vegetables", "value": 85000},
             {"name": "Fruits", "value": 45000},
             {"name": "Pulses", "value": 35000},
         ]
+        if world is not None:
+            self.update_category_spending()
         
         self.running = False
 
@@ -51,40 +83,43 @@ class BuyerChartSimulator:
         """Generate a new order simulation"""
         products = ["Basmati Rice", "Fresh Onions", "Wheat", "Tomatoes", "Potatoes", "Carrots"]
         farmers = ["Rajesh Kumar", "Sunita Devi", "Amit Singh", "Priya Sharma", "Vikram Patel"]
-        villages = ["Khetri", "Rampur", "Bharatpur", "Alwar", "Jaipur"]
+        
+        if self.world is not None:
+            village, geography = self.world.random_village(), self.world.geography
+            hub_id = self.world.hub_for_village(village)
+        else:
+            village, geography = random.choice(list(VILLAGE_HUBS)), None
+            hub_id = VILLAGE_HUBS[village]
+        product = random.choice(products)
+        if self.price_model is not None:
+            agreed_price = self.price_model.quote(product, self.price_model.market_for(village, geography))
+        else:
+            agreed_price = random.randint(20, 3000)
         
         return {
-            "order_id": f"ORD_{int(time.time())}",
-            "product_name": random.choice(products),
+            "product_name": product,
             "quantity": random.randint(10, 200),
-            "agreed_price": random.randint(20, 3000),
-            "status": random.choice(["confirmed", "picked_up", "quality_checked", "delivered"]),
+            "agreed_price": agreed_price,
+            "status": "confirmed",
             "farmer_name": random.choice(farmers),
-            "village_name": random.choice(villages),
+            "village_name": village,
+            "hub_id": hub_id,
             "created_at": datetime.now().isoformat(),
             "pickup_date": (datetime.now() + timedelta(days=random.randint(1, 7))).isoformat()
         }
 
     def update_monthly_spending(self):
-        """Update monthly spending data with slight variations"""
-        for month_data in self.monthly_spending:
-            # Add small random variation (-5% to +10%)
-            variation = random.uniform(-0.05, 0.10)
-            month_data["value"] = int(month_data["value"] * (1 + variation))
-        
-        # Add new month if we're at the end
-        if len(self.monthly_spending) >= 12:
-            self.monthly_spending.pop(0)
-        
-        new_month = datetime.now().strftime("%b")
-        if not any(m["name"] == new_month for m in self.monthly_spending):
-            self.monthly_spending.append({
-                "name": new_month,
-                "value": random.randint(35000, 65000)
-            })
+        """Update monthly spending data from the purchases in each month"""
+        self.monthly_spending = self.spending_window.series(6)
 
     def update_category_spending(self):
         """Update category spending with realistic variations"""
+        if self.world is not None:
+            spent = self.world.spent_by_category(self.user_id)
+            for category_data in self.category_spending:
+                category_data["value"] = spent.get(category_data["name"], 0)
+            return
+        
         categories = ["Cereals", "Vegetables", "Fruits", "Pulses"]
         for category_data in self.category_spending:
             if category_data["name"] in categories:
@@ -94,21 +129,49 @@ class BuyerChartSimulator:
 
     def simulate_new_purchase(self):
         """Simulate a new purchase affecting stats"""
-        order = self.generate_new_order()
-        purchase_amount = order["agreed_price"] * order["quantity"]
+        if self.world is not None:
+            # Buy from a real listing so the farmer, hub and admin totals move too
+            listing = self.world.random_active_listing()
+            if listing is None:
+                return
+            order = self.world.purchase(self.user_id, listing, quantity=random.randint(10, 200))
+            if order is None:
+                return
+            purchase_amount = order["amount"]
+            product_category = order["category"]
+        else:
+            order = self.generate_new_order()
+            purchase_amount = order["agreed_price"] * order["quantity"]
+            row = self.order_engine.create(self.user_id, order["farmer_name"], order["hub_id"], purchase_amount)
+            order["order_id"] = self.order_engine.order_id(row)
+            product_category = self.get_product_category(order["product_name"])
         
         # Update stats
-        self.total_spent += purchase_amount
-        self.completed_purchases += 1
+        self.spending_window.add(time.time(), purchase_amount)
+        if self.world is not None:
+            self.total_spent = self.world.spent(self.user_id)
+        else:
+            self.total_spent += purchase_amount
         
         # Update category spending
-        product_category = self.get_product_category(order["product_name"])
-        for cat in self.category_spending:
-            if cat["name"] == product_category:
-                cat["value"] += purchase_amount
-                break
+        if self.world is not None:
+            self.update_category_spending()
+        else:
+            for cat in self.category_spending:
+                if cat["name"] == product_category:
+                    cat["value"] += purchase_amount
+                    break
         
-        print(f"🛒 New purchase: {order['product_name']} - ₹{purchase_amount:,}")
+        self.log.info("new_purchase", "🛒 New purchase: {product} - ₹{amount:,}", product=order['product_name'],
+                      amount=purchase_amount)
+
+    @property
+    def active_orders(self) -> int:
+        return self.order_engine.in_flight_for_buyer(self.user_id)
+
+    @property
+    def completed_purchases(self) -> int:
+        return self.base_completed_purchases + self.order_engine.delivered_for_buyer(self.user_id)
 
     def get_product_category(self, product_name: str) -> str:
         """Map product to category"""
@@ -125,6 +188,8 @@ class BuyerChartSimulator:
         """Send updated analytics data to the API"""
         try:
             # Update chart data
+            if self.world is not None:
+                self.total_spent = self.world.spent(self.user_id)
             self.update_monthly_spending()
             self.update_category_spending()
             
@@ -149,21 +214,80 @@ class BuyerChartSimulator:
             )
             
             if response.status_code in [200, 201]:
-                print(f"✅ Analytics updated for buyer {self.user_id}")
+                self.log.info("analytics_updated", "✅ Analytics updated for buyer {user}", user=self.user_id)
             else:
-                print(f"⚠️ Analytics update failed: {response.status_code}")
+                self.log.warning("analytics_failed", "⚠️ Analytics update failed: {status}", status=response.status_code)
                 
         except requests.exceptions.RequestException as e:
-            print(f"❌ Network error: {e}")
+            self.log.error("network_error", "❌ Network error: {error}", error=e)
 
     def simulate_order_status_change(self):
-        """Simulate order status changes"""
-        if self.active_orders > 0:
-            # Randomly complete an order
-            if random.random() < 0.3:  # 30% chance
-                self.active_orders -= 1
-                self.completed_purchases += 1
-                print(f"📦 Order completed! Active: {self.active_orders}, Completed: {self.completed_purchases}")
+        """Simulate one of this buyer's in-flight orders moving to its next status"""
+        state = random.choice(ORDER_STATES[:-1])
+        order = self.order_engine.advance_random(state, buyer_id=self.user_id)
+        if order is None:
+            return
+        
+        if order["status"] == "delivered":
+            self.log.info("order_completed", "📦 Order completed! Active: {active}, Completed: {completed}",
+                          active=self.active_orders, completed=self.completed_purchases)
+        else:
+            self.log.info("order_status", "🚚 Order {order_id}: {previous} → {status}", order_id=order['order_id'],
+                          previous=state, status=order['status'])
+
+    def simulate_order_tracking(self):
+        """Simulate the buyer checking their orders, reading IDs and statuses from the engine"""
+        state = random.choice(ORDER_STATES[:-1])
+        row = self.order_engine.random_in(state, buyer_id=self.user_id)
+        if row is None:
+            return
+        order = self.order_engine.get(row)
+        
+        try:
+            self.session.get(
+                f"{self.base_url}/orders",
+                params={"status": state, "buyer_id": self.user_id},
+                timeout=5
+            )
+            self.session.get(f"{self.base_url}/orders/{order['order_id']}", timeout=5)
+            self.session.get(
+                f"{self.base_url}/hubs/{order['hub_id']}/orders",
+                params={"status": state},
+                timeout=5
+            )
+        except requests.exceptions.RequestException as e:
+            self.log.error("network_error", "❌ Network error: {error}", error=e)
+
+    def simulate_nearby_search(self):
+        """Simulate the buyer browsing listings near a village (GET /marketplace/listings/nearby)"""
+        geography = self.world.geography if self.world is not None else None
+        if geography is None:
+            return
+        
+        village = geography.village_by_name(self.world.user_village_name(self.user_id))
+        params = geography.nearby_query(village, categories=["Cereals", "Vegetables", "Fruits", "Pulses"])
+        try:
+            self.session.get(f"{self.base_url}/marketplace/listings/nearby", params=params, timeout=5)
+        except requests.exceptions.RequestException as e:
+            self.log.error("network_error", "❌ Network error: {error}", error=e)
+
+    def run_event(self):
+        """Trigger one event from the buyer dashboard mix"""
+        event_probability = random.random()
+
+        if event_probability < 0.4:  # 40% chance - new purchase
+            self.simulate_new_purchase()
+        elif event_probability < 0.6:  # 20% chance - order status change
+            self.simulate_order_status_change()
+        elif event_probability < 0.8:  # 20% chance - analytics update
+            self.send_analytics_update()
+        elif event_probability < 0.9:  # 10% chance - order tracking
+            self.simulate_order_tracking()
+        elif event_probability < 0.95 and self.world is not None and self.world.geography is not None:
+            self.simulate_nearby_search()  # 5% chance - nearby listings (with a geography)
+        else:  # 5% chance with a geography, 10% without - just update charts
+            self.update_monthly_spending()
+            self.update_category_spending()
 
     def run_simulation(self, duration_minutes: int = 10):
         """Run the simulation for specified duration"""
@@ -178,26 +302,16 @@ class BuyerChartSimulator:
         while self.running and time.time() < end_time:
             try:
                 # Randomly trigger different events
-                event_probability = random.random()
-                
-                if event_probability < 0.4:  # 40% chance - new purchase
-                    self.simulate_new_purchase()
-                elif event_probability < 0.6:  # 20% chance - order status change
-                    self.simulate_order_status_change()
-                elif event_probability < 0.8:  # 20% chance - analytics update
-                    self.send_analytics_update()
-                else:  # 20% chance - just update charts
-                    self.update_monthly_spending()
-                    self.update_category_spending()
+                self.run_event()
                 
                 # Wait 2-5 seconds before next event
-                time.sleep(random.uniform(2, 5))
+                time.sleep(random.uniform(*self.think_seconds))
                 
             except KeyboardInterrupt:
                 print("\n🛑 Simulation stopped by user")
                 break
             except Exception as e:
-                print(f"❌ Error in simulation: {e}")
+                self.log.error("simulation_error", "❌ Error in simulation: {error}", error=e)
                 time.sleep(1)
         
         print(f"✅ Buyer simulation completed after {duration_minutes} minutes")
@@ -12,21 +12,45 @@ from datetime import datetime, timedelta
 import threading
 from typing import Dict, List, Any
 
+from windows import TimeWindow
+from sim_log import CONSOLE
+
 class FarmerChartSimulator:
-    def __init__(self, base_url: str = "http://localhost:3000/api/v1", user_id: str = "farmer_001"):
+    # Seconds between events when running on its own
+    think_seconds = (3, 6)
+
+    def __init__(self, base_url: str = "http://localhost:3000/api/v1", user_id: str = "farmer_001", token_pool=None, world=None,
+                 price_model=None, log=None):
         self.base_url = base_url
         self.user_id = user_id
+        self.log = (log if log is not None else CONSOLE).bind("farmer", user_id)
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Authorization': f'Bearer fake_token_{user_id}'
         })
+        if token_pool is not None:
+            token_pool.attach(self.session, user_id)
+        
+        # Listings and sales go through the shared world when one is given
+        self.world = world
+        if world is not None:
+            world.add_user(user_id, "farmer")
+        
+        # Asking prices and bids follow the mandi price model when one is given
+        self.price_model = price_model
+        
+        # Earnings land in the calendar month they were made; old months roll out of the ring
+        self.earnings_window = TimeWindow.monthly()
         
         # Initial data state
         self.total_earnings = 125000
         self.active_listings = 8
         self.completed_orders = 24
         self.pending_orders = 3
+        if world is not None:
+            self.total_earnings = 0
+            self.sync_from_world()
         
         # Chart data
         self.monthly_earnings = [
@@ -37,6 +61,8 @@ class FarmerChartSimulator:
             {"name": "May", "value": 28000},
             {"name": "Jun", "value": 17000},
         ]
+        if world is None:
+            self.earnings_window.seed(month["value"] for month in self.monthly_earnings)
         
         self.crop_distribution = [
             {"name": "Rice", "value": 40},
@@ -54,12 +80,16 @@ class FarmerChartSimulator:
         
         product = random.choice(products)
         crop_type = self.get_crop_type(product)
+        if self.price_model is not None:
+            asking_price = self.price_model.quote(product, self.market())
+        else:
+            asking_price = random.randint(15, 3000)
         
         return {
             "listing_id": f"LST_{int(time.time())}",
             "product_name": product,
             "quantity": random.randint(20, 500),
-            "asking_price": random.randint(15, 3000),
+            "asking_price": asking_price,
             "status": "active",
             "total_bids": 0,
             "highest_bid": None,
@@ -67,6 +97,12 @@ class FarmerChartSimulator:
             "crop_type": crop_type
         }
 
+    def market(self) -> int:
+        """Price model market for this farmer's village"""
+        if self.world is None:
+            return 0
+        return self.price_model.market_for(self.world.user_village_name(self.user_id), self.world.geography)
+
     def get_crop_type(self, product_name: str) -> str:
         """Map product to crop type"""
         if any(word in product_name.lower() for word in ["rice", "basmati"]):
@@ -78,23 +114,19 @@ class FarmerChartSimulator:
         else:
             return "Others"
 
+    def sync_from_world(self):
+        """Earnings include every buyer purchase of this farmer's listings; orders are this farmer's in the engine"""
+        earnings = self.world.earnings(self.user_id)
+        if earnings > self.total_earnings:
+            self.earnings_window.add(time.time(), earnings - self.total_earnings)
+        self.total_earnings = earnings
+        self.active_listings = self.world.active_listing_count(self.user_id)
+        self.pending_orders = self.world.orders.in_flight_for_farmer(self.user_id)
+        self.completed_orders = self.world.orders.delivered_for_farmer(self.user_id)
+
     def update_monthly_earnings(self):
-        """Update monthly earnings data with seasonal variations"""
-        for month_data in self.monthly_earnings:
-            # Seasonal variation (-10% to +15%)
-            variation = random.uniform(-0.10, 0.15)
-            month_data["value"] = int(month_data["value"] * (1 + variation))
-        
-        # Add new month if we're at the end
-        if len(self.monthly_earnings) >= 12:
-            self.monthly_earnings.pop(0)
-        
-        new_month = datetime.now().strftime("%b")
-        if not any(m["name"] == new_month for m in self.monthly_earnings):
-            self.monthly_earnings.append({
-                "name": new_month,
-                "value": random.randint(12000, 32000)
-            })
+        """Update monthly earnings data from the sales in each month"""
+        self.monthly_earnings = self.earnings_window.series(6)
 
     def update_crop_distribution(self):
         """Update crop distribution based on new listings"""
@@ -107,7 +139,11 @@ class FarmerChartSimulator:
     def simulate_new_listing(self):
         """Simulate creating a new listing"""
         listing = self.generate_new_listing()
-        self.active_listings += 1
+        if self.world is not None:
+            self.world.add_listing(self.user_id, listing["product_name"], listing["quantity"], listing["asking_price"])
+            self.sync_from_world()
+        else:
+            self.active_listings += 1
         
         # Update crop distribution
         crop_type = listing["crop_type"]
@@ -116,10 +152,23 @@ class FarmerChartSimulator:
                 crop["value"] = min(50, crop["value"] + 1)
                 break
         
-        print(f"🌱 New listing: {listing['product_name']} - {listing['quantity']} units @ ₹{listing['asking_price']}")
+        self.log.info("new_listing", "🌱 New listing: {product} - {quantity} units @ ₹{price}",
+                      product=listing['product_name'], quantity=listing['quantity'], price=listing['asking_price'])
 
     def simulate_listing_sale(self):
         """Simulate a listing being sold"""
+        if self.world is not None:
+            listing = self.world.random_active_listing(farmer_id=self.user_id)
+            buyer = self.world.random_user("buyer")
+            if listing is not None and buyer is not None and random.random() < 0.25:
+                # Sold to a buyer in the world: becomes their spend and a hub order
+                order = self.world.purchase(buyer, listing)
+                if order is not None:
+                    self.sync_from_world()
+                    self.log.info("listing_sold", "💰 Listing sold! Earnings: ₹{earnings:,}, Active: {active}",
+                                  earnings=order['amount'], active=self.active_listings)
+            return
+        
         if self.active_listings > 0:
             # Randomly sell a listing
             if random.random() < 0.25:  # 25% chance
@@ -129,17 +178,45 @@ class FarmerChartSimulator:
                 # Generate earnings
                 earnings = random.randint(5000, 25000)
                 self.total_earnings += earnings
+                self.earnings_window.add(time.time(), earnings)
                 
-                print(f"💰 Listing sold! Earnings: ₹{earnings:,}, Active: {self.active_listings}")
+                self.log.info("listing_sold", "💰 Listing sold! Earnings: ₹{earnings:,}, Active: {active}",
+                              earnings=earnings, active=self.active_listings)
 
     def simulate_new_bid(self):
         """Simulate receiving a new bid on a listing"""
         if self.active_listings > 0 and random.random() < 0.3:  # 30% chance
-            bid_amount = random.randint(1000, 5000)
-            print(f"📈 New bid received: ₹{bid_amount:,}")
+            if self.price_model is not None:
+                product = random.choice(["Basmati Rice", "Wheat", "Onions", "Potatoes", "Carrots"])
+                bid_amount = self.price_model.bid(product, random.randint(20, 150), self.market())
+            else:
+                bid_amount = random.randint(1000, 5000)
+            self.log.info("new_bid", "📈 New bid received: ₹{amount:,}", amount=bid_amount)
+
+    def simulate_price_check(self):
+        """Simulate the farmer checking mandi prices and the trend for a crop before listing"""
+        product = random.choice(["Basmati Rice", "Wheat", "Fresh Onions", "Tomatoes", "Potatoes"])
+        location = self.price_model.markets[self.market()]
+        try:
+            self.session.get(f"{self.base_url}/marketplace/prices",
+                             params={"product": product, "location": location}, timeout=5)
+            self.session.get(f"{self.base_url}/marketplace/price-trends",
+                             params={"product": product, "location": location, "days": 30}, timeout=5)
+        except requests.exceptions.RequestException as e:
+            self.log.error("network_error", "❌ Network error: {error}", error=e)
 
     def simulate_order_completion(self):
         """Simulate completing a pending order"""
+        if self.world is not None:
+            # Orders are delivered by the hubs; the farmer sees them complete (earnings were credited at sale)
+            completed = self.completed_orders
+            self.sync_from_world()
+            if self.completed_orders > completed:
+                self.log.info("order_completed", "✅ {count} order(s) completed! Earnings: ₹{earnings:,}, Pending: {pending}",
+                              count=self.completed_orders - completed, earnings=self.total_earnings,
+                              pending=self.pending_orders)
+            return
+        
         if self.pending_orders > 0:
             if random.random() < 0.2:  # 20% chance
                 self.pending_orders -= 1
@@ -148,13 +225,17 @@ class FarmerChartSimulator:
                 # Generate earnings
                 earnings = random.randint(3000, 15000)
                 self.total_earnings += earnings
+                self.earnings_window.add(time.time(), earnings)
                 
-                print(f"✅ Order completed! Earnings: ₹{earnings:,}, Pending: {self.pending_orders}")
+                self.log.info("order_completed", "✅ Order completed! Earnings: ₹{earnings:,}, Pending: {pending}",
+                              earnings=earnings, pending=self.pending_orders)
 
     def send_analytics_update(self):
         """Send updated analytics data to the API"""
         try:
             # Update chart data
+            if self.world is not None:
+                self.sync_from_world()
             self.update_monthly_earnings()
             self.update_crop_distribution()
             
@@ -179,12 +260,29 @@ class FarmerChartSimulator:
             )
             
             if response.status_code in [200, 201]:
-                print(f"✅ Analytics updated for farmer {self.user_id}")
+                self.log.info("analytics_updated", "✅ Analytics updated for farmer {user}", user=self.user_id)
             else:
-                print(f"⚠️ Analytics update failed: {response.status_code}")
+                self.log.warning("analytics_failed", "⚠️ Analytics update failed: {status}", status=response.status_code)
                 
         except requests.exceptions.RequestException as e:
-            print(f"❌ Network error: {e}")
+            self.log.error("network_error", "❌ Network error: {error}", error=e)
+
+    def run_event(self):
+        """Trigger one event from the farmer dashboard mix"""
+        event_probability = random.random()
+
+        if event_probability < 0.3:  # 30% chance - new listing
+            self.simulate_new_listing()
+        elif event_probability < 0.5:  # 20% chance - listing sale
+            self.simulate_listing_sale()
+        elif event_probability < 0.7:  # 20% chance - new bid
+            self.simulate_new_bid()
+        elif event_probability < 0.8:  # 10% chance - order completion
+            self.simulate_order_completion()
+        elif event_probability < 0.9 or self.price_model is None:  # 10-20% chance - analytics update
+            self.send_analytics_update()
+        else:  # 10% chance - mandi price check (with a price model)
+            self.simulate_price_check()
 
     def run_simulation(self, duration_minutes: int = 10):
         """Run the simulation for specified duration"""
@@ -199,27 +297,16 @@ class FarmerChartSimulator:
         while self.running and time.time() < end_time:
             try:
                 # Randomly trigger different events
-                event_probability = random.random()
-                
-                if event_probability < 0.3:  # 30% chance - new listing
-                    self.simulate_new_listing()
-                elif event_probability < 0.5:  # 20% chance - listing sale
-                    self.simulate_listing_sale()
-                elif event_probability < 0.7:  # 20% chance - new bid
-                    self.simulate_new_bid()
-                elif event_probability < 0.8:  # 10% chance - order completion
-                    self.simulate_order_completion()
-                else:  # 20% chance - analytics update
-                    self.send_analytics_update()
+                self.run_event()
                 
                 # Wait 3-6 seconds before next event
-                time.sleep(random.uniform(3, 6))
+                time.sleep(random.uniform(*self.think_seconds))
                 
             except KeyboardInterrupt:
                 print("\n🛑 Simulation stopped by user")
                 break
             except Exception as e:
-                print(f"❌ Error in simulation: {e}")
+                self.log.error("simulation_error", "❌ Error in simulation: {error}", error=e)
                 time.sleep(1)
         
         print(f"✅ Farmer simulation completed after {duration_minutes} minutes")
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Synthetic Geography Generator
+Thousands of villages and hubs with coordinates, a grid spatial index, and nearby-listing query generation
+"""
+
+import json
+import math
+import random
+import time
+from array import array
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+EARTH_RADIUS_KM = 6371.0
+STATE = "Rajasthan"
+
+# Rough district centres (lat, lon); villages cluster around them
+DISTRICTS = {
+    "Jhunjhunu": (28.13, 75.40),
+    "Alwar": (27.55, 76.60),
+    "Bharatpur": (27.22, 77.49),
+    "Jaipur": (26.91, 75.79),
+    "Sikar": (27.61, 75.14),
+    "Ajmer": (26.45, 74.64),
+    "Tonk": (26.17, 75.79),
+    "Dausa": (26.89, 76.34),
+    "Kota": (25.18, 75.83),
+    "Bhilwara": (25.35, 74.63),
+    "Udaipur": (24.59, 73.71),
+    "Chittorgarh": (24.88, 74.62),
+    "Jodhpur": (26.24, 73.02),
+    "Nagaur": (27.20, 73.73),
+    "Pali": (25.77, 73.32),
+    "Bikaner": (28.02, 73.31),
+    "Churu": (28.30, 74.95),
+    "Sri Ganganagar": (29.91, 73.88),
+    "Barmer": (25.75, 71.39),
+    "Jhalawar": (24.60, 76.16),
+}
+DISTRICT_NAMES = list(DISTRICTS)
+# Pincode prefixes roughly by district, for plausible 6-digit codes
+PINCODE_PREFIX = {name: 301 + i * 2 for i, name in enumerate(DISTRICT_NAMES)}
+
+# The demo villages the simulators have always used, pinned to real coordinates
+DEMO_VILLAGES = {
+    "Khetri": ("Jhunjhunu", 28.00, 75.79),
+    "Rampur": ("Alwar", 27.42, 76.50),
+    "Bharatpur": ("Bharatpur", 27.22, 77.49),
+    "Alwar": ("Alwar", 27.55, 76.60),
+    "Jaipur": ("Jaipur", 26.91, 75.79),
+}
+
+NAME_PREFIXES = ["Ram", "Shiv", "Kishan", "Gopal", "Hari", "Lakshman", "Bhim", "Sita", "Govind", "Madho",
+                 "Chand", "Suraj", "Dev", "Kesar", "Moti", "Heera", "Bhairon", "Jai", "Raghu", "Balaji"]
+NAME_SUFFIXES = ["pur", "pura", "garh", "nagar", "wala", "sar", "khera", "ka Bas", "gaon", "ki Dhani"]
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+def max_hubs(villages: int) -> int:
+    """Most hubs Geography.generate can place: one per village, demo villages included"""
+    return max(villages, len(DEMO_VILLAGES))
+
+class GridIndex:
+    """Uniform lat/lon grid: point → cell bucket, with ring search for nearest and radius queries"""
+
+    def __init__(self, cell_degrees: float = 0.1):
+        self.cell = cell_degrees
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.lat = array('d')
+        self.lon = array('d')
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def _key(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell)), int(math.floor(lon / self.cell))
+
+    def add(self, lat: float, lon: float) -> int:
+        point = len(self.lat)
+        self.lat.append(lat)
+        self.lon.append(lon)
+        self.cells.setdefault(self._key(lat, lon), []).append(point)
+        return point
+
+    def _ring(self, ci: int, cj: int, r: int):
+        if r == 0:
+            yield ci, cj
+            return
+        for dj in range(-r, r + 1):
+            yield ci - r, cj + dj
+            yield ci + r, cj + dj
+        for di in range(-r + 1, r):
+            yield ci + di, cj - r
+            yield ci + di, cj + r
+
+    def nearest(self, lat: float, lon: float, max_rings: int = 200) -> Tuple[Optional[int], float]:
+        """Closest point and its distance in km; rings grow until no closer point can exist"""
+        ci, cj = self._key(lat, lon)
+        # One cell spans at least this many km in any direction at this latitude
+        cell_km = self.cell * 111.0 * max(math.cos(math.radians(abs(lat) + self.cell)), 0.1)
+        best, best_km = None, float("inf")
+        for r in range(max_rings):
+            if best is not None and (r - 1) * cell_km > best_km:
+                break
+            for key in self._ring(ci, cj, r):
+                for point in self.cells.get(key, ()):
+                    d = haversine_km(lat, lon, self.lat[point], self.lon[point])
+                    if d < best_km:
+                        best, best_km = point, d
+        return best, best_km
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[int, float]]:
+        """Points within radius_km, nearest first"""
+        dlat = radius_km / 111.0
+        dlon = radius_km / (111.0 * max(math.cos(math.radians(lat)), 0.1))
+        i0, j0 = self._key(lat - dlat, lon - dlon)
+        i1, j1 = self._key(lat + dlat, lon + dlon)
+        found = []
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                for point in self.cells.get((i, j), ()):
+                    d = haversine_km(lat, lon, self.lat[point], self.lon[point])
+                    if d <= radius_km:
+                        found.append((point, d))
+        found.sort(key=lambda item: item[1])
+        return found
+
+class Geography:
+    """Villages and hubs with Village/Hub entity fields, indexed for spatial lookups
+
+    Villages are generated around district centres. Hubs sit at a sample of
+    villages, and each village is served by its nearest hub. Village fields
+    follow the Village entity in the system design (village_id, name, state,
+    district, block, pincode, coordinates, hub_id).
+    """
+
+    def __init__(self, cell_degrees: float = 0.1):
+        self.village_ids: List[str] = []
+        self.village_names: List[str] = []
+        self.village_district = array('b')
+        self.village_block = array('h')
+        self.village_pincode = array('l')
+        self.village_hub = array('l')
+        self.village_hub_km = array('d')
+        self.village_index = GridIndex(cell_degrees)
+        self.name_index: Dict[str, int] = {}
+
+        self.hub_ids: List[str] = []
+        self.hub_village = array('l')
+        self.hub_capacity = array('d')
+        self.hub_index = GridIndex(cell_degrees)
+
+    @classmethod
+    def generate(cls, villages: int = 5000, hubs: int = 200, seed: Optional[int] = None) -> "Geography":
+        if not 1 <= hubs <= max_hubs(villages):
+            raise ValueError(f"Need between 1 and {max_hubs(villages)} hubs for {villages} villages, not {hubs}")
+        rng = random.Random(seed)
+        geo = cls()
+        for name, (district, lat, lon) in DEMO_VILLAGES.items():
+            geo._add_village(name, DISTRICT_NAMES.index(district), lat, lon, rng)
+        while len(geo.village_ids) < villages:
+            district = rng.randrange(len(DISTRICT_NAMES))
+            centre_lat, centre_lon = DISTRICTS[DISTRICT_NAMES[district]]
+            lat = rng.gauss(centre_lat, 0.35)
+            lon = rng.gauss(centre_lon, 0.35)
+            geo._add_village(geo._unique_name(rng), district, lat, lon, rng)
+
+        # Hubs at a sample of villages (demo villages first, so hub_001.. serve the familiar names)
+        hub_villages = list(range(min(len(DEMO_VILLAGES), hubs)))
+        hub_villages += rng.sample(range(len(DEMO_VILLAGES), len(geo.village_ids)), max(0, hubs - len(hub_villages)))
+        for i, village in enumerate(hub_villages):
+            geo.hub_ids.append(f"hub_{i + 1:03d}")
+            geo.hub_village.append(village)
+            geo.hub_capacity.append(round(rng.uniform(20, 200), 1))
+            geo.hub_index.add(geo.village_index.lat[village], geo.village_index.lon[village])
+
+        for village in range(len(geo.village_ids)):
+            hub, distance = geo.hub_index.nearest(geo.village_index.lat[village], geo.village_index.lon[village])
+            geo.village_hub.append(hub)
+            geo.village_hub_km.append(distance)
+        return geo
+
+    def _unique_name(self, rng) -> str:
+        name = rng.choice(NAME_PREFIXES) + rng.choice(NAME_SUFFIXES)
+        if name not in self.name_index:
+            return name
+        for qualifier in (" Kalan", " Khurd"):
+            if name + qualifier not in self.name_index:
+                return name + qualifier
+        suffix = 2
+        while f"{name} {suffix}" in self.name_index:
+            suffix += 1
+        return f"{name} {suffix}"
+
+    def _add_village(self, name: str, district: int, lat: float, lon: float, rng):
+        village = len(self.village_ids)
+        self.village_ids.append(f"VLG_{village + 1:06d}")
+        self.village_names.append(name)
+        self.name_index[name] = village
+        self.village_district.append(district)
+        self.village_block.append(rng.randint(1, 12))
+        self.village_pincode.append(PINCODE_PREFIX[DISTRICT_NAMES[district]] * 1000 + rng.randint(1, 999))
+        self.village_index.add(lat, lon)
+
+    def __len__(self) -> int:
+        return len(self.village_ids)
+
+    # ---- lookups ----
+
+    def coordinates(self, village: int) -> Tuple[float, float]:
+        return self.village_index.lat[village], self.village_index.lon[village]
+
+    def village_by_name(self, name: str) -> Optional[int]:
+        return self.name_index.get(name)
+
+    def hub_for(self, village: int) -> str:
+        return self.hub_ids[self.village_hub[village]]
+
+    def nearest_hub(self, lat: float, lon: float) -> Tuple[str, float]:
+        hub, distance = self.hub_index.nearest(lat, lon)
+        return self.hub_ids[hub], distance
+
+    def villages_within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[int, float]]:
+        return self.village_index.within(lat, lon, radius_km)
+
+    def distance_to_hub(self, village: int, hub_id: Optional[str] = None) -> float:
+        """Distance from a village to a hub (its own hub by default)"""
+        if hub_id is None:
+            return self.village_hub_km[village]
+        hub = self.hub_ids.index(hub_id)
+        lat, lon = self.coordinates(village)
+        hub_village = self.hub_village[hub]
+        return haversine_km(lat, lon, *self.coordinates(hub_village))
+
+    def village(self, village: int) -> Dict[str, Any]:
+        """API-shaped Village record"""
+        lat, lon = self.coordinates(village)
+        district = DISTRICT_NAMES[self.village_district[village]]
+        return {
+            "village_id": self.village_ids[village],
+            "name": self.village_names[village],
+            "state": STATE,
+            "district": district,
+            "block": f"{district} Block {self.village_block[village]}",
+            "pincode": str(self.village_pincode[village]),
+            "coordinates": {"latitude": round(lat, 6), "longitude": round(lon, 6)},
+            "hub_id": self.hub_for(village),
+            "is_active": True,
+        }
+
+    def hub(self, hub: int) -> Dict[str, Any]:
+        """API-shaped Hub record"""
+        village = self.hub_village[hub]
+        lat, lon = self.coordinates(village)
+        return {
+            "hub_id": self.hub_ids[hub],
+            "name": f"{self.village_names[village]} Aggregation Hub",
+            "village_id": self.village_ids[village],
+            "location": {"latitude": round(lat, 6), "longitude": round(lon, 6)},
+            "capacity_tonnes": self.hub_capacity[hub],
+            "status": "active",
+        }
+
+    # ---- workloads ----
+
+    def nearby_query(self, village: Optional[int] = None, rng=random, categories: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Query parameters for GET /marketplace/listings/nearby from a user near a village
+
+        The user stands a few km from the village centre. The radius is drawn
+        from the values the buyer UI offers, and a category filter is added
+        some of the time.
+        """
+        village = village if village is not None else rng.randrange(len(self.village_ids))
+        lat, lon = self.coordinates(village)
+        params = {
+            "latitude": round(lat + rng.gauss(0, 0.02), 6),
+            "longitude": round(lon + rng.gauss(0, 0.02), 6),
+            "radius": rng.choice([10, 25, 50]),
+            "limit": 20,
+        }
+        if categories and rng.random() < 0.3:
+            params["category"] = rng.choice(categories)
+        return params
+
+    def export(self, path: str):
+        """Write villages and hubs as JSON lines (one record per line, tagged by entity)"""
+        created_at = datetime.now().isoformat()
+        with open(path, "w") as f:
+            for hub in range(len(self.hub_ids)):
+                f.write(json.dumps(dict(self.hub(hub), entity="hub", created_at=created_at)) + "\n")
+            for village in range(len(self.village_ids)):
+                f.write(json.dumps(dict(self.village(village), entity="village", created_at=created_at)) + "\n")
+
+def main():
+    """Generate a geography, report index performance and optionally export it"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Synthetic Geography Generator')
+    parser.add_argument('--villages', type=int, default=20000,
+                       help='Villages to generate')
+    parser.add_argument('--hubs', type=int, default=500,
+                       help='Hubs to place')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Random seed')
+    parser.add_argument('--queries', type=int, default=10000,
+                       help='Nearby queries to time')
+    parser.add_argument('--output', default=None,
+                       help='Write villages and hubs to this JSONL file')
+
+    args = parser.parse_args()
+    if not 1 <= args.hubs <= max_hubs(args.villages):
+        parser.error("--hubs must be at least 1 and at most --villages")
+
+    started = time.perf_counter()
+    geo = Geography.generate(args.villages, args.hubs, args.seed)
+    print(f"🗺️ Generated {len(geo):,} villages and {len(geo.hub_ids):,} hubs "
+          f"(nearest-hub assignment included) in {time.perf_counter() - started:.2f}s")
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    found = 0
+    for _ in range(args.queries):
+        params = geo.nearby_query(rng=rng)
+        found += len(geo.villages_within(params["latitude"], params["longitude"], params["radius"]))
+    elapsed = time.perf_counter() - started
+    print(f"📍 {args.queries:,} nearby queries in {elapsed:.2f}s ({args.queries / elapsed:,.0f}/s), "
+          f"{found / args.queries:.1f} villages in range on average")
+
+    distances = [geo.distance_to_hub(v) for v in range(len(geo))]
+    print(f"🏭 Village→hub distance: mean {sum(distances) / len(distances):.1f} km, max {max(distances):.1f} km")
+
+    if args.output:
+        geo.export(args.output)
+        print(f"💾 Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -12,15 +12,29 @@ from datetime import datetime, timedelta
 import threading
 from typing import Dict, List, Any
 
+from order_lifecycle import OrderLifecycleEngine, ORDER_STATES, HUB_STATUS_LABELS, VILLAGE_HUBS
+from hub_queue import ARRIVAL
+from aggregator import HUB_HANDLING_FEE
+from windows import TimeWindow
+from sim_log import CONSOLE
+
 class HubOperatorChartSimulator:
-    def __init__(self, base_url: str = "http://localhost:3000/api/v1", user_id: str = "hub_001"):
+    # Seconds between events when running on its own
+    think_seconds = (3, 5)
+
+    def __init__(self, base_url: str = "http://localhost:3000/api/v1", user_id: str = "hub_001", token_pool=None,
+                 order_engine: OrderLifecycleEngine = None, world=None, aggregator=None, queue_model=None,
+                 log=None):
         self.base_url = base_url
         self.user_id = user_id
+        self.log = (log if log is not None else CONSOLE).bind("hub_operator", user_id)
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Authorization': f'Bearer fake_token_{user_id}'
         })
+        if token_pool is not None:
+            token_pool.attach(self.session, user_id)
         
         # Initial data state
         self.total_orders_processed = 1250
@@ -63,20 +77,45 @@ class HubOperatorChartSimulator:
             {"name": "Distant Areas", "value": 10},
         ]
         
+        # Daily series are bucketed by date, so last week's Monday rolls out instead of piling up
+        clock = queue_model.clock if queue_model is not None else time.time
+        self.daily_orders_window = TimeWindow.daily(7, clock)
+        self.daily_orders_window.seed(day["value"] for day in self.daily_orders)
+        self.revenue_window = TimeWindow.daily(7, clock)
+        self.revenue_window.seed(day["value"] for day in self.revenue_by_day)
+        
+        # When shared with buyers, order statuses come from the lifecycle engine
+        self.world = world
+        if world is not None:
+            world.add_user(user_id, "hub_operator")
+            order_engine = world.orders
+        self.order_engine = order_engine
+        # Daily series come from the aggregator's per-hub per-day rollups
+        self.aggregator = aggregator
+        self.base_completed_orders = self.completed_orders
+        
+        # With a queueing model, arrivals, pickups and QC follow its event scheduler instead
+        self.queue_model = queue_model
+        self.base_orders_processed = self.total_orders_processed
+        self.queue_arrived = 0
+        self.queue_delivered = 0
+        if queue_model is not None:
+            queue_model.watch(user_id)
+        
         self.running = False
 
     def generate_new_order(self) -> Dict[str, Any]:
         """Generate a new order simulation"""
         products = ["Basmati Rice", "Fresh Onions", "Wheat", "Tomatoes", "Potatoes", "Carrots"]
         farmers = ["Rajesh Kumar", "Sunita Devi", "Amit Singh", "Priya Sharma", "Vikram Patel"]
-        villages = ["Khetri", "Rampur", "Bharatpur", "Alwar", "Jaipur"]
+        village = self.world.random_village() if self.world is not None else random.choice(list(VILLAGE_HUBS))
         
         return {
             "order_id": f"HUB_ORD_{int(time.time())}",
             "product_name": random.choice(products),
             "quantity": random.randint(50, 500),
             "farmer_name": random.choice(farmers),
-            "village_name": random.choice(villages),
+            "village_name": village,
             "status": "pending_pickup",
             "created_at": datetime.now().isoformat(),
             "pickup_date": (datetime.now() + timedelta(hours=random.randint(1, 24))).isoformat()
@@ -84,17 +123,64 @@ class HubOperatorChartSimulator:
 
     def update_daily_orders(self):
         """Update daily orders data"""
-        current_day = datetime.now().strftime("%a")
+        if self.queue_model is not None:
+            self.sync_from_queue()
+        elif self.aggregator is not None:
+            self.daily_orders = self.aggregator.daily_series(self.user_id, attribute="count")
+            return
         
-        # Find current day and update
-        for day_data in self.daily_orders:
-            if day_data["name"] == current_day:
-                # Add 1-5 new orders
-                day_data["value"] += random.randint(1, 5)
-                break
+        self.daily_orders = self.daily_orders_window.series()
+
+    def sync_from_engine(self):
+        """Derive order counters and status distribution from the lifecycle engine"""
+        counts = self.order_engine.status_counts(self.user_id)
+        self.pending_pickups = counts["confirmed"]
+        self.active_orders = counts["confirmed"] + counts["picked_up"] + counts["quality_checked"]
+        self.completed_orders = self.base_completed_orders + counts["delivered"]
+        self.order_status_distribution = [
+            {"name": HUB_STATUS_LABELS[state], "value": counts[state]} for state in ORDER_STATES
+        ]
+
+    def sync_from_queue(self):
+        """Run the queueing model up to its clock and take counters and charts from it"""
+        self.queue_model.advance()
+        counts = self.queue_model.counts(self.user_id)
+        stats = self.queue_model.hub_stats(self.user_id)
+        
+        # Orders count on the day they arrived, revenue on the day they were delivered
+        for kind, at, value in self.queue_model.take_events(self.user_id):
+            if kind == ARRIVAL:
+                self.daily_orders_window.add(at)
+            else:
+                self.hub_revenue += value
+                self.revenue_window.add(at, value)
+        self.queue_arrived = stats["arrived"]
+        self.queue_delivered = stats["delivered"]
+        
+        self.total_orders_processed = self.base_orders_processed + stats["arrived"]
+        self.pending_pickups = counts["confirmed"]
+        self.active_orders = counts["confirmed"] + counts["picked_up"] + counts["quality_checked"]
+        self.completed_orders = self.base_completed_orders + counts["delivered"]
+        self.order_status_distribution = [
+            {"name": HUB_STATUS_LABELS[state], "value": counts[state]} for state in ORDER_STATES
+        ]
+
+    def advance_engine_order(self, state: str):
+        """Move one of this hub's orders out of a state; returns the order or None"""
+        order = self.order_engine.advance_random(state, hub_id=self.user_id)
+        self.sync_from_engine()
+        return order
 
     def update_order_status_distribution(self):
         """Update order status distribution"""
+        if self.queue_model is not None:
+            self.sync_from_queue()
+            return
+        
+        if self.order_engine is not None:
+            self.sync_from_engine()
+            return
+        
         # Randomly move orders between statuses
         statuses = ["Pending Pickup", "In Transit", "Quality Check", "Delivered"]
         
@@ -106,18 +192,24 @@ class HubOperatorChartSimulator:
 
     def update_revenue_by_day(self):
         """Update revenue by day"""
-        current_day = datetime.now().strftime("%a")
+        if self.queue_model is not None:
+            self.sync_from_queue()
+        elif self.aggregator is not None:
+            self.revenue_by_day = self.aggregator.daily_series(self.user_id, scale=HUB_HANDLING_FEE)
+            return
         
-        # Find current day and update
-        for day_data in self.revenue_by_day:
-            if day_data["name"] == current_day:
-                # Add revenue from new orders
-                revenue_increase = random.randint(500, 2000)
-                day_data["value"] += revenue_increase
-                break
+        self.revenue_by_day = self.revenue_window.series()
 
     def update_farmer_distribution(self):
         """Update farmer distribution"""
+        # With a geography, farmers are banded by their village's distance to this hub
+        if self.world is not None:
+            catchment = self.world.farmer_catchment(self.user_id)
+            if catchment is not None:
+                for farmer_data, count in zip(self.farmer_distribution, catchment):
+                    farmer_data["value"] = count
+                return
+        
         # Slight variations in farmer distribution
         for farmer_data in self.farmer_distribution:
             variation = random.uniform(-0.02, 0.03)
@@ -126,33 +218,54 @@ class HubOperatorChartSimulator:
 
     def simulate_new_order_arrival(self):
         """Simulate a new order arriving at the hub"""
-        order = self.generate_new_order()
-        self.total_orders_processed += 1
-        self.active_orders += 1
-        self.pending_pickups += 1
+        if self.queue_model is not None:
+            arrived = self.queue_arrived
+            self.sync_from_queue()
+            if self.queue_arrived > arrived:
+                self.log.info("new_order", "📦 {count} new order(s) arrived, pending pickup: {pending}",
+                              count=self.queue_arrived - arrived, pending=self.pending_pickups)
+            return
         
-        # Update farmer distribution based on village
-        village = order["village_name"]
-        if village in ["Khetri", "Rampur"]:  # Local villages
-            for farmer_dist in self.farmer_distribution:
-                if farmer_dist["name"] == "Local Farmers":
-                    farmer_dist["value"] = min(80, farmer_dist["value"] + 1)
-                    break
-        elif village in ["Bharatpur", "Alwar"]:  # Nearby villages
-            for farmer_dist in self.farmer_distribution:
-                if farmer_dist["name"] == "Nearby Villages":
-                    farmer_dist["value"] = min(30, farmer_dist["value"] + 1)
-                    break
-        else:  # Distant areas
-            for farmer_dist in self.farmer_distribution:
-                if farmer_dist["name"] == "Distant Areas":
-                    farmer_dist["value"] = min(15, farmer_dist["value"] + 1)
-                    break
+        if self.world is not None:
+            # A buyer in the world buys a listing at this hub, so the farmer's earnings and admin totals move too
+            listing = self.world.random_active_listing(hub_id=self.user_id)
+            buyer = self.world.random_user("buyer")
+            if listing is None or buyer is None:
+                return
+            purchase = self.world.purchase(buyer, listing, quantity=random.randint(50, 500))
+            if purchase is None:
+                return
+            order = self.generate_new_order()
+            order.update(product_name=purchase["product_name"], quantity=purchase["quantity"],
+                         farmer_name=purchase["farmer_id"], village_name=purchase["village"])
+        else:
+            order = self.generate_new_order()
+        self.total_orders_processed += 1
+        self.daily_orders_window.add(time.time())
+        if self.world is not None:
+            self.sync_from_engine()
+        elif self.order_engine is not None:
+            self.order_engine.create("marketplace", order["farmer_name"], self.user_id,
+                                     order["quantity"] * random.randint(20, 60))
+            self.sync_from_engine()
+        else:
+            self.active_orders += 1
+            self.pending_pickups += 1
         
-        print(f"📦 New order arrived: {order['product_name']} from {order['farmer_name']}")
+        self.log.info("new_order", "📦 New order arrived: {product} from {farmer}", product=order['product_name'],
+                      farmer=order['farmer_name'])
 
     def simulate_order_pickup(self):
         """Simulate picking up an order"""
+        if self.queue_model is not None:
+            self.sync_from_queue()
+            return
+        
+        if self.order_engine is not None:
+            if random.random() < 0.4 and self.advance_engine_order("confirmed"):
+                self.log.info("order_picked_up", "🚚 Order picked up! Pending: {pending}", pending=self.pending_pickups)
+            return
+        
         if self.pending_pickups > 0:
             if random.random() < 0.4:  # 40% chance
                 self.pending_pickups -= 1
@@ -162,10 +275,30 @@ class HubOperatorChartSimulator:
                         status_data["value"] += 1
                         break
                 
-                print(f"🚚 Order picked up! Pending: {self.pending_pickups}")
+                self.log.info("order_picked_up", "🚚 Order picked up! Pending: {pending}", pending=self.pending_pickups)
 
     def simulate_order_delivery(self):
         """Simulate delivering an order"""
+        if self.queue_model is not None:
+            delivered = self.queue_delivered
+            self.sync_from_queue()
+            if self.queue_delivered > delivered:
+                self.log.info("order_delivered", "✅ {count} order(s) delivered, Completed: {completed}",
+                              count=self.queue_delivered - delivered, completed=self.completed_orders)
+            return
+        
+        if self.order_engine is not None:
+            if random.random() < 0.3:
+                order = self.advance_engine_order("quality_checked")
+                if order:
+                    # Hub earns a handling fee on the delivered order value
+                    revenue = max(200, order["total_amount"] // 50)
+                    self.hub_revenue += revenue
+                    self.revenue_window.add(time.time(), revenue)
+                    self.log.info("order_delivered", "✅ Order delivered! Revenue: ₹{revenue}, Completed: {completed}",
+                                  revenue=revenue, completed=self.completed_orders)
+            return
+        
         if self.active_orders > 0:
             if random.random() < 0.3:  # 30% chance
                 self.active_orders -= 1
@@ -174,6 +307,7 @@ class HubOperatorChartSimulator:
                 # Generate revenue
                 revenue = random.randint(200, 1000)
                 self.hub_revenue += revenue
+                self.revenue_window.add(time.time(), revenue)
                 
                 # Update status distribution
                 for status_data in self.order_status_distribution:
@@ -181,10 +315,20 @@ class HubOperatorChartSimulator:
                         status_data["value"] += 1
                         break
                 
-                print(f"✅ Order delivered! Revenue: ₹{revenue}, Completed: {self.completed_orders}")
+                self.log.info("order_delivered", "✅ Order delivered! Revenue: ₹{revenue}, Completed: {completed}",
+                              revenue=revenue, completed=self.completed_orders)
 
     def simulate_quality_check(self):
         """Simulate quality check process"""
+        if self.queue_model is not None:
+            self.sync_from_queue()
+            return
+        
+        if self.order_engine is not None:
+            if random.random() < 0.25 and self.advance_engine_order("picked_up"):
+                self.log.info("quality_check", "🔍 Quality check in progress")
+            return
+        
         if self.active_orders > 0 and random.random() < 0.25:  # 25% chance
             # Move order to quality check
             for status_data in self.order_status_distribution:
@@ -192,7 +336,7 @@ class HubOperatorChartSimulator:
                     status_data["value"] += 1
                     break
             
-            print(f"🔍 Quality check in progress")
+            self.log.info("quality_check", "🔍 Quality check in progress")
 
     def send_analytics_update(self):
         """Send updated analytics data to the API"""
@@ -227,12 +371,27 @@ class HubOperatorChartSimulator:
             )
             
             if response.status_code in [200, 201]:
-                print(f"✅ Analytics updated for hub operator {self.user_id}")
+                self.log.info("analytics_updated", "✅ Analytics updated for hub operator {user}", user=self.user_id)
             else:
-                print(f"⚠️ Analytics update failed: {response.status_code}")
+                self.log.warning("analytics_failed", "⚠️ Analytics update failed: {status}", status=response.status_code)
                 
         except requests.exceptions.RequestException as e:
-            print(f"❌ Network error: {e}")
+            self.log.error("network_error", "❌ Network error: {error}", error=e)
+
+    def run_event(self):
+        """Trigger one event from the hub operator dashboard mix"""
+        event_probability = random.random()
+
+        if event_probability < 0.3:  # 30% chance - new order arrival
+            self.simulate_new_order_arrival()
+        elif event_probability < 0.5:  # 20% chance - order pickup
+            self.simulate_order_pickup()
+        elif event_probability < 0.7:  # 20% chance - order delivery
+            self.simulate_order_delivery()
+        elif event_probability < 0.8:  # 10% chance - quality check
+            self.simulate_quality_check()
+        else:  # 20% chance - analytics update
+            self.send_analytics_update()
 
     def run_simulation(self, duration_minutes: int = 10):
         """Run the simulation for specified duration"""
@@ -247,27 +406,16 @@ class HubOperatorChartSimulator:
         while self.running and time.time() < end_time:
             try:
                 # Randomly trigger different events
-                event_probability = random.random()
-                
-                if event_probability < 0.3:  # 30% chance - new order arrival
-                    self.simulate_new_order_arrival()
-                elif event_probability < 0.5:  # 20% chance - order pickup
-                    self.simulate_order_pickup()
-                elif event_probability < 0.7:  # 20% chance - order delivery
-                    self.simulate_order_delivery()
-                elif event_probability < 0.8:  # 10% chance - quality check
-                    self.simulate_quality_check()
-                else:  # 20% chance - analytics update
-                    self.send_analytics_update()
+                self.run_event()
                 
                 # Wait 3-5 seconds before next event
-                time.sleep(random.uniform(3, 5))
+                time.sleep(random.uniform(*self.think_seconds))
                 
             except KeyboardInterrupt:
                 print("\n🛑 Simulation stopped by user")
                 break
             except Exception as e:
-                print(f"❌ Error in simulation: {e}")
+                self.log.error("simulation_error", "❌ Error in simulation: {error}", error=e)
                 time.sleep(1)
         
         print(f"✅ Hub operator simulation completed after {duration_minutes} minutes")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Simulator Instrumentation
+Wraps simulator event methods and HTTP sessions once and reports each event and request to observers
+"""
+
+import re
+import threading
+import time
+from typing import Dict, List, Any
+from urllib.parse import urlsplit
+
+from metrics import Counter
+
+# Path segments holding IDs (any digit) collapse so endpoints group: /orders/ORD_12 → /orders/:id
+ID_SEGMENT = re.compile(r"/[^/]*\d[^/]*")
+# Methods that make up a simulator's event mix
+EVENT_METHOD = re.compile(r"^(simulate_\w+|send_analytics_update)$")
+
+def endpoint_of(url: str, base_path: str = "") -> str:
+    path = urlsplit(url).path
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):]
+    return ID_SEGMENT.sub("/:id", path) or "/"
+
+class Instrumentation:
+    """Fans simulator activity out to observers (event log, metrics, ...)
+
+    Observers implement:
+    - `event(role, user_id, name, started, latency_ms)` after each event method;
+    - `request(role, user_id, event_type, endpoint, started, latency_ms, status, size)`
+      after each HTTP request. Status is 0 when the request failed without a
+      response.
+    Requests are tagged with the event method running on the same thread.
+    `in_flight` counts requests started but not finished, per role, from
+    two sharded counters so the request path takes no lock.
+    """
+
+    def __init__(self, base_url: str = ""):
+        self.base_path = urlsplit(base_url).path.rstrip("/")
+        self.observers: List[Any] = []
+        self.current = threading.local()
+        self.roles: List[str] = []
+        self.started = Counter("simulator_requests_started_total", "HTTP requests started", ("role",))
+        self.finished = Counter("simulator_requests_finished_total", "HTTP requests finished", ("role",))
+
+    def add(self, observer: Any):
+        self.observers.append(observer)
+
+    def instrument(self, simulator: Any, role: str):
+        """Wrap a simulator's event methods (on the instance) and its session.request"""
+        if role not in self.roles:
+            self.roles.append(role)
+        for name in dir(simulator):
+            if EVENT_METHOD.match(name):
+                setattr(simulator, name, self._wrap_event(getattr(simulator, name), role, simulator.user_id, name))
+        simulator.session.request = self._wrap_request(simulator.session.request, role, simulator.user_id)
+
+    @property
+    def in_flight(self) -> Dict[str, int]:
+        # Finished first: a request that ends between the two reads is then counted in both, never only in finished
+        finished = self.finished.values
+        started = self.started.values
+        return {role: started.get((role,), 0) - finished.get((role,), 0) for role in self.roles}
+
+    def _wrap_event(self, method, role: str, user_id: str, name: str):
+        current = self.current
+        observers = self.observers
+
+        def wrapper(*args, **kwargs):
+            started = time.time()
+            t0 = time.perf_counter()
+            outer, current.event = getattr(current, "event", None), name
+            try:
+                return method(*args, **kwargs)
+            finally:
+                current.event = outer
+                latency_ms = (time.perf_counter() - t0) * 1000
+                for observer in observers:
+                    observer.event(role, user_id, name, started, latency_ms)
+
+        wrapper.__name__ = name
+        return wrapper
+
+    def _wrap_request(self, send, role: str, user_id: str):
+        current = self.current
+        observers = self.observers
+        base_path = self.base_path
+        labels = (role,)
+        started_count = self.started.inc
+        finished_count = self.finished.inc
+
+        def request(method, url, *args, **kwargs):
+            started = time.time()
+            t0 = time.perf_counter()
+            event_type = getattr(current, "event", None) or method
+            endpoint = f"{method} {endpoint_of(url, base_path)}"
+            status, size = 0, 0
+            try:
+                started_count(labels)
+                response = send(method, url, *args, **kwargs)
+                body = response.request.body
+                status = response.status_code
+                size = len(response.content or b"") + (len(body) if body else 0)
+                return response
+            finally:
+                finished_count(labels)
+                latency_ms = (time.perf_counter() - t0) * 1000
+                for observer in observers:
+                    observer.request(role, user_id, event_type, endpoint, started, latency_ms, status, size)
+
+        return request
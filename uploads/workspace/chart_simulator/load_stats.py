@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Load Test Statistics Helpers
+Thread-safe latency recording and percentile summaries for load scenarios
+"""
+
+import math
+import statistics
+import threading
+import time
+from typing import Dict, List, Any, Iterable, Optional
+
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+# Run latencies are counted in log buckets: bucket i holds latencies up to
+# LATENCY_FLOOR_MS * LATENCY_GROWTH ** i, so reported values are within 2%
+LATENCY_FLOOR_MS = 0.05
+LATENCY_GROWTH = 1.02
+LATENCY_BUCKETS = 1024
+
+def latency_bucket(latency_ms: float) -> int:
+    if latency_ms <= LATENCY_FLOOR_MS:
+        return 0
+    return min(LATENCY_BUCKETS - 1, math.ceil(math.log(latency_ms / LATENCY_FLOOR_MS) / math.log(LATENCY_GROWTH)))
+
+def summarize_buckets(counts: Dict[int, int], percentiles=DEFAULT_PERCENTILES) -> Dict[str, Any]:
+    """Like summarize() for {latency bucket: count}, each value at its bucket's top
+
+    Also gives a distribution-free ~95% confidence interval for p99 from the
+    binomial ranks around it, as p99_low_ms and p99_high_ms.
+    """
+    ordered = sorted(counts.items())
+    total = sum(counts.values())
+    summary = {"count": total}
+    if not total:
+        return summary
+
+    def at_rank(rank: int) -> float:
+        seen = 0
+        for bucket, count in ordered:
+            seen += count
+            if seen >= rank:
+                return round(LATENCY_FLOOR_MS * LATENCY_GROWTH ** bucket, 2)
+        return round(LATENCY_FLOOR_MS * LATENCY_GROWTH ** ordered[-1][0], 2)
+
+    summary["min_ms"] = at_rank(1)
+    summary["mean_ms"] = round(sum(LATENCY_FLOOR_MS * LATENCY_GROWTH ** bucket * count
+                                   for bucket, count in ordered) / total, 2)
+    summary["max_ms"] = at_rank(total)
+    for pct in percentiles:
+        summary[f"p{pct}_ms"] = at_rank(max(1, int(math.ceil(pct / 100.0 * total))))
+    spread = 1.96 * math.sqrt(total * 0.99 * 0.01)
+    summary["p99_low_ms"] = at_rank(max(1, int(math.floor(total * 0.99 - spread))))
+    summary["p99_high_ms"] = at_rank(min(total, int(math.ceil(total * 0.99 + spread)) + 1))
+    return summary
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(math.ceil(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def summarize(values: Iterable[float], percentiles=DEFAULT_PERCENTILES) -> Dict[str, Any]:
+    """Summarize a series of latencies (seconds) as milliseconds"""
+    ordered = sorted(values)
+    summary = {"count": len(ordered)}
+    if not ordered:
+        return summary
+
+    summary["min_ms"] = round(ordered[0] * 1000, 2)
+    summary["mean_ms"] = round(sum(ordered) / len(ordered) * 1000, 2)
+    summary["max_ms"] = round(ordered[-1] * 1000, 2)
+    for pct in percentiles:
+        summary[f"p{pct}_ms"] = round(percentile(ordered, pct) * 1000, 2)
+    return summary
+
+def rate_summary(rates: List[float]) -> Dict[str, Any]:
+    """Median, mean, sample stdev and count of a series of per-interval rates"""
+    if not rates:
+        return {"n": 0, "median": 0.0, "mean": 0.0, "stdev": 0.0}
+    return {
+        "n": len(rates),
+        "median": round(statistics.median(rates), 3),
+        "mean": round(statistics.fmean(rates), 3),
+        "stdev": round(statistics.stdev(rates), 3) if len(rates) > 1 else 0.0,
+    }
+
+def steady_state_start(series: List[List[Optional[float]]], window: int, tolerance: float = 0.1,
+                       earliest: int = 0) -> Optional[int]:
+    """First index from which every series holds steady over `window` values, or None if they never settle
+
+    The window is cut into quarters, and the first quarter has to agree with
+    each of the other three. Two quarters agree when their means differ by at
+    most `tolerance` of their mean or twice the standard error of the
+    difference, whichever is larger, so Poisson noise in quiet runs does not
+    read as a trend. None values (seconds without requests) are left out, and
+    quarters with fewer than two values are not evidence either way.
+    """
+    quarter = max(2, window // 4)
+    sums = []
+    for values in series:
+        count, total, squares = [0], [0.0], [0.0]
+        for value in values:
+            present = value is not None
+            count.append(count[-1] + present)
+            total.append(total[-1] + (value if present else 0.0))
+            squares.append(squares[-1] + (value * value if present else 0.0))
+        sums.append((count, total, squares))
+
+    def moments(count, total, squares, start):
+        end = start + quarter
+        n = count[end] - count[start]
+        if n < 2:
+            return None
+        mean = (total[end] - total[start]) / n
+        variance = max(0.0, (squares[end] - squares[start]) / n - mean * mean) * n / (n - 1)
+        return mean, variance / n
+
+    def steady(sum_, start):
+        first = moments(*sum_, start)
+        if first is None:
+            return True
+        for later in range(1, 4):
+            other = moments(*sum_, start + later * quarter)
+            if other is None:
+                continue
+            limit = max(tolerance * (first[0] + other[0]) / 2, 2 * math.sqrt(first[1] + other[1]))
+            if abs(first[0] - other[0]) > limit:
+                return False
+        return True
+
+    length = min(len(values) for values in series) if series else 0
+    for start in range(earliest, length - 4 * quarter + 1):
+        if all(steady(sum_, start) for sum_ in sums):
+            return start
+    return None
+
+class LatencyRecorder:
+    """Collects latency samples and outcome counters per named series"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+        self._outcomes: Dict[str, Dict[str, int]] = {}
+
+    def record(self, series: str, latency: float, outcome: str = "ok"):
+        """Record one sample for a series together with its outcome"""
+        with self._lock:
+            self._samples.setdefault(series, []).append(latency)
+            outcomes = self._outcomes.setdefault(series, {})
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    def count_outcome(self, series: str, outcome: str):
+        """Count an outcome that has no meaningful latency (e.g. network error)"""
+        with self._lock:
+            outcomes = self._outcomes.setdefault(series, {})
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    def samples(self, series: str) -> List[float]:
+        """Copy of the raw samples for a series"""
+        with self._lock:
+            return list(self._samples.get(series, []))
+
+    def report(self) -> Dict[str, Any]:
+        """Per-series latency summary and outcome counts"""
+        with self._lock:
+            series_names = sorted(set(self._samples) | set(self._outcomes))
+            snapshot = {
+                name: (list(self._samples.get(name, [])), dict(self._outcomes.get(name, {})))
+                for name in series_names
+            }
+
+        return {
+            name: {"latency": summarize(samples), "outcomes": outcomes}
+            for name, (samples, outcomes) in snapshot.items()
+        }
+
+class RunRecorder:
+    """Instrumentation observer that buckets a load run by second for throughput and latency results
+
+    Events, requests, errors and total request latency are counted per
+    second since the recorder started. Request latencies are also counted
+    per endpoint and second in log buckets (see latency_bucket), so memory
+    grows with the seconds and the spread of latencies, not with the number
+    of requests, and multi-hour soaks stay small.
+    `summary(start, end)` reports only the seconds in that range, which lets
+    a run leave out its warmup; `steady_state` finds where the warmup ends.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.seconds: Dict[int, Dict[str, int]] = {}
+        # endpoint -> {second * LATENCY_BUCKETS + bucket: count}
+        self.latencies: Dict[str, Dict[int, int]] = {}
+
+    def reset(self):
+        """Forget everything recorded and count seconds from now"""
+        with self._lock:
+            self.started = time.time()
+            self.seconds = {}
+            self.latencies = {}
+
+    def _second(self, ts: float) -> Dict[str, int]:
+        second = int(ts - self.started)
+        bucket = self.seconds.get(second)
+        if bucket is None:
+            bucket = self.seconds[second] = {"events": 0, "requests": 0, "errors": 0, "latency": 0.0}
+        return bucket
+
+    def event(self, role: str, user_id: str, name: str, started: float, latency_ms: float):
+        with self._lock:
+            self._second(started)["events"] += 1
+
+    def request(self, role: str, user_id: str, event_type: str, endpoint: str, started: float,
+                latency_ms: float, status: int, size: int):
+        with self._lock:
+            bucket = self._second(started)
+            bucket["requests"] += 1
+            if status == 0 or status >= 400:
+                bucket["errors"] += 1
+            bucket["latency"] += latency_ms / 1000
+            key = int(started - self.started) * LATENCY_BUCKETS + latency_bucket(latency_ms)
+            counts = self.latencies.setdefault(endpoint, {})
+            counts[key] = counts.get(key, 0) + 1
+
+    def elapsed(self) -> int:
+        """Whole seconds recorded so far"""
+        return int(time.time() - self.started)
+
+    def series(self, name: str, start: int = 0, end: Optional[int] = None) -> List[int]:
+        """Per-second counts of events, requests or errors, with empty seconds as zero"""
+        end = self.elapsed() if end is None else end
+        with self._lock:
+            return [self.seconds.get(second, {}).get(name, 0) for second in range(start, end)]
+
+    def latency_series(self, start: int = 0, end: Optional[int] = None) -> List[Optional[float]]:
+        """Per-second mean request latency in seconds, None for seconds without requests"""
+        end = self.elapsed() if end is None else end
+        with self._lock:
+            buckets = [self.seconds.get(second) for second in range(start, end)]
+        return [bucket["latency"] / bucket["requests"] if bucket and bucket["requests"] else None
+                for bucket in buckets]
+
+    def steady_state(self, window: int = 60, tolerance: float = 0.1, earliest: int = 0,
+                     end: Optional[int] = None) -> Optional[int]:
+        """First second from which events/sec and mean latency both hold steady over `window` seconds"""
+        end = self.elapsed() if end is None else end
+        series = [self.series("events", 0, end), self.latency_series(0, end)]
+        if not any(value is not None for value in series[1]):
+            series.pop()  # no requests (or none answered): throughput alone
+        return steady_state_start(series, window, tolerance, earliest)
+
+    def summary(self, start: int = 0, end: Optional[int] = None) -> Dict[str, Any]:
+        """Throughput per second and latency percentiles per endpoint over seconds [start, end)"""
+        end = self.elapsed() if end is None else end
+        low, high = start * LATENCY_BUCKETS, end * LATENCY_BUCKETS
+        latencies: Dict[str, Dict[int, int]] = {}
+        with self._lock:
+            for endpoint, counts in self.latencies.items():
+                merged = latencies[endpoint] = {}
+                for key, count in counts.items():
+                    if low <= key < high:
+                        bucket = key % LATENCY_BUCKETS
+                        merged[bucket] = merged.get(bucket, 0) + count
+        throughput = {name: rate_summary(self.series(name, start, end)) for name in ("events", "requests")}
+        errors = sum(self.series("errors", start, end))
+        latency = {endpoint: summarize_buckets(counts) for endpoint, counts in sorted(latencies.items()) if counts}
+        return {"window": {"start": start, "end": end}, "throughput": throughput, "errors": errors,
+                "latency": latency}
@@ -9,35 +9,300 @@ import threading
 import time
 import signal
 import sys
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 # Import all simulators
 from buyer_simulator import BuyerChartSimulator
 from farmer_simulator import FarmerChartSimulator
 from admin_simulator import AdminChartSimulator
 from hub_simulator import HubOperatorChartSimulator
-from shg_simulator import SHGLeaderChartSimulator
+from shg_simulator import SHGLeaderChartSimulator, LOAN_CLOCK_SPEED
+from token_pool import TokenPool
+from world_model import WorldModel
+from aggregator import IncrementalAggregator
+from loan_ledger import LoanLedger
+from hub_queue import HubQueueModel
+from clock import SimulatedClock
+from geography import Geography, max_hubs
+from price_model import PriceModel
+from event_log import EventLog
+from instrumentation import Instrumentation
+from metrics import SimulatorMetrics, MetricsServer
+from sim_log import SimLog, AsyncLog, parse_sample_rates
+from profiler import Profiler
+from trace_export import TraceRecorder
+from load_stats import RunRecorder
+from results_store import ResultsStore, load_result, memory_current_kib
+from scenario import Scenario, ScenarioRunner, load_scenario, format_duration
+from world_model import ROLES
+
+# Role recorded for each simulator type in logs and metrics
+SIMULATOR_ROLES = {"buyer": "buyer", "farmer": "farmer", "admin": "admin", "hub": "hub_operator", "shg": "shg_leader"}
+SIMULATOR_CLASSES = {
+    "buyer": BuyerChartSimulator,
+    "farmer": FarmerChartSimulator,
+    "admin": AdminChartSimulator,
+    "hub": HubOperatorChartSimulator,
+    "shg": SHGLeaderChartSimulator,
+}
 
 class ChartSimulatorOrchestrator:
-    def __init__(self, base_url: str = "http://localhost:3000/api/v1"):
+    def __init__(self, base_url: str = "http://localhost:3000/api/v1", token_pool: TokenPool = None,
+                 world_users: int = 1000, history_days: int = 180, queue_hubs: int = 0,
+                 queue_speed: float = 60.0, villages: int = 0, hubs: int = 200, event_log: EventLog = None,
+                 metrics_interval: float = 1.0, metrics_port: int = 0, log: SimLog = None,
+                 profiler: Profiler = None, tracer: TraceRecorder = None, results: ResultsStore = None,
+                 run_name: str = "", warmup: Optional[float] = None, steady_window: int = 60,
+                 steady_tolerance: float = 0.1):
         self.base_url = base_url
+        self.token_pool = token_pool
         self.simulators: List[Any] = []
         self.threads: List[threading.Thread] = []
         self.running = False
+        # Simulator messages go through one shared log (printed directly when none is given)
+        self.log = log
+        
+        # All roles read and write one world, so a purchase shows up as farmer
+        # earnings, a hub order and admin transactions at the same time
+        # Optionally spread the world over thousands of generated villages and hubs
+        self.geography = Geography.generate(villages, hubs) if villages > 0 else None
+        self.world = WorldModel(geography=self.geography)
+        # Subscribed before seeding so the rollups include the seeded history
+        self.aggregator = IncrementalAggregator()
+        self.world.subscribe(self.aggregator.consume)
+        # Mandi prices for the whole run, generated once and shared by listings, bids and purchases
+        self.price_model = PriceModel(history_days=max(history_days, 1))
+        self.world.populate(world_users, history_days=history_days, price_model=self.price_model)
+        
+        # One loan book for every SHG in the world, plus the leader simulator's own group, on one loan clock:
+        # every SHG user ticks the same ledger, so they must agree on the date
+        self.loan_clock = SimulatedClock(speed=LOAN_CLOCK_SPEED)
+        self.loan_ledger = LoanLedger()
+        self.loan_ledger.seed(self.world.shgs.keys + ["shg_001"], now=self.loan_clock())
+        
+        # Optional queueing model for many hubs on a sped-up clock; hub_001 is the simulated operator's hub
+        self.queue_model = None
+        if queue_hubs > 0:
+            hub_ids = [f"hub_{i + 1:03d}" for i in range(queue_hubs)]
+            self.queue_model = HubQueueModel(hub_ids, clock=SimulatedClock(speed=queue_speed))
         
         # Initialize all simulators
-        self.simulators = [
-            BuyerChartSimulator(base_url, "buyer_001"),
-            FarmerChartSimulator(base_url, "farmer_001"),
-            AdminChartSimulator(base_url, "admin_001"),
-            HubOperatorChartSimulator(base_url, "hub_001"),
-            SHGLeaderChartSimulator(base_url, "shg_001")
-        ]
+        self.simulators = [self.make_simulator(simulator_type, f"{simulator_type}_001", token_pool)
+                           for simulator_type in SIMULATOR_ROLES]
+        # Scenario runs grow each role into a pool of virtual users around these
+        self.scenario: Optional[Scenario] = None
+        self.scenario_runner: Optional[ScenarioRunner] = None
+        
+        # Every event and request goes to the optional columnar log and /metrics endpoint
+        self.instrumentation = Instrumentation(base_url)
+        self.event_log = event_log
+        self.metrics_interval = metrics_interval
+        self.cpu_sample = (time.time(), time.process_time())
+        if event_log is not None:
+            self.instrumentation.add(event_log)
+        self.tracer = tracer
+        if tracer is not None:
+            self.instrumentation.add(tracer)
+        # Throughput and latency per second for the stored run result
+        self.results = results
+        self.run_name = run_name
+        self.recorder = RunRecorder()
+        # Seconds left out of the stored result: explicit, or detected from when throughput and latency settle
+        self.warmup = warmup
+        self.steady_window = steady_window
+        self.steady_tolerance = steady_tolerance
+        self.first_finished: Optional[float] = None
+        self.run_config: Dict[str, Any] = {"url": base_url, "worldUsers": world_users, "historyDays": history_days,
+                                           "queueHubs": queue_hubs, "villages": villages}
+        if results is not None:
+            self.instrumentation.add(self.recorder)
+        self.metrics = None
+        self.metrics_server = None
+        if metrics_port:
+            self.metrics = SimulatorMetrics()
+            self.watch_metrics(self.metrics)
+            self.instrumentation.add(self.metrics)
+            self.metrics_server = MetricsServer(self.metrics.registry, metrics_port)
+            self.metrics_server.start()
+            print(f"📡 Metrics at {self.metrics_server.url}")
+        if self.instrumentation.observers:
+            for role, simulator in zip(SIMULATOR_ROLES.values(), self.simulators):
+                self.instrumentation.instrument(simulator, role)
+        
+        # Optional CPU sampling, allocation snapshots and per-method timing
+        self.profiler = profiler
+        if profiler is not None:
+            for role, simulator in zip(SIMULATOR_ROLES.values(), self.simulators):
+                profiler.instrument(simulator, role)
         
         # Setup signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
 
+    def make_simulator(self, simulator_type: str, user_id: str, token_pool: TokenPool = None) -> Any:
+        """A simulator wired to the shared world and the rollups, queue model, prices or loan book it uses"""
+        extra = {}
+        if simulator_type in ("admin", "hub"):
+            extra.update(aggregator=self.aggregator)
+        if simulator_type == "hub" and self.queue_model is not None and user_id in self.queue_model.hub_index:
+            # Hubs past --queue-hubs are not in the model and run on the lifecycle engine instead
+            extra.update(queue_model=self.queue_model)
+        if simulator_type == "shg":
+            extra.update(loan_ledger=self.loan_ledger, loan_clock=self.loan_clock)
+        if simulator_type in ("buyer", "farmer"):
+            extra.update(price_model=self.price_model)
+        return SIMULATOR_CLASSES[simulator_type](self.base_url, user_id, token_pool, world=self.world, log=self.log,
+                                                 **extra)
+
+    def add_virtual_user(self, role: str, number: int) -> Any:
+        """Simulator for the scenario's `number`-th user of a role, instrumented like the built-in ones"""
+        simulator_type = next(key for key, value in SIMULATOR_ROLES.items() if value == role)
+        user_id = f"{simulator_type}_{number:03d}"
+        simulator = self.make_simulator(simulator_type, user_id)
+        if self.token_pool is not None:
+            # Users without an identity of their own share their role's first login
+            identity = user_id if user_id in self.token_pool.identities else f"{simulator_type}_001"
+            self.token_pool.attach(simulator.session, identity)
+        if self.instrumentation.observers:
+            self.instrumentation.instrument(simulator, role)
+        if self.profiler is not None:
+            self.profiler.instrument(simulator, role)
+        return simulator
+
+    def watch_metrics(self, metrics: SimulatorMetrics):
+        """Scrape-time gauges: in-flight requests, simulated users, running simulators and queue depths"""
+        metrics.watch_in_flight(self.instrumentation)
+        metrics.watch("simulator_world_users", "Simulated users in the shared world", ("role",),
+                      lambda: {(role,): self.world.user_count(role) for role in ROLES})
+        metrics.watch("simulator_running_threads", "Simulator threads still running", (),
+                      lambda: {(): sum(thread.is_alive() for thread in self.threads)})
+        metrics.watch("simulator_world_active_listings", "Active listings in the shared world", (),
+                      lambda: {(): self.world.active_listing_count()})
+        metrics.watch("simulator_world_orders_in_flight", "Undelivered orders in the lifecycle engine", (),
+                      lambda: {(): len(self.world.orders)})
+        if self.queue_model is not None:
+            def queue_depths():
+                backlog = self.queue_model.backlog_summary()
+                return {("in_system",): backlog["inSystem"], ("pending_pickup",): backlog["pendingPickup"]}
+            metrics.watch("simulator_hub_queue_orders", "Orders in the hub queueing model", ("state",), queue_depths)
+        metrics.watch("simulator_virtual_users", "Active scenario users per role", ("role",),
+                      lambda: {(role,): count for role, count in self.scenario_runner.active_users().items()}
+                      if self.scenario_runner is not None else {})
+        if self.event_log is not None:
+            metrics.watch("simulator_event_log_pending_batches", "Row groups waiting for the event log writer", (),
+                          lambda: {(): self.event_log.backlog()})
+
+    def sample_metrics(self):
+        """Record world, aggregator, queue and load-generator process gauges in the event log"""
+        now = time.time()
+        cpu = time.process_time()
+        since, before = self.cpu_sample
+        self.cpu_sample = (now, cpu)
+        self.event_log.metric("client.cpuPercent", (cpu - before) / max(now - since, 1e-9) * 100, now)
+        memory = memory_current_kib()
+        if memory is not None:
+            self.event_log.metric("client.rssMiB", memory / 1024, now)
+        self.event_log.metric("client.requestsInFlight", sum(self.instrumentation.in_flight.values()), now)
+        if self.scenario_runner is not None:
+            active = self.scenario_runner.active_users()
+            self.event_log.metric("scenario.users", sum(active.values()), now)
+            self.event_log.metric("scenario.phase", self.scenario_runner.phase_index + 1, now)
+            for role, count in active.items():
+                self.event_log.metric(f"scenario.users.{role}", count, now)
+        for name, value in self.world.stats().items():
+            self.event_log.metric(f"world.{name}", value, now)
+        self.event_log.metric("aggregator.eventsConsumed", self.aggregator.events_consumed, now)
+        if self.queue_model is not None:
+            backlog = self.queue_model.backlog_summary()
+            for name in ("inSystem", "pendingPickup", "delivered"):
+                self.event_log.metric(f"queue.{name}", backlog[name], now)
+
+    def metrics_loop(self):
+        while self.running:
+            self.sample_metrics()
+            time.sleep(self.metrics_interval)
+
+    def measured_window(self) -> Dict[str, Any]:
+        """Seconds of the run that count: after the warmup, up to when the first simulator finished"""
+        end = self.recorder.elapsed()
+        if self.first_finished is not None:
+            end = min(end, max(1, int(self.first_finished - self.recorder.started)))
+        # Simulators start a second apart, so load is not complete before the last one is running
+        ramp = max(0, len(self.threads) - 1)
+        if self.warmup is not None:
+            start, warmup = int(self.warmup), "explicit"
+        elif self.scenario is not None:
+            # Load changes on purpose: the stages below carry the per-level numbers
+            start, warmup = 0, "scenario"
+        else:
+            start = self.recorder.steady_state(self.steady_window, self.steady_tolerance, ramp, end)
+            warmup = "detected"
+            if start is None:
+                start, warmup = ramp, "undetected"
+        start = min(start, max(0, end - 1))
+        return {"start": start, "end": end, "warmup": warmup, "steadyWindow": self.steady_window,
+                "steadyTolerance": self.steady_tolerance}
+
+    def save_results(self):
+        """Store this run's steady-state throughput, latency percentiles, memory peak and environment"""
+        window = self.measured_window()
+        summary = self.recorder.summary(window["start"], window["end"])
+        summary["window"].update(window)
+        if self.scenario is not None:
+            summary["stages"] = self.stage_results()
+        if window["warmup"] == "undetected":
+            print(f"⚠️ No steady state over any {self.steady_window}s window; "
+                  f"results cover seconds {window['start']}-{window['end']}")
+        else:
+            print(f"🔥 Warmup: first {window['start']}s excluded ({window['warmup']}), "
+                  f"results cover seconds {window['start']}-{window['end']}")
+        result = load_result(summary, self.run_config, self.run_name)
+        path = self.results.save(result)
+        events = result["throughput"]["events"]
+        print(f"🗄️ Results: {events['mean']:.2f} events/s over {events['n']}s in {path}")
+
+    def stage_results(self) -> List[Dict[str, Any]]:
+        """Throughput, errors and worst endpoint p99 for every ramp and hold the scenario got through"""
+        stages = []
+        elapsed = self.recorder.elapsed()
+        print(f"📋 {'Stage':<22} {'Time':>17} {'Users':>11} {'Events/s':>9} {'Requests/s':>11} {'Errors':>7} "
+              f"{'Worst p99':>10}")
+        for stage in self.scenario.stages():
+            start, end = int(stage["start"]), min(int(stage["end"]), elapsed)
+            if end <= start:
+                break
+            summary = self.recorder.summary(start, end)
+            worst = max(summary["latency"].items(), key=lambda item: item[1]["p99_ms"], default=(None, None))
+            stage.update({"throughput": summary["throughput"], "errors": summary["errors"],
+                          "worstP99": {"endpoint": worst[0], "p99_ms": worst[1]["p99_ms"]} if worst[0] else None})
+            stages.append(stage)
+            users = (f"{stage['usersFrom']:.0f}" if stage["usersFrom"] == stage["usersTo"]
+                     else f"{stage['usersFrom']:.0f}→{stage['usersTo']:.0f}")
+            print(f"   {stage['phase'][:22]:<22} {format_duration(start):>8}-{format_duration(end):<8} {users:>11} "
+                  f"{summary['throughput']['events']['mean']:>9.2f} {summary['throughput']['requests']['mean']:>11.2f} "
+                  f"{summary['errors']:>7} "
+                  + (f"{worst[1]['p99_ms']:>8.1f}ms" if worst[0] else f"{'-':>10}"))
+        return stages
+
+    def close_outputs(self):
+        if self.results is not None:
+            self.save_results()
+        if self.tracer is not None:
+            path = self.tracer.close()
+            if path:
+                print(f"🧵 Trace: {len(self.tracer.spans):,} spans in {path}")
+        if self.profiler is not None:
+            for path in self.profiler.stop():
+                print(f"🔬 Profile: {path}")
+        if self.log is not None:
+            self.log.close()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+        if self.event_log is not None:
+            self.event_log.close()
+            summary = self.event_log.summary()
+            print(f"📝 Event log: {summary['events']:,} events, {summary['metrics']:,} metrics in {summary['directory']}")
+
     def signal_handler(self, signum, frame):
         """Handle shutdown signals"""
         print(f"\n🛑 Received signal {signum}. Shutting down gracefully...")
@@ -51,13 +316,18 @@ class ChartSimulatorOrchestrator:
         print("=" * 60)
         
         self.running = True
+        self.recorder.reset()
+        if self.profiler is not None:
+            self.profiler.start()
+        if self.event_log is not None:
+            threading.Thread(target=self.metrics_loop, name="Metrics", daemon=True).start()
         
         # Start each simulator in its own thread
-        for i, simulator in enumerate(self.simulators):
+        for role, simulator in zip(SIMULATOR_ROLES.values(), self.simulators):
             thread = threading.Thread(
                 target=self.run_simulator,
                 args=(simulator, duration_minutes),
-                name=f"Simulator-{i+1}",
+                name=f"Simulator-{role}",
                 daemon=True
             )
             thread.start()
@@ -73,6 +343,8 @@ class ChartSimulatorOrchestrator:
                 thread.join()
         except KeyboardInterrupt:
             self.stop_all_simulations()
+        self.running = False
+        self.close_outputs()
 
     def run_simulator(self, simulator: Any, duration_minutes: int):
         """Run a single simulator"""
@@ -80,6 +352,8 @@ class ChartSimulatorOrchestrator:
             simulator.run_simulation(duration_minutes)
         except Exception as e:
             print(f"❌ Error in {simulator.__class__.__name__}: {e}")
+        if self.first_finished is None:
+            self.first_finished = time.time()
 
     def stop_all_simulations(self):
         """Stop all running simulations"""
@@ -95,6 +369,12 @@ class ChartSimulatorOrchestrator:
                 simulator.stop()
             except Exception as e:
                 print(f"❌ Error stopping {simulator.__class__.__name__}: {e}")
+
+        if self.scenario_runner is not None:
+            self.scenario_runner.stop()
+        
+        if self.token_pool is not None:
+            self.token_pool.stop()
         
         # Wait for threads to finish
         for thread in self.threads:
@@ -103,33 +383,69 @@ class ChartSimulatorOrchestrator:
         
         print("✅ All simulations stopped")
 
+    def run_scenario(self, scenario: Scenario):
+        """Play a scenario's phases on pools of virtual users, growing each role around its first simulator"""
+        print("🚀 Starting Chart Simulator Orchestrator")
+        print(f"🌐 API Base URL: {self.base_url}")
+        print(f"📜 Scenario {scenario.name}: {len(scenario.phases)} phases, {format_duration(scenario.duration)}")
+        for line in scenario.describe():
+            print(f"   {line}")
+        print("=" * 60)
+        
+        self.scenario = scenario
+        self.scenario_runner = ScenarioRunner(scenario, self.add_virtual_user,
+                                              {role: [simulator] for role, simulator in
+                                               zip(SIMULATOR_ROLES.values(), self.simulators)})
+        self.run_config["scenario"] = scenario.spec
+        self.running = True
+        self.recorder.reset()
+        if self.profiler is not None:
+            self.profiler.start()
+        if self.event_log is not None:
+            threading.Thread(target=self.metrics_loop, name="Metrics", daemon=True).start()
+        
+        # Ctrl+C goes to signal_handler, which stops the runner, so run() returns early on its own
+        print("Press Ctrl+C to stop the scenario")
+        try:
+            self.scenario_runner.run()
+        finally:
+            # Results, trace and event log are written even when the run fails part way
+            self.scenario_runner.stop()
+            self.first_finished = time.time()
+            self.running = False
+            print(f"✅ Scenario finished with {sum(len(users) for users in self.scenario_runner.users.values())} "
+                  f"virtual users created")
+            failed = self.scenario_runner.failed_users
+            if failed:
+                print(f"⚠️ Failed attempts to create users: "
+                      + ", ".join(f"{role} {count}" for role, count in failed.items()))
+            self.close_outputs()
+
     def run_single_simulator(self, simulator_type: str, duration_minutes: int = 10):
         """Run a single simulator type"""
-        simulator_map = {
-            "buyer": BuyerChartSimulator,
-            "farmer": FarmerChartSimulator,
-            "admin": AdminChartSimulator,
-            "hub": HubOperatorChartSimulator,
-            "shg": SHGLeaderChartSimulator
-        }
-        
-        if simulator_type not in simulator_map:
+        if simulator_type not in SIMULATOR_CLASSES:
             print(f"❌ Unknown simulator type: {simulator_type}")
-            print(f"Available types: {', '.join(simulator_map.keys())}")
+            print(f"Available types: {', '.join(SIMULATOR_CLASSES.keys())}")
             return
         
-        simulator_class = simulator_map[simulator_type]
-        simulator = simulator_class(self.base_url, f"{simulator_type}_001")
+        simulator = self.make_simulator(simulator_type, f"{simulator_type}_001", self.token_pool)
+        if self.instrumentation.observers:
+            self.instrumentation.instrument(simulator, SIMULATOR_ROLES[simulator_type])
+        if self.profiler is not None:
+            self.profiler.instrument(simulator, SIMULATOR_ROLES[simulator_type])
+            self.profiler.start()
         
         print(f"🚀 Starting {simulator_type} simulator only")
         print(f"🌐 API Base URL: {self.base_url}")
         print(f"⏱️ Duration: {duration_minutes} minutes")
         
+        self.recorder.reset()
         try:
             simulator.run_simulation(duration_minutes)
         except KeyboardInterrupt:
             print("\n🛑 Simulation interrupted")
             simulator.stop()
+        self.close_outputs()
 
 def main():
     """Main function"""
@@ -140,12 +456,94 @@ def main():
                        help='Simulation duration in minutes')
     parser.add_argument('--type', choices=['buyer', 'farmer', 'admin', 'hub', 'shg', 'all'], 
                        default='all', help='Type of simulator to run')
+    parser.add_argument('--auth', action='store_true',
+                       help='Log in via OTP and use real tokens instead of fake ones')
+    parser.add_argument('--token-cache', default=None,
+                       help='Token cache file shared between worker processes (implies --auth)')
+    parser.add_argument('--world-users', type=int, default=1000,
+                       help='Users to seed into the shared world model')
+    parser.add_argument('--history-days', type=int, default=180,
+                       help='Days of past registrations to spread the seeded users over')
+    parser.add_argument('--queue-hubs', type=int, default=0,
+                       help='Drive hub order statuses from a queueing model with this many hubs')
+    parser.add_argument('--queue-speed', type=float, default=60.0,
+                       help='Model seconds per real second for the hub queueing model')
+    parser.add_argument('--villages', type=int, default=0,
+                       help='Generate this many villages with coordinates (0 = the five demo villages)')
+    parser.add_argument('--hubs', type=int, default=200,
+                       help='Hubs to place among the generated villages')
+    parser.add_argument('--event-log', default=None,
+                       help='Write events, requests and metrics as columnar files to this directory')
+    parser.add_argument('--event-log-format', choices=['parquet', 'arrow'], default='parquet',
+                       help='Columnar format for --event-log')
+    parser.add_argument('--metrics-port', type=int, default=0,
+                       help='Serve Prometheus metrics at http://127.0.0.1:PORT/metrics (0 = off)')
+    parser.add_argument('--log-file', default=None,
+                       help='Write simulator messages as JSON lines here and print a summary line instead')
+    parser.add_argument('--log-level', choices=['debug', 'info', 'warning', 'error'], default='info',
+                       help='Lowest level of simulator message kept')
+    parser.add_argument('--log-sample', default='',
+                       help='Sample rates per event type, e.g. "analytics_updated=0.01,*=0.1"')
+    parser.add_argument('--log-summary', type=float, default=5.0,
+                       help='Seconds between summary lines with --log-file')
+    parser.add_argument('--profile', default=None,
+                       help='Write CPU samples, allocation snapshots and method timings to this directory')
+    parser.add_argument('--profile-hz', type=float, default=100.0,
+                       help='CPU samples per second with --profile')
+    parser.add_argument('--profile-alloc-interval', type=float, default=60.0,
+                       help='Seconds between tracemalloc snapshots with --profile (0 = no tracemalloc)')
+    parser.add_argument('--trace', default=None,
+                       help='Write event and request spans as Chrome trace-event JSON to this file')
+    parser.add_argument('--trace-sample', type=float, default=0.1,
+                       help='Fraction of events traced (with their requests)')
+    parser.add_argument('--trace-buffer', type=int, default=200_000,
+                       help='Most recent spans kept for --trace')
+    parser.add_argument('--results', default=None,
+                       help='Save throughput, latency percentiles and memory peak under this directory, e.g. results')
+    parser.add_argument('--name', default='',
+                       help='Label for the saved result')
+    parser.add_argument('--warmup', type=float, default=None,
+                       help='Seconds left out of the saved result (default: detect steady state)')
+    parser.add_argument('--steady-window', type=int, default=60,
+                       help='Seconds throughput and latency must hold steady for steady-state detection')
+    parser.add_argument('--steady-tolerance', type=float, default=0.1,
+                       help='Relative change still counted as steady')
+    parser.add_argument('--scenario', default=None,
+                       help='Run the ramp/step/spike/soak phases of this YAML or JSON file instead of --duration')
     
     args = parser.parse_args()
+    if args.villages > 0 and not 1 <= args.hubs <= max_hubs(args.villages):
+        parser.error("--hubs must be at least 1 and at most --villages")
+    
+    scenario = load_scenario(args.scenario) if args.scenario else None
+    token_pool = None
+    if args.auth or args.token_cache:
+        token_pool = TokenPool(args.url, cache_file=args.token_cache)
+        token_pool.start_refresher()
     
-    orchestrator = ChartSimulatorOrchestrator(args.url)
+    event_log = EventLog(args.event_log, args.event_log_format) if args.event_log else None
+    try:
+        sample_rates = parse_sample_rates(args.log_sample)
+    except ValueError as e:
+        parser.error(f"--log-sample: {e}")
+    if args.log_file:
+        log = AsyncLog(args.log_file, args.log_level, sample_rates, args.log_summary)
+    else:
+        log = SimLog(args.log_level, sample_rates)
+    profiler = Profiler(args.profile, args.profile_hz, args.profile_alloc_interval) if args.profile else None
+    tracer = TraceRecorder(args.trace, args.trace_sample, args.trace_buffer) if args.trace else None
+    orchestrator = ChartSimulatorOrchestrator(args.url, token_pool, args.world_users, args.history_days,
+                                              args.queue_hubs, args.queue_speed, args.villages, args.hubs,
+                                              event_log, metrics_port=args.metrics_port, log=log,
+                                              profiler=profiler, tracer=tracer,
+                                              results=ResultsStore(args.results) if args.results else None,
+                                              run_name=args.name, warmup=args.warmup,
+                                              steady_window=args.steady_window,
+                                              steady_tolerance=args.steady_tolerance)
     
-    if args.type == 'all':
+    if scenario is not None:
+        orchestrator.run_scenario(scenario)
+    elif args.type == 'all':
         orchestrator.start_all_simulations(args.duration)
     else:
         orchestrator.run_single_simulator(args.type, args.duration)
@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Load Generator Metrics
+Counters, gauges and histograms exposed in Prometheus text format on a local /metrics endpoint
+"""
+
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Any, Optional, Tuple
+
+# Request latency buckets in seconds (5 ms .. 30 s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class _Sharded:
+    """Per-thread shards of a metric's state, plus snapshots from other processes, merged when read
+
+    Each thread writes only its own shard, so the hot path is a thread-local
+    lookup and a dict update with no lock. A lock is taken once per thread,
+    when its shard is created. Readers copy every shard at scrape time. A copy
+    can miss an update that is in progress, which the next scrape includes.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Dict[Tuple[str, ...], Any]] = []
+        self._shards_lock = threading.Lock()
+        # Latest snapshot per source process (see Registry.merge)
+        self.remote: Dict[Any, Dict[Tuple[str, ...], Any]] = {}
+
+    def _new_shard(self) -> Dict[Tuple[str, ...], Any]:
+        shard = self._local.shard = {}
+        with self._shards_lock:
+            self._shards.append(shard)
+        return shard
+
+    def _copies(self) -> List[Dict[Tuple[str, ...], Any]]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        return [dict(shard) for shard in shards]
+
+class Counter(_Sharded):
+    """Monotonic count per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__()
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1):
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def snapshot(self) -> Dict[Tuple[str, ...], float]:
+        """Totals from this process's threads only"""
+        totals: Dict[Tuple[str, ...], float] = {}
+        for shard in self._copies():
+            for labels, value in shard.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    @property
+    def values(self) -> Dict[Tuple[str, ...], float]:
+        totals = self.snapshot()
+        for snapshot in list(self.remote.values()):
+            for labels, value in snapshot.items():
+                totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        for labels, value in self.values.items():
+            yield self.name, _labels(self.labelnames, labels), value
+
+class Gauge:
+    """Current value per label set, set directly or read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 callback: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.callback = callback
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, labels: Tuple[str, ...], value: float):
+        self.values[labels] = value
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        values = self.callback() if self.callback is not None else dict(self.values)
+        for labels, value in values.items():
+            yield self.name, _labels(self.labelnames, labels), value
+
+class Histogram(_Sharded):
+    """Cumulative bucket counts, sum and count per label set"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__()
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._new_shard()
+        # Per label set: [count per bucket (+Inf last), sum]
+        state = shard.get(labels)
+        if state is None:
+            state = shard[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][index] += 1
+        state[1] += value
+
+    def _add(self, totals: Dict[Tuple[str, ...], List[Any]], labels: Tuple[str, ...], counts: List[int],
+             total: float):
+        merged = totals.get(labels)
+        if merged is None:
+            totals[labels] = [list(counts), total]
+        else:
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+
+    def snapshot(self) -> Dict[Tuple[str, ...], List[Any]]:
+        """Bucket counts and sums from this process's threads only"""
+        totals: Dict[Tuple[str, ...], List[Any]] = {}
+        for shard in self._copies():
+            for labels, (counts, total) in shard.items():
+                self._add(totals, labels, counts, total)
+        return totals
+
+    @property
+    def values(self) -> Dict[Tuple[str, ...], List[Any]]:
+        totals = self.snapshot()
+        for snapshot in list(self.remote.values()):
+            for labels, (counts, total) in snapshot.items():
+                self._add(totals, labels, counts, total)
+        return totals
+
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        for labels, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", _labels(self.labelnames, labels, f'le="{_number(bound)}"'), cumulative
+            yield f"{self.name}_sum", _labels(self.labelnames, labels), total
+            yield f"{self.name}_count", _labels(self.labelnames, labels), cumulative
+
+class Registry:
+    """Ordered set of metrics rendered together"""
+
+    def __init__(self):
+        self.metrics: List[Any] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (), callback=None) -> Gauge:
+        return self.register(Gauge(name, help_text, labelnames, callback))
+
+    def histogram(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, Dict[Tuple[str, ...], Any]]:
+        """Counter and histogram state of this process, picklable for another process to merge"""
+        return {metric.name: metric.snapshot() for metric in self.metrics if isinstance(metric, _Sharded)}
+
+    def merge(self, source: Any, snapshot: Dict[str, Dict[Tuple[str, ...], Any]]):
+        """Replace the state last received from `source` (e.g. a worker pid) with a newer snapshot"""
+        for metric in self.metrics:
+            if isinstance(metric, _Sharded) and metric.name in snapshot:
+                metric.remote[source] = snapshot[metric.name]
+
+    def publish(self, channel, interval: float = 1.0) -> threading.Thread:
+        """From a worker process: send `(pid, snapshot)` to `channel` (a multiprocessing queue) every interval
+
+        Call `channel.put((os.getpid(), registry.snapshot()))` once more before
+        the worker exits so its final counts are included.
+        """
+        def loop():
+            while True:
+                time.sleep(interval)
+                channel.put((os.getpid(), self.snapshot()))
+
+        thread = threading.Thread(target=loop, name="MetricsPublish", daemon=True)
+        thread.start()
+        return thread
+
+    def collect(self, channel) -> threading.Thread:
+        """In the scraping process: merge snapshots arriving on `channel` as they come"""
+        def loop():
+            while True:
+                item = channel.get()
+                if item is None:
+                    return
+                self.merge(*item)
+
+        thread = threading.Thread(target=loop, name="MetricsCollect", daemon=True)
+        thread.start()
+        return thread
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4"""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+class MetricsServer:
+    """Serves a registry at http://host:port/metrics from a daemon thread"""
+
+    def __init__(self, registry: Registry, port: int = 9108, host: str = "127.0.0.1"):
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?")[0] != "/metrics":
+                    handler.send_error(404)
+                    return
+                body = registry.render().encode()
+                handler.send_response(200)
+                handler.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="MetricsServer", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/metrics"
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+class SimulatorMetrics:
+    """Instrumentation observer that keeps the load generator's own metrics
+
+    Events and responses are counted, and latency goes into per-endpoint
+    histograms. Gauges for in-flight requests, simulated users and queue
+    depths are read from their sources when scraped.
+    """
+
+    def __init__(self, registry: Optional[Registry] = None):
+        self.registry = registry if registry is not None else Registry()
+        r = self.registry
+        self.events = r.counter("simulator_events_total", "Simulator events executed", ("role", "event_type"))
+        self.requests = r.counter("simulator_requests_total", "HTTP requests by response status",
+                                  ("role", "endpoint", "status"))
+        self.errors = r.counter("simulator_request_errors_total",
+                                "Failed HTTP requests by status code (0 = no response)", ("endpoint", "status"))
+        self.latency = r.histogram("simulator_request_duration_seconds", "HTTP request latency", ("endpoint",))
+        self.payload = r.counter("simulator_payload_bytes_total", "Request plus response body bytes", ("role",))
+        self.started = time.time()
+        r.gauge("simulator_uptime_seconds", "Seconds since the load generator started",
+                callback=lambda: {(): round(time.time() - self.started, 3)})
+
+    def watch_in_flight(self, instrumentation):
+        self.registry.gauge("simulator_requests_in_flight", "HTTP requests started and not yet finished",
+                            ("role",), callback=lambda: {(role,): n for role, n in instrumentation.in_flight.items()})
+
+    def watch(self, name: str, help_text: str, labelnames: Tuple[str, ...],
+              callback: Callable[[], Dict[Tuple[str, ...], float]]):
+        """Expose a gauge computed at scrape time"""
+        self.registry.gauge(name, help_text, labelnames, callback)
+
+    # ---- instrumentation observer ----
+
+    def event(self, role: str, user_id: str, name: str, started: float, latency_ms: float):
+        self.events.inc((role, name))
+
+    def request(self, role: str, user_id: str, event_type: str, endpoint: str, started: float,
+                latency_ms: float, status: int, size: int):
+        self.requests.inc((role, endpoint, str(status)))
+        self.latency.observe((endpoint,), latency_ms / 1000)
+        if status == 0 or status >= 400:
+            self.errors.inc((endpoint, str(status)))
+        if size:
+            self.payload.inc((role,), size)
+
+class _LockedCounter:
+    """A dict behind one lock, the baseline the sharded counters are measured against"""
+
+    def __init__(self):
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+class _NoCounter:
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1):
+        pass
+
+def _paced_events(counter, rate: float, threads: int, seconds: float) -> Dict[str, float]:
+    """Run `threads` threads producing synthetic events at `rate` events/sec in total, counting each one"""
+    import random
+
+    labels = [("buyer", "simulate_order_tracking"), ("farmer", "simulate_price_check"),
+              ("hub_operator", "simulate_new_order_arrival"), ("shg_leader", "send_analytics_update")]
+    produced = [0] * threads
+    deadline = time.perf_counter() + seconds
+
+    def worker(slot: int):
+        rng = random.Random(slot)
+        per_thread = rate / threads
+        started = time.perf_counter()
+        count = 0
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            due = int((now - started) * per_thread)
+            if count >= due:
+                time.sleep(0.0005)
+                continue
+            for _ in range(min(due - count, 256)):
+                # Roughly what an event costs before any I/O: pick a user, build a payload
+                payload = {"userId": f"buyer_{rng.randrange(1000):03d}", "amount": rng.randint(100, 5000),
+                           "timestamp": now}
+                counter.inc(labels[count & 3])
+                count += 1
+        produced[slot] = count
+
+    cpu = time.process_time()
+    wall = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    events = sum(produced)
+    return {"events": events, "eventsPerSecond": events / wall, "cpuMicrosPerEvent": cpu / events * 1e6}
+
+def _count_in_process(channel, increments: int):
+    registry = Registry()
+    counter = registry.counter("bench_events_total", "Benchmark events", ("role",))
+    for i in range(increments):
+        counter.inc(("farmer" if i & 1 else "buyer",))
+    channel.put((os.getpid(), registry.snapshot()))
+
+def benchmark(rate: float = 100_000, threads: int = 8, seconds: float = 5.0, processes: int = 2):
+    """Cost per increment, throughput at `rate` events/sec with and without counting, and a cross-process merge"""
+    import multiprocessing
+    import timeit
+
+    labels = ("buyer", "simulate_order_tracking")
+    print("⏱️ Cost per increment (single thread)")
+    baseline = 0.0
+    for name, counter in (("none", _NoCounter()), ("lock", _LockedCounter()),
+                          ("sharded", Counter("bench_total", "Benchmark", ("role", "event_type")))):
+        seconds_per = min(timeit.repeat(lambda: counter.inc(labels), number=200_000, repeat=5)) / 200_000
+        if name == "none":
+            baseline = seconds_per
+        print(f"   {name:<8} {(seconds_per - baseline) * 1e9:7.0f} ns")
+
+    print(f"🏃 {rate:,.0f} events/sec across {threads} threads for {seconds:.0f}s")
+    results = {}
+    for name, counter in (("none", _NoCounter()), ("lock", _LockedCounter()),
+                          ("sharded", Counter("bench_total", "Benchmark", ("role", "event_type")))):
+        result = results[name] = _paced_events(counter, rate, threads, seconds)
+        if name == "sharded" and sum(counter.values.values()) != result["events"]:
+            print(f"❌ Sharded total {sum(counter.values.values()):,} != {result['events']:,} events")
+        print(f"   {name:<8} {result['eventsPerSecond']:>10,.0f} events/s  "
+              f"{result['cpuMicrosPerEvent']:6.2f} µs CPU/event")
+    for name in ("lock", "sharded"):
+        extra = results[name]["cpuMicrosPerEvent"] - results["none"]["cpuMicrosPerEvent"]
+        print(f"   {name} adds {extra:.2f} µs/event "
+              f"({extra * rate / 1e4:.1f}% of one core at {rate:,.0f} events/s)")
+
+    registry = Registry()
+    counter = registry.counter("bench_events_total", "Benchmark events", ("role",))
+    channel = multiprocessing.Queue()
+    collector = registry.collect(channel)
+    increments = 100_000
+    workers = [multiprocessing.Process(target=_count_in_process, args=(channel, increments))
+               for _ in range(processes)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+    channel.put(None)
+    collector.join()
+    total = sum(counter.values.values())
+    print(f"🔀 {processes} processes × {increments:,} increments merged on scrape: {total:,.0f} "
+          f"({'✅' if total == processes * increments else '❌'})")
+    return results
+
+def main():
+    """Serve synthetic metrics so a Prometheus scrape config can be tested, or benchmark the counters"""
+    import argparse
+    import random
+
+    parser = argparse.ArgumentParser(description='Load Generator Metrics endpoint check')
+    parser.add_argument('--port', type=int, default=9108,
+                       help='Port for /metrics')
+    parser.add_argument('--seconds', type=int, default=30,
+                       help='How long to serve (or to run each benchmark case)')
+    parser.add_argument('--benchmark', action='store_true',
+                       help='Measure counter overhead instead of serving')
+    parser.add_argument('--rate', type=float, default=100_000,
+                       help='Benchmark events/sec')
+    parser.add_argument('--threads', type=int, default=8,
+                       help='Benchmark threads')
+
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.rate, args.threads, min(args.seconds, 10))
+        return
+
+    metrics = SimulatorMetrics()
+    server = MetricsServer(metrics.registry, args.port)
+    server.start()
+    print(f"📡 Serving {server.url} for {args.seconds}s")
+    end = time.time() + args.seconds
+    while time.time() < end:
+        endpoint = random.choice(["GET /orders", "POST /analytics/dashboard-update"])
+        status = random.choice([200] * 18 + [500, 0])
+        metrics.event("buyer", "buyer_001", "simulate_order_tracking", time.time(), 1.0)
+        metrics.request("buyer", "buyer_001", "simulate_order_tracking", endpoint, time.time(),
+                        random.expovariate(1 / 40), status, 512)
+        time.sleep(0.01)
+    server.stop()
+
+if __name__ == "__main__":
+    main()
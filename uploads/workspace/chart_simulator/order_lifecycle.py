@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Order Lifecycle Engine
+Holds in-flight orders in a compact status-indexed table so transitions and random picks are O(1)
+"""
+
+import random
+import threading
+import time
+from array import array
+from typing import Dict, List, Any, Optional
+
+ORDER_STATES = ("confirmed", "picked_up", "quality_checked", "delivered")
+STATE_INDEX = {state: i for i, state in enumerate(ORDER_STATES)}
+DELIVERED = STATE_INDEX["delivered"]
+FREE = -1
+
+# Dashboard labels used by the hub operator charts
+HUB_STATUS_LABELS = {
+    "confirmed": "Pending Pickup",
+    "picked_up": "In Transit",
+    "quality_checked": "Quality Check",
+    "delivered": "Delivered",
+}
+
+# Which hub serves the demo villages until real geography is generated
+VILLAGE_HUBS = {
+    "Khetri": "hub_001",
+    "Rampur": "hub_001",
+    "Bharatpur": "hub_002",
+    "Alwar": "hub_002",
+    "Jaipur": "hub_003",
+}
+
+class KeyTable:
+    """Interns string keys (user IDs, hub IDs) as small integers"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.keys: List[str] = []
+
+    def intern(self, key: str) -> int:
+        index = self.ids.get(key)
+        if index is None:
+            index = len(self.keys)
+            self.ids[key] = index
+            self.keys.append(key)
+        return index
+
+    def lookup(self, key: str) -> Optional[int]:
+        return self.ids.get(key)
+
+class OrderLifecycleEngine:
+    """Column-oriented table of in-flight orders, bucketed by state, by hub+state and by buyer+state
+
+    Every row lives in exactly one global state bucket, one per-hub state
+    bucket and one per-buyer state bucket. The row's position in each bucket
+    is stored alongside it, so a
+    transition is a swap-remove from one bucket and an append to the next.
+    Delivered orders are counted and their rows are recycled.
+    """
+
+    def __init__(self):
+        # Per-order columns, indexed by row
+        self.order_no = array('q')
+        self.status = array('b')
+        self.buyer = array('l')
+        self.farmer = array('l')
+        self.hub = array('l')
+        self.amount = array('q')
+        self.created_at = array('d')
+        self.updated_at = array('d')
+        self.state_pos = array('l')
+        self.hub_pos = array('l')
+        self.buyer_pos = array('l')
+
+        self.free_rows = array('l')
+        self.state_buckets = [array('l') for _ in ORDER_STATES[:DELIVERED]]
+        # hub index -> one bucket per non-terminal state
+        self.hub_buckets: List[List[array]] = []
+        # buyer index -> one bucket per non-terminal state
+        self.buyer_buckets: List[List[array]] = []
+
+        self.buyers = KeyTable()
+        self.farmers = KeyTable()
+        self.hubs = KeyTable()
+        self.buyer_in_flight: Dict[int, int] = {}
+        self.buyer_delivered: Dict[int, int] = {}
+        self.farmer_in_flight: Dict[int, int] = {}
+        self.farmer_delivered: Dict[int, int] = {}
+        self.hub_delivered: Dict[int, int] = {}
+        self.delivered_total = 0
+        self.next_order_no = 1
+
+        self._lock = threading.RLock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Orders without the lock, so a copied engine gets its own"""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.status) - len(self.free_rows)
+
+    def _hub_buckets(self, hub_index: int) -> List[array]:
+        while len(self.hub_buckets) <= hub_index:
+            self.hub_buckets.append([array('l') for _ in ORDER_STATES[:DELIVERED]])
+        return self.hub_buckets[hub_index]
+
+    def _buyer_buckets(self, buyer_index: int) -> List[array]:
+        while len(self.buyer_buckets) <= buyer_index:
+            self.buyer_buckets.append([array('l') for _ in ORDER_STATES[:DELIVERED]])
+        return self.buyer_buckets[buyer_index]
+
+    def _bucket_remove(self, bucket: array, positions: array, row: int):
+        """Swap-remove a row from a bucket in O(1)"""
+        index = positions[row]
+        last = bucket.pop()
+        if last != row:
+            bucket[index] = last
+            positions[last] = index
+
+    def _bucket_add(self, bucket: array, positions: array, row: int):
+        positions[row] = len(bucket)
+        bucket.append(row)
+
+    def create(self, buyer_id: str, farmer_id: str, hub_id: str, amount: int,
+               timestamp: Optional[float] = None) -> int:
+        """Add a confirmed order; returns its row handle"""
+        now = timestamp if timestamp is not None else time.time()
+        with self._lock:
+            buyer = self.buyers.intern(buyer_id)
+            farmer = self.farmers.intern(farmer_id)
+            hub = self.hubs.intern(hub_id)
+            values = (self.next_order_no, 0, buyer, farmer, hub, amount, now, now, 0, 0, 0)
+            columns = (self.order_no, self.status, self.buyer, self.farmer, self.hub, self.amount,
+                       self.created_at, self.updated_at, self.state_pos, self.hub_pos, self.buyer_pos)
+            if self.free_rows:
+                row = self.free_rows.pop()
+                for column, value in zip(columns, values):
+                    column[row] = value
+            else:
+                row = len(self.status)
+                for column, value in zip(columns, values):
+                    column.append(value)
+            self.next_order_no += 1
+
+            self._bucket_add(self.state_buckets[0], self.state_pos, row)
+            self._bucket_add(self._hub_buckets(hub)[0], self.hub_pos, row)
+            self._bucket_add(self._buyer_buckets(buyer)[0], self.buyer_pos, row)
+            self.buyer_in_flight[buyer] = self.buyer_in_flight.get(buyer, 0) + 1
+            self.farmer_in_flight[farmer] = self.farmer_in_flight.get(farmer, 0) + 1
+            return row
+
+    def advance(self, row: int, timestamp: Optional[float] = None) -> str:
+        """Move an order to its next state; returns the new state name"""
+        with self._lock:
+            state = self.status[row]
+            if state == FREE:
+                raise KeyError(f"Order row {row} is not in flight")
+            hub = self.hub[row]
+            hub_buckets = self._hub_buckets(hub)
+            buyer = self.buyer[row]
+            buyer_buckets = self._buyer_buckets(buyer)
+            self._bucket_remove(self.state_buckets[state], self.state_pos, row)
+            self._bucket_remove(hub_buckets[state], self.hub_pos, row)
+            self._bucket_remove(buyer_buckets[state], self.buyer_pos, row)
+
+            new_state = state + 1
+            self.updated_at[row] = timestamp if timestamp is not None else time.time()
+            if new_state == DELIVERED:
+                self.buyer_in_flight[buyer] -= 1
+                self.buyer_delivered[buyer] = self.buyer_delivered.get(buyer, 0) + 1
+                farmer = self.farmer[row]
+                self.farmer_in_flight[farmer] -= 1
+                self.farmer_delivered[farmer] = self.farmer_delivered.get(farmer, 0) + 1
+                self.hub_delivered[hub] = self.hub_delivered.get(hub, 0) + 1
+                self.delivered_total += 1
+                self.status[row] = FREE
+                self.free_rows.append(row)
+            else:
+                self.status[row] = new_state
+                self._bucket_add(self.state_buckets[new_state], self.state_pos, row)
+                self._bucket_add(hub_buckets[new_state], self.hub_pos, row)
+                self._bucket_add(buyer_buckets[new_state], self.buyer_pos, row)
+            return ORDER_STATES[new_state]
+
+    def random_in(self, state: str, hub_id: Optional[str] = None, buyer_id: Optional[str] = None,
+                  rng=random) -> Optional[int]:
+        """Random in-flight order in a state (optionally at one hub or of one buyer), or None"""
+        with self._lock:
+            state_index = STATE_INDEX[state]
+            if hub_id is not None:
+                hub = self.hubs.lookup(hub_id)
+                if hub is None:
+                    return None
+                bucket = self._hub_buckets(hub)[state_index]
+            elif buyer_id is not None:
+                buyer = self.buyers.lookup(buyer_id)
+                if buyer is None:
+                    return None
+                bucket = self._buyer_buckets(buyer)[state_index]
+            else:
+                bucket = self.state_buckets[state_index]
+            if not bucket:
+                return None
+            return bucket[rng.randrange(len(bucket))]
+
+    def advance_random(self, state: str, hub_id: Optional[str] = None, buyer_id: Optional[str] = None,
+                       rng=random) -> Optional[Dict[str, Any]]:
+        """Atomically pick an order in a state and move it on; returns the updated order"""
+        with self._lock:
+            row = self.random_in(state, hub_id, buyer_id, rng)
+            if row is None:
+                return None
+            order = self.get(row)
+            order["status"] = self.advance(row)
+            return order
+
+    def count(self, state: str, hub_id: Optional[str] = None) -> int:
+        """Number of orders in a state, globally or at one hub"""
+        with self._lock:
+            state_index = STATE_INDEX[state]
+            if hub_id is None:
+                if state_index == DELIVERED:
+                    return self.delivered_total
+                return len(self.state_buckets[state_index])
+
+            hub = self.hubs.lookup(hub_id)
+            if hub is None:
+                return 0
+            if state_index == DELIVERED:
+                return self.hub_delivered.get(hub, 0)
+            return len(self._hub_buckets(hub)[state_index])
+
+    def status_counts(self, hub_id: Optional[str] = None) -> Dict[str, int]:
+        """Orders per state, globally or at one hub"""
+        return {state: self.count(state, hub_id) for state in ORDER_STATES}
+
+    def in_flight_for_buyer(self, buyer_id: str) -> int:
+        buyer = self.buyers.lookup(buyer_id)
+        return self.buyer_in_flight.get(buyer, 0) if buyer is not None else 0
+
+    def delivered_for_buyer(self, buyer_id: str) -> int:
+        buyer = self.buyers.lookup(buyer_id)
+        return self.buyer_delivered.get(buyer, 0) if buyer is not None else 0
+
+    def in_flight_for_farmer(self, farmer_id: str) -> int:
+        farmer = self.farmers.lookup(farmer_id)
+        return self.farmer_in_flight.get(farmer, 0) if farmer is not None else 0
+
+    def delivered_for_farmer(self, farmer_id: str) -> int:
+        farmer = self.farmers.lookup(farmer_id)
+        return self.farmer_delivered.get(farmer, 0) if farmer is not None else 0
+
+    def order_id(self, row: int) -> str:
+        return f"ORD_{self.order_no[row]}"
+
+    def get(self, row: int) -> Dict[str, Any]:
+        """API-shaped view of one in-flight order"""
+        with self._lock:
+            return {
+                "order_id": self.order_id(row),
+                "buyer_id": self.buyers.keys[self.buyer[row]],
+                "farmer_id": self.farmers.keys[self.farmer[row]],
+                "hub_id": self.hubs.keys[self.hub[row]],
+                "status": ORDER_STATES[self.status[row]],
+                "total_amount": self.amount[row],
+                "created_at": self.created_at[row],
+                "updated_at": self.updated_at[row],
+            }
+
+    def step(self, rng=random) -> Optional[str]:
+        """Advance one random in-flight order, weighting states by their size"""
+        with self._lock:
+            in_flight = len(self)
+            if in_flight == 0:
+                return None
+            pick = rng.randrange(in_flight)
+            for bucket in self.state_buckets:
+                if pick < len(bucket):
+                    return self.advance(bucket[pick])
+                pick -= len(bucket)
+        return None
+
+def main():
+    """Quick capacity check: fill the table and churn it"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Order Lifecycle Engine capacity check')
+    parser.add_argument('--orders', type=int, default=1_000_000,
+                       help='In-flight orders to create')
+    parser.add_argument('--hubs', type=int, default=200,
+                       help='Number of hubs')
+    parser.add_argument('--transitions', type=int, default=1_000_000,
+                       help='Random transitions to apply')
+
+    args = parser.parse_args()
+
+    engine = OrderLifecycleEngine()
+    hub_ids = [f"hub_{i:03d}" for i in range(args.hubs)]
+
+    started = time.perf_counter()
+    for i in range(args.orders):
+        engine.create(f"buyer_{i % 10000}", f"farmer_{i % 50000}", hub_ids[i % args.hubs], 1000)
+    created = time.perf_counter() - started
+    print(f"📦 Created {args.orders:,} orders in {created:.2f}s ({args.orders / created:,.0f}/s)")
+
+    started = time.perf_counter()
+    for _ in range(args.transitions):
+        if engine.step() is None:
+            break
+        if random.random() < 0.25:
+            engine.create("buyer_0", "farmer_0", random.choice(hub_ids), 500)
+    churned = time.perf_counter() - started
+    print(f"🔄 Applied {args.transitions:,} transitions in {churned:.2f}s ({args.transitions / churned:,.0f}/s)")
+    print(f"📊 Status counts: {engine.status_counts()}")
+
+if __name__ == "__main__":
+    main()
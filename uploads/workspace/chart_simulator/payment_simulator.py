@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Payment Webhook Storm Simulator
+Creates orders, then replays payment-gateway callbacks (with duplicates and reordering) against the backend
+"""
+
+import requests
+import hashlib
+import hmac
+import json
+import time
+import random
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+from load_stats import LatencyRecorder, summarize
+
+# Order payment states the backend may report once all callbacks are applied
+PAID_STATES = {"completed", "paid", "captured", "success"}
+FAILED_STATES = {"failed", "payment_failed"}
+# Webhook answers that mean the callback was applied; 409 means a replay of one already applied
+ACCEPTED_CODES = {200, 201, 202}
+ALREADY_APPLIED = 409
+
+def json_object(response: requests.Response) -> Dict[str, Any]:
+    """The response body if it is a JSON object, else {} (HTML error pages, lists, empty bodies)"""
+    try:
+        body = response.json()
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+class LocalPaymentGateway:
+    """Stand-in for the payment gateway: issues payments and signs webhook events"""
+
+    def __init__(self, webhook_secret: str = "gram_vikas_webhook_secret", failure_rate: float = 0.05):
+        self.webhook_secret = webhook_secret
+        self.failure_rate = failure_rate
+        self.payments: Dict[str, Dict[str, Any]] = {}
+
+    def create_payment(self, order_id: str, amount: int) -> Dict[str, Any]:
+        """Register a payment for an order and decide how it will settle"""
+        payment = {
+            "id": f"pay_{uuid.uuid4().hex[:14]}",
+            "order_id": order_id,
+            "amount": amount * 100,  # gateways report paise
+            "currency": "INR",
+            "method": "upi",
+            "final_status": "failed" if random.random() < self.failure_rate else "captured"
+        }
+        self.payments[payment["id"]] = payment
+        return payment
+
+    def make_event(self, payment: Dict[str, Any], event_type: str, status: str) -> Dict[str, Any]:
+        """One webhook event in the gateway's envelope format"""
+        entity = {key: payment[key] for key in ("id", "order_id", "amount", "currency", "method")}
+        entity["status"] = status
+        return {
+            "id": f"evt_{uuid.uuid4().hex[:14]}",
+            "entity": "event",
+            "event": event_type,
+            "created_at": int(time.time()),
+            "payload": {"payment": {"entity": entity}}
+        }
+
+    def events_for(self, payment: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Callbacks in the order the gateway would emit them"""
+        events = [self.make_event(payment, "payment.authorized", "authorized")]
+        if payment["final_status"] == "captured":
+            events.append(self.make_event(payment, "payment.captured", "captured"))
+        else:
+            events.append(self.make_event(payment, "payment.failed", "failed"))
+        return events
+
+    def sign(self, body: bytes) -> str:
+        """HMAC-SHA256 signature sent in X-Razorpay-Signature"""
+        return hmac.new(self.webhook_secret.encode(), body, hashlib.sha256).hexdigest()
+
+class PaymentWebhookSimulator:
+    def __init__(self, base_url: str = "http://localhost:3000/api/v1", orders: int = 1000,
+                 rate: float = 500.0, burst_size: int = 100, concurrency: int = 64,
+                 duplicate_rate: float = 0.2, reorder_window: int = 8,
+                 gateway: Optional[LocalPaymentGateway] = None):
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, not {rate}")
+        self.base_url = base_url
+        self.orders = orders
+        self.rate = rate
+        self.burst_size = burst_size
+        self.concurrency = concurrency
+        self.duplicate_rate = duplicate_rate
+        self.reorder_window = reorder_window
+        self.gateway = gateway or LocalPaymentGateway()
+
+        self.recorder = LatencyRecorder()
+        self.payments: List[Dict[str, Any]] = []
+        # event id -> status codes of every delivery of that event
+        self.deliveries: Dict[str, List[int]] = {}
+        # Orders whose API setup failed (network error or non-2xx) and went ahead with a local order id
+        self.setup_failures = 0
+        self.last_setup_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.running = False
+
+    def get_session(self) -> requests.Session:
+        """One HTTP session per sender thread"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({'Content-Type': 'application/json'})
+            self._local.session = session
+        return session
+
+    def create_order(self, index: int) -> Dict[str, Any]:
+        """Create an order and initiate its payment through the API"""
+        session = self.get_session()
+        quantity = random.randint(10, 200)
+        agreed_price = random.randint(20, 120)
+        amount = quantity * agreed_price
+        order_id = f"ORD_{uuid.uuid4().hex[:12]}"
+
+        error = None
+        try:
+            response = session.post(f"{self.base_url}/orders", json={
+                "listing_id": str(random.randint(1, 500)),
+                "buyer_id": f"buyer_{index % 100:03d}",
+                "quantity": quantity,
+                "agreed_price": agreed_price
+            }, timeout=10)
+            if response.status_code in [200, 201]:
+                data = json_object(response).get("data")
+                order = data.get("order", data) if isinstance(data, dict) else None
+                if isinstance(order, dict):
+                    order_id = str(order.get("order_id", order_id))
+            else:
+                error = f"POST /orders returned {response.status_code}"
+
+            response = session.post(f"{self.base_url}/payments/initiate", json={
+                "order_id": order_id,
+                "amount": amount,
+                "payment_method": "upi"
+            }, timeout=10)
+            if not 200 <= response.status_code < 300:
+                error = error or f"POST /payments/initiate returned {response.status_code}"
+        except requests.exceptions.RequestException as e:
+            error = str(e)
+
+        if error is not None:
+            with self._lock:
+                self.setup_failures += 1
+                self.last_setup_error = error
+
+        return self.gateway.create_payment(order_id, amount)
+
+    def build_delivery_plan(self) -> List[Dict[str, Any]]:
+        """All callbacks with duplicates injected and local reordering applied"""
+        plan = []
+        for payment in self.payments:
+            for event in self.gateway.events_for(payment):
+                plan.append(event)
+                if random.random() < self.duplicate_rate:
+                    plan.append(event)
+
+        # Shuffle inside small windows so later events can overtake earlier ones
+        for start in range(0, len(plan), self.reorder_window):
+            window = plan[start:start + self.reorder_window]
+            random.shuffle(window)
+            plan[start:start + self.reorder_window] = window
+        return plan
+
+    def deliver(self, event: Dict[str, Any]):
+        """POST one signed webhook callback"""
+        body = json.dumps(event, separators=(",", ":")).encode()
+        headers = {"X-Razorpay-Signature": self.gateway.sign(body), "X-Razorpay-Event-Id": event["id"]}
+        started = time.perf_counter()
+        try:
+            response = self.get_session().post(
+                f"{self.base_url}/payments/webhook", data=body, headers=headers, timeout=10
+            )
+        except requests.exceptions.RequestException:
+            self.recorder.count_outcome(event["event"], "network_error")
+            return
+        latency = time.perf_counter() - started
+
+        accepted = response.status_code in ACCEPTED_CODES or response.status_code == ALREADY_APPLIED
+        outcome = "ok" if accepted else f"http_{response.status_code}"
+        self.recorder.record(event["event"], latency, outcome)
+        with self._lock:
+            self.deliveries.setdefault(event["id"], []).append(response.status_code)
+
+    def fire_storm(self, plan: List[Dict[str, Any]]) -> float:
+        """Deliver the plan in concurrent bursts at the target rate; returns wall time"""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for offset in range(0, len(plan), self.burst_size):
+                if not self.running:
+                    break
+                burst = plan[offset:offset + self.burst_size]
+                list(executor.map(self.deliver, burst))
+                # Pace bursts so the average rate matches the target
+                due = (offset + len(burst)) / self.rate
+                delay = due - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+        return time.perf_counter() - started
+
+    def check_idempotency(self) -> Dict[str, int]:
+        """Every delivery of a duplicated event must be applied once, with the same response or 409 for replays"""
+        checks = {"duplicated_events": 0, "consistent": 0, "inconsistent": 0}
+        with self._lock:
+            deliveries = {event_id: list(codes) for event_id, codes in self.deliveries.items()}
+        for codes in deliveries.values():
+            if len(codes) < 2:
+                continue
+            checks["duplicated_events"] += 1
+            # An idempotent handler answers a replay as it answered the first delivery, or with 409
+            applied = set(codes) - {ALREADY_APPLIED}
+            if len(applied) == 1 and applied <= ACCEPTED_CODES:
+                checks["consistent"] += 1
+            else:
+                checks["inconsistent"] += 1
+        return checks
+
+    def verify_payment(self, payment: Dict[str, Any]) -> Tuple[str, bool]:
+        """(matched / mismatched / unverifiable, double charged) for one order on the backend"""
+        try:
+            response = self.get_session().get(f"{self.base_url}/orders/{payment['order_id']}", timeout=10)
+        except requests.exceptions.RequestException:
+            return "unverifiable", False
+        order = json_object(response).get("data")
+        if not isinstance(order, dict) or order.get("payment_status") is None:
+            return "unverifiable", False
+
+        expected = PAID_STATES if payment["final_status"] == "captured" else FAILED_STATES
+        paid = order.get("amount_paid")
+        try:
+            double_charged = paid is not None and float(paid) > payment["amount"] / 100
+        except (TypeError, ValueError):
+            double_charged = False
+        return ("matched" if order["payment_status"] in expected else "mismatched"), double_charged
+
+    def verify_final_states(self) -> Dict[str, int]:
+        """Compare each order's payment state on the backend with the gateway's ledger"""
+        results = {"matched": 0, "mismatched": 0, "double_charged": 0, "unverifiable": 0}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for state, double_charged in executor.map(self.verify_payment, self.payments):
+                results[state] += 1
+                results["double_charged"] += double_charged
+        return results
+
+    def run_simulation(self) -> Dict[str, Any]:
+        """Create orders, fire the webhook storm and verify idempotent handling"""
+        print(f"🚀 Starting payment webhook storm for {self.orders} orders")
+        print(f"⚡ Target rate: {self.rate:.0f} callbacks/s in bursts of {self.burst_size}")
+        print(f"🔁 Duplicate rate: {self.duplicate_rate:.0%}, reorder window: {self.reorder_window}")
+        print(f"🌐 API Base URL: {self.base_url}")
+
+        self.running = True
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            self.payments = list(executor.map(self.create_order, range(self.orders)))
+        print(f"🛒 Created {len(self.payments)} orders with pending payments")
+        if self.setup_failures:
+            print(f"⚠️ Order setup failed for {self.setup_failures} orders, using local order ids "
+                  f"(last error: {self.last_setup_error})")
+
+        plan = self.build_delivery_plan()
+        wall_seconds = self.fire_storm(plan)
+
+        report = self.build_report(len(plan), wall_seconds)
+        self.print_report(report)
+        return report
+
+    def build_report(self, delivered: int, wall_seconds: float) -> Dict[str, Any]:
+        """Throughput, latency and idempotency results"""
+        all_latencies = []
+        for event_type in ("payment.authorized", "payment.captured", "payment.failed"):
+            all_latencies.extend(self.recorder.samples(event_type))
+        return {
+            "orders": len(self.payments),
+            "setupFailures": self.setup_failures,
+            "callbacks": delivered,
+            "wallSeconds": round(wall_seconds, 2),
+            "throughputPerSecond": round(delivered / wall_seconds, 1) if wall_seconds else 0.0,
+            "latency": summarize(all_latencies),
+            "events": self.recorder.report(),
+            "idempotency": self.check_idempotency(),
+            "finalStates": self.verify_final_states(),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def print_report(self, report: Dict[str, Any]):
+        """Print throughput, latency and idempotency results"""
+        latency = report["latency"]
+        print("=" * 60)
+        print(f"📨 Delivered {report['callbacks']} callbacks in {report['wallSeconds']}s "
+              f"({report['throughputPerSecond']}/s)")
+        if latency["count"]:
+            print(f"⏱️ Webhook latency: p50 {latency['p50_ms']}ms, p95 {latency['p95_ms']}ms, "
+                  f"p99 {latency['p99_ms']}ms")
+        for event_type, stats in report["events"].items():
+            print(f"   {event_type}: {stats['outcomes']}")
+        idempotency = report["idempotency"]
+        print(f"🔁 Duplicated events: {idempotency['duplicated_events']}, "
+              f"inconsistent handling: {idempotency['inconsistent']}")
+        final = report["finalStates"]
+        print(f"🔍 Final states: {final['matched']} matched, {final['mismatched']} mismatched, "
+              f"{final['double_charged']} double charged, {final['unverifiable']} unverifiable")
+
+    def stop(self):
+        """Stop delivering callbacks"""
+        self.running = False
+
+def main():
+    """Main function to run the payment webhook storm"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Payment Webhook Storm Simulator')
+    parser.add_argument('--url', default='http://localhost:3000/api/v1',
+                       help='API base URL')
+    parser.add_argument('--orders', type=int, default=1000,
+                       help='Number of orders to create and settle')
+    parser.add_argument('--rate', type=float, default=500.0,
+                       help='Target callbacks per second at peak settlement')
+    parser.add_argument('--burst-size', type=int, default=100,
+                       help='Callbacks fired concurrently per burst')
+    parser.add_argument('--concurrency', type=int, default=64,
+                       help='Concurrent callback senders')
+    parser.add_argument('--duplicate-rate', type=float, default=0.2,
+                       help='Fraction of callbacks delivered twice')
+    parser.add_argument('--reorder-window', type=int, default=8,
+                       help='Callbacks shuffled together to simulate out-of-order delivery')
+    parser.add_argument('--webhook-secret', default='gram_vikas_webhook_secret',
+                       help='Secret used to sign callbacks')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+
+    args = parser.parse_args()
+    if args.rate <= 0:
+        parser.error("--rate must be positive")
+
+    simulator = PaymentWebhookSimulator(
+        args.url, orders=args.orders, rate=args.rate, burst_size=args.burst_size,
+        concurrency=args.concurrency, duplicate_rate=args.duplicate_rate,
+        reorder_window=args.reorder_window, gateway=LocalPaymentGateway(args.webhook_secret)
+    )
+
+    try:
+        report = simulator.run_simulation()
+    except KeyboardInterrupt:
+        print("\n🛑 Simulation interrupted")
+        simulator.stop()
+        return
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
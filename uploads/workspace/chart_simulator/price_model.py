@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Mandi Price Model
+Seasonal, mean-reverting daily price series for many commodities and markets, precomputed in one vectorized pass
+"""
+
+import json
+import random
+import time
+from datetime import date
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from windows import day_index, EPOCH_ORDINAL
+from world_model import PRODUCTS, category_for
+from geography import DISTRICT_NAMES, DEMO_VILLAGES
+
+# Commodity: (category, modal ₹/kg, seasonal amplitude of log price, day of year prices peak)
+COMMODITY_PRICES = {
+    "Basmati Rice": ("Cereals", 45, 0.06, 250),
+    "Wheat": ("Cereals", 25, 0.08, 30),
+    "Bajra": ("Cereals", 22, 0.10, 240),
+    "Maize": ("Cereals", 20, 0.10, 220),
+    "Barley": ("Cereals", 19, 0.08, 40),
+    "Jowar": ("Cereals", 28, 0.09, 230),
+    "Fresh Onions": ("Vegetables", 30, 0.35, 300),
+    "Tomatoes": ("Vegetables", 25, 0.40, 200),
+    "Potatoes": ("Vegetables", 20, 0.25, 280),
+    "Carrots": ("Vegetables", 35, 0.30, 240),
+    "Cauliflower": ("Vegetables", 30, 0.35, 210),
+    "Cabbage": ("Vegetables", 18, 0.30, 210),
+    "Brinjal": ("Vegetables", 28, 0.25, 150),
+    "Okra": ("Vegetables", 40, 0.30, 20),
+    "Green Peas": ("Vegetables", 60, 0.40, 240),
+    "Garlic": ("Vegetables", 120, 0.30, 300),
+    "Mangoes": ("Fruits", 80, 0.45, 60),
+    "Bananas": ("Fruits", 40, 0.15, 280),
+    "Guava": ("Fruits", 50, 0.30, 180),
+    "Oranges": ("Fruits", 60, 0.30, 200),
+    "Pomegranate": ("Fruits", 110, 0.20, 150),
+    "Papaya": ("Fruits", 30, 0.15, 120),
+    "Chana Dal": ("Pulses", 90, 0.08, 270),
+    "Moong Dal": ("Pulses", 110, 0.10, 200),
+    "Masoor Dal": ("Pulses", 95, 0.08, 270),
+    "Urad Dal": ("Pulses", 120, 0.10, 210),
+    "Arhar Dal": ("Pulses", 130, 0.12, 330),
+    "Moth Beans": ("Pulses", 85, 0.10, 250),
+}
+
+# Names the simulators use that differ from the commodity table
+COMMODITY_ALIASES = {
+    "Fresh Tomatoes": "Tomatoes",
+    "Onions": "Fresh Onions",
+    "Rice": "Basmati Rice",
+}
+
+# First commodity of each category, for product names the table does not know
+CATEGORY_DEFAULTS = {}
+for _name, (_category, *_) in COMMODITY_PRICES.items():
+    CATEGORY_DEFAULTS.setdefault(_category, _name)
+
+class PriceModel:
+    """Daily modal prices (₹/kg) per commodity and market, held as one float32 array
+
+    The log price is a seasonal mean (a yearly cosine per commodity) plus a
+    persistent per-market spread plus an AR(1) deviation that reverts towards
+    the mean with `half_life_days`. Every commodity and market is stepped
+    together, so generation is one numpy operation per day. Lookups afterwards
+    are plain indexing.
+    """
+
+    def __init__(self, commodities: Optional[Dict[str, Tuple[str, float, float, int]]] = None,
+                 markets: Optional[List[str]] = None, history_days: int = 365, horizon_days: int = 30,
+                 half_life_days: float = 10.0, volatility: float = 0.03, seed: Optional[int] = None,
+                 now: Optional[float] = None):
+        commodities = commodities if commodities is not None else COMMODITY_PRICES
+        self.commodities = list(commodities)
+        self.commodity_index = {name: i for i, name in enumerate(self.commodities)}
+        self.categories = [commodities[name][0] for name in self.commodities]
+        self.markets = list(markets) if markets is not None else list(DISTRICT_NAMES)
+        self.market_index = {name: i for i, name in enumerate(self.markets)}
+        self.rng = np.random.default_rng(seed)
+
+        self.today = day_index(now if now is not None else time.time())
+        self.start_day = self.today - history_days + 1
+        self.days = history_days + horizon_days
+
+        base = np.log(np.array([commodities[name][1] for name in self.commodities], dtype=np.float64))
+        amplitude = np.array([commodities[name][2] for name in self.commodities])
+        peak = np.array([commodities[name][3] for name in self.commodities])
+        self.prices = self._generate(base, amplitude, peak, half_life_days, volatility)
+
+    def _generate(self, base, amplitude, peak, half_life_days: float, volatility: float) -> np.ndarray:
+        n_commodities, n_markets = len(self.commodities), len(self.markets)
+        # Day of year for every generated day (epoch day 0 is 1 January)
+        day_of_year = (self.start_day + np.arange(self.days)) % 365.25
+        season = amplitude[None, :] * np.cos(2 * np.pi * (day_of_year[:, None] - peak[None, :]) / 365.25)
+        spread = self.rng.normal(0.0, 0.08, (n_commodities, n_markets))
+
+        # Perishables swing harder day to day than grains and pulses
+        scale = np.where(np.array(self.categories)[:, None] == "Vegetables", 2.0, 1.0) * volatility
+        phi = 0.5 ** (1.0 / half_life_days)
+        deviation = self.rng.normal(0.0, 1.0, (n_commodities, n_markets)) * scale / np.sqrt(1 - phi ** 2)
+        prices = np.empty((self.days, n_commodities, n_markets), dtype=np.float32)
+        mean = base[:, None] + spread
+        for day in range(self.days):
+            deviation = phi * deviation + scale * self.rng.standard_normal((n_commodities, n_markets))
+            np.exp(mean + season[day][:, None] + deviation, out=prices[day], casting="same_kind")
+        return prices
+
+    # ---- lookups ----
+
+    def commodity_for(self, product_name: str) -> int:
+        """Commodity row for a product name, via aliases and then its category"""
+        name = COMMODITY_ALIASES.get(product_name, product_name)
+        commodity = self.commodity_index.get(name)
+        if commodity is None:
+            category = PRODUCTS.get(product_name) or category_for(product_name)
+            commodity = self.commodity_index.get(CATEGORY_DEFAULTS.get(category), 0)
+        return commodity
+
+    def market_for(self, village_name: Optional[str] = None, geography=None) -> int:
+        """Market (district mandi) serving a village; unknown villages map to a stable market"""
+        if village_name is None:
+            return 0
+        district = None
+        if geography is not None:
+            village = geography.village_by_name(village_name)
+            if village is not None:
+                district = DISTRICT_NAMES[geography.village_district[village]]
+        elif village_name in DEMO_VILLAGES:
+            district = DEMO_VILLAGES[village_name][0]
+        market = self.market_index.get(district)
+        return market if market is not None else sum(map(ord, village_name)) % len(self.markets)
+
+    def _day(self, ts: Optional[float]) -> int:
+        day = (day_index(ts) if ts is not None else self.today) - self.start_day
+        return min(max(day, 0), self.days - 1)
+
+    def price(self, product_name: str, market: int = 0, ts: Optional[float] = None) -> float:
+        """Modal price in ₹/kg on the day of `ts` (today by default)"""
+        return float(self.prices[self._day(ts), self.commodity_for(product_name), market])
+
+    def quote(self, product_name: str, market: int = 0, ts: Optional[float] = None, rng=random) -> int:
+        """A farmer's asking price: the day's modal price with a small individual markup"""
+        return max(1, round(self.price(product_name, market, ts) * rng.uniform(0.95, 1.15)))
+
+    def bid(self, product_name: str, quantity: int, market: int = 0, ts: Optional[float] = None, rng=random) -> int:
+        """A buyer's total bid for `quantity` kg, a little under or at the modal price"""
+        return max(1, round(quantity * self.price(product_name, market, ts) * rng.uniform(0.85, 1.02)))
+
+    # ---- endpoint payloads ----
+
+    def prices_payload(self, market: Optional[int] = None, ts: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Rows shaped like /marketplace/prices: today's price of every commodity in one market or all"""
+        day = self._day(ts)
+        markets = range(len(self.markets)) if market is None else [market]
+        return [{"product": name, "price": round(float(self.prices[day, c, m]), 1), "unit": "kg",
+                 "location": self.markets[m]}
+                for m in markets for c, name in enumerate(self.commodities)]
+
+    def trend(self, product_name: str, market: int = 0, days: int = 30,
+              ts: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Rows shaped like /marketplace/price-trends: the last `days` daily prices"""
+        end = self._day(ts)
+        commodity = self.commodity_for(product_name)
+        return [{"date": date.fromordinal(EPOCH_ORDINAL + self.start_day + day).isoformat(),
+                 "price": round(float(self.prices[day, commodity, market]), 1)}
+                for day in range(max(0, end - days + 1), end + 1)]
+
+    def export(self, path: str):
+        """Write the whole series as JSON (commodity → market → daily prices) for the mock server"""
+        with open(path, "w") as f:
+            json.dump({
+                "startDate": date.fromordinal(EPOCH_ORDINAL + self.start_day).isoformat(),
+                "unit": "kg",
+                "commodities": self.commodities,
+                "markets": self.markets,
+                "prices": np.round(self.prices.transpose(1, 2, 0).astype(np.float64), 1).tolist(),
+            }, f, separators=(",", ":"))
+
+def synthetic_commodities(count: int, seed: Optional[int] = None) -> Dict[str, Tuple[str, float, float, int]]:
+    """The commodity table extended with generated varieties up to `count` commodities"""
+    rng = random.Random(seed)
+    commodities = dict(COMMODITY_PRICES)
+    names = list(COMMODITY_PRICES)
+    while len(commodities) < count:
+        name = rng.choice(names)
+        category, base, amplitude, peak = COMMODITY_PRICES[name]
+        commodities[f"{name} (variety {len(commodities)})"] = (
+            category, round(base * rng.uniform(0.7, 1.4), 1), amplitude * rng.uniform(0.7, 1.3),
+            (peak + rng.randint(-30, 30)) % 365)
+    return commodities
+
+def main():
+    """Generate a large price universe, report timing and memory, optionally export it"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Mandi Price Model')
+    parser.add_argument('--commodities', type=int, default=200,
+                       help='Commodities (the built-in table is extended with varieties)')
+    parser.add_argument('--markets', type=int, default=100,
+                       help='Markets (district mandis first, then numbered mandis)')
+    parser.add_argument('--days', type=int, default=365,
+                       help='Days of history')
+    parser.add_argument('--seed', type=int, default=42,
+                       help='Random seed')
+    parser.add_argument('--output', default=None,
+                       help='Write the series as JSON for the mock server (PRICE_SERIES=path)')
+
+    args = parser.parse_args()
+
+    markets = list(DISTRICT_NAMES)[:args.markets]
+    markets += [f"Mandi {i + 1:03d}" for i in range(len(markets), args.markets)]
+    started = time.perf_counter()
+    model = PriceModel(synthetic_commodities(args.commodities, args.seed), markets, history_days=args.days,
+                       seed=args.seed)
+    elapsed = time.perf_counter() - started
+    print(f"📈 {len(model.commodities)} commodities × {len(model.markets)} markets × {model.days} days "
+          f"({model.prices.size:,} prices, {model.prices.nbytes / 1e6:.1f} MB) in {elapsed:.2f}s")
+
+    started = time.perf_counter()
+    lookups = 100_000
+    for _ in range(lookups):
+        model.quote(random.choice(model.commodities), random.randrange(len(model.markets)))
+    elapsed = time.perf_counter() - started
+    print(f"🏷️ {lookups:,} quotes in {elapsed:.2f}s ({lookups / elapsed:,.0f}/s)")
+
+    tomatoes = [point["price"] for point in model.trend("Tomatoes", 0, days=args.days)]
+    wheat = [point["price"] for point in model.trend("Wheat", 0, days=args.days)]
+    print(f"🍅 Tomatoes in {model.markets[0]}: ₹{min(tomatoes)}–₹{max(tomatoes)}/kg over {len(tomatoes)} days")
+    print(f"🌾 Wheat in {model.markets[0]}: ₹{min(wheat)}–₹{max(wheat)}/kg")
+
+    if args.output:
+        model.export(args.output)
+        print(f"💾 Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Simulator Profiler
+Sampled CPU stacks per worker thread, periodic tracemalloc top allocators and per-method wall time, written as diffable text
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Any, Tuple
+
+from metrics import Histogram
+
+# Methods timed on every simulator: the event mix plus the chart updates it calls
+PROFILED_METHOD = re.compile(r"^(simulate_\w+|update_\w+|send_analytics_update)$")
+# Wall time buckets in seconds (10 µs .. 10 s)
+METHOD_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 0.01, 0.025, 0.05, 0.1, 0.25,
+                  0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _frame_name(code) -> str:
+    # The first line of the function rather than the current line, so samples from one function merge
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class Profiler:
+    """Profiles a running orchestrator without changing what the simulators do
+
+    - CPU: a sampler thread reads every thread's stack `hz` times a second.
+      Stacks are written per thread in folded form (`thread;outer;inner count`,
+      the input format of flamegraph.pl and speedscope), plus a self-time table.
+    - Allocations: tracemalloc snapshots every `alloc_interval` seconds, with
+      the top allocating lines written to one numbered file per snapshot.
+    - Methods: simulate_*, update_* and send_analytics_update are wrapped on
+      each simulator and timed into a histogram per role and method.
+    Files hold no timestamps and are sorted, so two runs can be diffed directly.
+    """
+
+    def __init__(self, directory: str, hz: float = 100.0, alloc_interval: float = 60.0, alloc_top: int = 25):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.interval = 1.0 / hz
+        self.alloc_interval = alloc_interval
+        self.alloc_top = alloc_top
+        self.timings = Histogram("simulator_method_seconds", "Simulator method wall time", ("role", "method"),
+                                 METHOD_BUCKETS)
+        self.stacks: Dict[Tuple[str, ...], int] = {}
+        self.samples = 0
+        # Sampling wall time, to report the rate actually achieved (the GIL and stack walks slow the sampler)
+        self.sampling_seconds = 0.0
+        self.snapshots = 0
+        self._stopped = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_loop, name="Profiler", daemon=True)
+
+    # ---- per-method timing ----
+
+    def instrument(self, simulator: Any, role: str):
+        """Wrap the profiled methods on the instance; internal calls through self are timed too"""
+        for name in dir(simulator):
+            if PROFILED_METHOD.match(name):
+                setattr(simulator, name, self._timed(getattr(simulator, name), (role, name)))
+
+    def _timed(self, method, labels: Tuple[str, str]):
+        observe = self.timings.observe
+        perf_counter = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                observe(labels, perf_counter() - started)
+
+        wrapper.__name__ = labels[1]
+        return wrapper
+
+    # ---- sampling ----
+
+    def start(self):
+        if self.alloc_interval > 0:
+            tracemalloc.start()
+        self._sampler.start()
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        frame_names: Dict[Any, str] = {}
+        started = time.perf_counter()
+        next_snapshot = started + self.alloc_interval
+        # Sample on a fixed schedule so time spent walking stacks does not stretch the interval
+        next_sample = started + self.interval
+        while not self._stopped.wait(max(0.0, next_sample - time.perf_counter())):
+            next_sample = max(next_sample + self.interval, time.perf_counter())
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    name = frame_names.get(code)
+                    if name is None:
+                        name = frame_names[code] = _frame_name(code)
+                    stack.append(name)
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                key = tuple(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+            if self.alloc_interval > 0 and time.perf_counter() >= next_snapshot:
+                self.write_allocations()
+                next_snapshot += self.alloc_interval
+        self.sampling_seconds = time.perf_counter() - started
+
+    def write_allocations(self):
+        """Top allocating source lines right now, as alloc_NN.txt"""
+        self.snapshots += 1
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ])
+        stats = snapshot.statistics("lineno")
+        total = sum(stat.size for stat in stats)
+        path = os.path.join(self.directory, f"alloc_{self.snapshots:02d}.txt")
+        with open(path, "w") as f:
+            f.write(f"# snapshot {self.snapshots}: {total / 1024:,.0f} KiB live in {len(stats):,} lines\n")
+            f.write("# KiB\tblocks\tline\n")
+            for stat in stats[:self.alloc_top]:
+                frame = stat.traceback[0]
+                f.write(f"{stat.size / 1024:,.1f}\t{stat.count}\t"
+                        f"{os.path.basename(frame.filename)}:{frame.lineno}\n")
+
+    # ---- output ----
+
+    def stop(self) -> List[str]:
+        """Stop sampling and write every report; returns the files written"""
+        if self._stopped.is_set():
+            return []
+        self._stopped.set()
+        if self._sampler.is_alive():
+            self._sampler.join()
+        if tracemalloc.is_tracing():
+            self.write_allocations()
+            tracemalloc.stop()
+        return [self.write_folded(), self.write_self_time(), self.write_methods()]
+
+    def write_folded(self) -> str:
+        path = os.path.join(self.directory, "cpu.folded")
+        with open(path, "w") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{';'.join(stack)} {count}\n")
+        return path
+
+    def write_self_time(self) -> str:
+        """Per thread: functions by share of samples in which they were on top of the stack"""
+        per_thread: Dict[str, Dict[str, int]] = {}
+        for stack, count in self.stacks.items():
+            leaves = per_thread.setdefault(stack[0], {})
+            leaves[stack[-1]] = leaves.get(stack[-1], 0) + count
+        path = os.path.join(self.directory, "cpu_top.txt")
+        with open(path, "w") as f:
+            achieved = self.samples / self.sampling_seconds if self.sampling_seconds > 0 else 0.0
+            f.write(f"# {self.samples:,} samples in {self.sampling_seconds:.1f}s: {achieved:.0f} Hz achieved, "
+                    f"{1 / self.interval:.0f} Hz requested\n")
+            for thread in sorted(per_thread):
+                leaves = per_thread[thread]
+                total = sum(leaves.values())
+                f.write(f"\n## {thread} ({total:,} samples)\n")
+                for name, count in sorted(leaves.items(), key=lambda item: (-item[1], item[0]))[:20]:
+                    f.write(f"{count / total * 100:5.1f}%\t{count}\t{name}\n")
+        return path
+
+    def write_methods(self) -> str:
+        """role, method, calls, total/mean ms and the bucket bound under which 99% of calls finished"""
+        path = os.path.join(self.directory, "methods.tsv")
+        bounds = METHOD_BUCKETS + (float("inf"),)
+        with open(path, "w") as f:
+            f.write("role\tmethod\tcalls\ttotal_ms\tmean_ms\tp99_ms_le\n")
+            for (role, method), (counts, total) in sorted(self.timings.values.items()):
+                calls = sum(counts)
+                cumulative, p99 = 0, bounds[-1]
+                for bound, count in zip(bounds, counts):
+                    cumulative += count
+                    if cumulative >= 0.99 * calls:
+                        p99 = bound
+                        break
+                f.write(f"{role}\t{method}\t{calls}\t{total * 1000:.1f}\t{total / calls * 1000:.3f}\t"
+                        f"{p99 * 1000:g}\n")
+        return path
+
+def main():
+    """Profile generator-only work of every dashboard simulator for a few seconds"""
+    import argparse
+    import random
+
+    from main_simulator import ChartSimulatorOrchestrator, SIMULATOR_ROLES
+
+    parser = argparse.ArgumentParser(description='Simulator Profiler check')
+    parser.add_argument('--output', default='profile_check',
+                       help='Output directory')
+    parser.add_argument('--seconds', type=float, default=10.0,
+                       help='How long to run')
+    parser.add_argument('--hz', type=float, default=100.0,
+                       help='CPU samples per second')
+
+    args = parser.parse_args()
+
+    orchestrator = ChartSimulatorOrchestrator("http://127.0.0.1:9/api/v1", world_users=1000, history_days=30)
+    profiler = Profiler(args.output, args.hz, alloc_interval=args.seconds / 2)
+    methods: Dict[str, List[Any]] = {}
+    for role, simulator in zip(SIMULATOR_ROLES.values(), orchestrator.simulators):
+        profiler.instrument(simulator, role)
+        # Chart updates only: anything that would try the network is left out
+        methods[role] = [getattr(simulator, name) for name in dir(simulator) if name.startswith("update_")]
+    random.seed(42)
+    profiler.start()
+    end = time.time() + args.seconds
+    calls = {role: 0 for role in methods}
+
+    def worker(role: str):
+        while time.time() < end:
+            for method in methods[role]:
+                method()
+                calls[role] += 1
+
+    workers = [threading.Thread(target=worker, args=(role,), name=f"Simulator-{role}") for role in methods]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    for path in profiler.stop():
+        print(f"📝 {path}")
+    print(f"⏱️ {sum(calls.values()):,} method calls, {profiler.samples:,} CPU samples "
+          f"({profiler.samples / max(profiler.sampling_seconds, 1e-9):.0f}/s of {args.hz:g} requested), {profiler.snapshots} allocation snapshots")
+
+if __name__ == "__main__":
+    main()
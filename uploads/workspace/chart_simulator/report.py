@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""
+Run Report
+Streams a run's event log into a self-contained HTML report with inline SVG charts and a Markdown summary
+"""
+
+import html
+import math
+import os
+import time
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from load_stats import steady_state_start
+
+# Latency histogram bucket edges in ms, 2% apart from 0.05 ms to about 20 minutes
+LATENCY_EDGES_MS = 0.05 * 1.02 ** np.arange(860)
+# Points on the percentile curves, evenly spaced in "nines" (0 = p0, 1 = p90, 2 = p99, 3 = p99.9, 4 = p99.99)
+CURVE_NINES = np.linspace(0.0, 4.0, 81)
+ERROR_CLASSES = ("network", "4xx", "5xx")
+# Gauges on the queue depth chart (queue.delivered is a running total, not a depth)
+QUEUE_DEPTH_METRICS = ("queue.inSystem", "queue.pendingPickup", "client.requestsInFlight")
+PALETTE = ("#2b6cb0", "#dd6b20", "#38a169", "#d53f8c", "#805ad5", "#c53030", "#319795", "#b7791f", "#4a5568",
+           "#2c7a7b", "#9c4221", "#6b46c1")
+
+def iter_batches(path: str, columns: List[str], batch_rows: int = 65_536) -> Iterator[pa.RecordBatch]:
+    """Record batches of a Parquet or Arrow IPC file, a row group or batch at a time"""
+    if path.endswith(".parquet"):
+        # Pre-buffering would keep every column chunk read so far in memory; buffered reads keep it flat
+        parquet = pq.ParquetFile(path, pre_buffer=False, buffer_size=1 << 20)
+        yield from parquet.iter_batches(batch_size=batch_rows, columns=columns)
+        return
+    with pa.memory_map(path) as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            yield pa.RecordBatch.from_arrays([batch.column(name) for name in columns], names=columns)
+
+def _codes(column: pa.Array, names: Dict[str, int]) -> np.ndarray:
+    """Integer codes of a string column, numbered in `names` so they stay the same across batches"""
+    if not pa.types.is_dictionary(column.type):
+        column = column.dictionary_encode()
+    lookup = np.array([names.setdefault(value, len(names)) for value in column.dictionary.to_pylist()] or [0],
+                      dtype=np.int64)
+    return lookup[column.indices.fill_null(0).to_numpy(zero_copy_only=False)]
+
+def _seconds(column: pa.Array) -> np.ndarray:
+    return column.cast(pa.int64()).to_numpy(zero_copy_only=False) // 1_000_000
+
+def _add_counts(totals: Dict[int, int], keys: np.ndarray):
+    values, counts = np.unique(keys, return_counts=True)
+    for key, count in zip(values.tolist(), counts.tolist()):
+        totals[key] = totals.get(key, 0) + count
+
+def _add_sums(totals: Dict[int, float], keys: np.ndarray, weights: np.ndarray):
+    values, inverse = np.unique(keys, return_inverse=True)
+    for key, total in zip(values.tolist(), np.bincount(inverse, weights=weights).tolist()):
+        totals[key] = totals.get(key, 0.0) + total
+
+def _percentile(histogram: np.ndarray, pct: float, largest: float) -> float:
+    """Upper edge of the bucket holding the pct-th percentile (within 2%), capped at the largest value seen"""
+    total = histogram.sum()
+    if not total:
+        return 0.0
+    index = int(np.searchsorted(np.cumsum(histogram), pct / 100.0 * total))
+    upper = LATENCY_EDGES_MS[index] if index < len(LATENCY_EDGES_MS) else largest
+    return float(min(upper, largest))
+
+class RunReport:
+    """Aggregates of one run, built from its event log one record batch at a time
+
+    Only aggregates are kept, so memory does not grow with the size of the
+    log:
+    - events, requests, errors and total latency per second (errors split into network, 4xx and 5xx);
+    - a log-bucketed latency histogram per endpoint, so percentiles are within 2%;
+    - per-second values of every sampled metric (queue depth, client CPU and memory, ...).
+    The log is read twice. The first pass finds the measured window the way
+    the orchestrator does for saved results: after the explicit warmup or
+    once events/sec and mean latency hold steady, up to when the first role
+    stopped. The second pass fills the latency histograms from that window
+    only, and the charts and summary cover only that window.
+    """
+
+    def __init__(self, directory: str, warmup: Optional[float] = None, steady_window: int = 60,
+                 steady_tolerance: float = 0.1):
+        self.directory = directory
+        self.events_path = self._find("events")
+        self.metrics_path = self._find("metrics")
+        self.warmup = warmup
+        self.steady_window = steady_window
+        self.steady_tolerance = steady_tolerance
+        self.window: Dict[str, Any] = {}
+        self.rows = 0
+        self.endpoints: Dict[str, int] = {}
+        self.kinds: Dict[str, int] = {}
+        self.roles: Dict[str, int] = {}
+        self.metric_names: Dict[str, int] = {}
+        self.per_second: Dict[str, Dict[int, int]] = {name: {} for name in ("events", "requests") + ERROR_CLASSES}
+        self.latency_per_second: Dict[int, float] = {}
+        self.events_by_role: Dict[str, Dict[int, int]] = {}
+        buckets = len(LATENCY_EDGES_MS) + 1
+        self.histograms = np.zeros((0, buckets), dtype=np.int64)
+        self.errors = np.zeros(0, dtype=np.int64)
+        self.latency_sum = np.zeros(0)
+        self.latency_max = np.zeros(0)
+        self.metrics: Dict[str, Dict[int, float]] = {}
+
+    def _find(self, stem: str) -> Optional[str]:
+        for extension in ("parquet", "arrow"):
+            path = os.path.join(self.directory, f"{stem}.{extension}")
+            if os.path.exists(path):
+                return path
+        return None
+
+    # ---- reading ----
+
+    def read(self, batch_rows: int = 65_536) -> "RunReport":
+        if self.events_path is None:
+            raise FileNotFoundError(f"No events.parquet or events.arrow in {self.directory}")
+        if self.metrics_path is not None:
+            for batch in iter_batches(self.metrics_path, ["ts", "name", "value"], batch_rows):
+                self._add_metrics(batch)
+        for batch in iter_batches(self.events_path, ["ts", "role", "kind", "latency_ms", "status"], batch_rows):
+            self._count_events(batch)
+        self.window = self.measured_window()
+        for batch in iter_batches(self.events_path, ["ts", "kind", "endpoint", "latency_ms", "status"], batch_rows):
+            self._add_latencies(batch)
+        return self
+
+    def _count_events(self, batch: pa.RecordBatch):
+        self.rows += batch.num_rows
+        seconds = _seconds(batch.column(0))
+        kinds = _codes(batch.column(2), self.kinds)
+        is_event = kinds == self.kinds.get("event", -1)
+        is_request = kinds == self.kinds.get("request", -1)
+        _add_counts(self.per_second["events"], seconds[is_event])
+        _add_counts(self.per_second["requests"], seconds[is_request])
+
+        roles = _codes(batch.column(1), self.roles)[is_event]
+        for role, code in self.roles.items():
+            _add_counts(self.events_by_role.setdefault(role, {}), seconds[is_event][roles == code])
+
+        seconds = seconds[is_request]
+        latency = batch.column(3).to_numpy(zero_copy_only=False)[is_request].astype(np.float64)
+        status = batch.column(4).to_numpy(zero_copy_only=False)[is_request]
+        _add_sums(self.latency_per_second, seconds, latency)
+        for name, failed in zip(ERROR_CLASSES, (status == 0, (status >= 400) & (status < 500), status >= 500)):
+            _add_counts(self.per_second[name], seconds[failed])
+
+    def _add_latencies(self, batch: pa.RecordBatch):
+        seconds = _seconds(batch.column(0))
+        kinds = _codes(batch.column(1), self.kinds)
+        start, end = self.span()
+        keep = (kinds == self.kinds.get("request", -1)) & (seconds >= start) & (seconds <= end)
+        endpoints = _codes(batch.column(2), self.endpoints)[keep]
+        latency = batch.column(3).to_numpy(zero_copy_only=False)[keep].astype(np.float64)
+        status = batch.column(4).to_numpy(zero_copy_only=False)[keep]
+
+        count = len(self.endpoints)
+        if self.histograms.shape[0] < count:
+            grow = count - self.histograms.shape[0]
+            self.histograms = np.vstack([self.histograms, np.zeros((grow, self.histograms.shape[1]), np.int64)])
+            self.errors = np.concatenate([self.errors, np.zeros(grow, np.int64)])
+            self.latency_sum = np.concatenate([self.latency_sum, np.zeros(grow)])
+            self.latency_max = np.concatenate([self.latency_max, np.zeros(grow)])
+        buckets = self.histograms.shape[1]
+        keys = endpoints * buckets + np.searchsorted(LATENCY_EDGES_MS, latency, side="right")
+        self.histograms += np.bincount(keys, minlength=count * buckets).reshape(count, buckets)
+        self.errors += np.bincount(endpoints[(status == 0) | (status >= 400)], minlength=count)
+        self.latency_sum += np.bincount(endpoints, weights=latency, minlength=count)
+        np.maximum.at(self.latency_max, endpoints, latency)
+
+    def _add_metrics(self, batch: pa.RecordBatch):
+        seconds = _seconds(batch.column(0)).tolist()
+        names = _codes(batch.column(1), self.metric_names).tolist()
+        values = batch.column(2).to_numpy(zero_copy_only=False).tolist()
+        lookup = {code: name for name, code in self.metric_names.items()}
+        for second, code, value in zip(seconds, names, values):
+            self.metrics.setdefault(lookup[code], {})[second] = value
+
+    # ---- measured window ----
+
+    def full_span(self) -> Tuple[int, int]:
+        """First and last second with any event or request"""
+        seconds = [second for name in ("events", "requests") for second in self.per_second[name]]
+        return (min(seconds), max(seconds)) if seconds else (0, 0)
+
+    def measured_window(self) -> Dict[str, Any]:
+        """Seconds of the run that count, as offsets from its first second, and how the start was found"""
+        first, last = self.full_span()
+        end = last - first + 1
+        if "scenario.users" not in self.metrics:
+            # The orchestrator stops its simulators one after another; stop at the first to go quiet
+            end = min([end] + [max(seconds) - first + 1 for seconds in self.events_by_role.values() if seconds])
+        # Simulators start a second apart, so load is not complete before the last one is running
+        ramp = max(0, sum(1 for seconds in self.events_by_role.values() if seconds) - 1)
+        if self.warmup is not None:
+            start, warmup = int(self.warmup), "explicit"
+        elif "scenario.users" in self.metrics:
+            # Load changes on purpose in a scenario run, so there is no warmup to cut
+            start, warmup = 0, "scenario"
+        else:
+            events = [self.per_second["events"].get(first + second, 0) for second in range(end)]
+            latency = [self.latency_per_second[first + second] / self.per_second["requests"][first + second]
+                       if self.per_second["requests"].get(first + second) else None for second in range(end)]
+            series = [events, latency] if any(value is not None for value in latency) else [events]
+            start = steady_state_start(series, self.steady_window, self.steady_tolerance, ramp)
+            warmup = "detected"
+            if start is None:
+                start, warmup = ramp, "undetected"
+        start = min(start, max(0, end - 1))
+        return {"start": start, "end": end, "warmup": warmup, "runSeconds": last - first + 1 if self.rows else 0}
+
+    # ---- aggregates ----
+
+    def span(self) -> Tuple[int, int]:
+        """First and last second of the measured window"""
+        first, _ = self.full_span()
+        return first + self.window.get("start", 0), first + self.window.get("end", 1) - 1
+
+    def _total(self, counts: Dict[int, int]) -> int:
+        start, end = self.span()
+        return sum(count for second, count in counts.items() if start <= second <= end)
+
+    def series(self, counts: Dict[int, int], width: int) -> Tuple[List[float], List[float]]:
+        """Per-second rate in bins of `width` seconds, as (seconds since start, rate) with empty bins as zero"""
+        start, end = self.span()
+        bins = (end - start) // width + 1
+        totals = np.zeros(bins)
+        for second, count in counts.items():
+            if start <= second <= end:
+                totals[(second - start) // width] += count
+        return [float(i * width) for i in range(bins)], (totals / width).tolist()
+
+    def gauge(self, name: str, width: int) -> Tuple[List[float], List[float]]:
+        """A sampled metric averaged over bins of `width` seconds"""
+        start, end = self.span()
+        bins: Dict[int, List[float]] = {}
+        for second, value in self.metrics.get(name, {}).items():
+            if start <= second <= end:
+                bins.setdefault((second - start) // width, []).append(value)
+        keys = sorted(bins)
+        return [float(key * width) for key in keys], [sum(bins[key]) / len(bins[key]) for key in keys]
+
+    def endpoint_summary(self) -> List[Dict[str, Any]]:
+        """Count, errors, mean and p50/p95/p99/max latency per endpoint, busiest first"""
+        rows = []
+        for endpoint, code in self.endpoints.items():
+            histogram = self.histograms[code]
+            count = int(histogram.sum())
+            if not count:
+                continue
+            largest = float(self.latency_max[code])
+            rows.append({
+                "endpoint": endpoint or "(none)",
+                "count": count,
+                "errors": int(self.errors[code]),
+                "mean_ms": float(self.latency_sum[code]) / count,
+                "p50_ms": _percentile(histogram, 50, largest),
+                "p95_ms": _percentile(histogram, 95, largest),
+                "p99_ms": _percentile(histogram, 99, largest),
+                "max_ms": largest,
+                "curve": [_percentile(histogram, 100 * (1 - 10 ** -nines), largest) for nines in CURVE_NINES],
+            })
+        return sorted(rows, key=lambda row: -row["count"])
+
+    def summary(self) -> Dict[str, Any]:
+        start, end = self.span()
+        duration = end - start + 1 if self.rows else 0
+        events = self._total(self.per_second["events"])
+        requests = self._total(self.per_second["requests"])
+        errors = {name: self._total(self.per_second[name]) for name in ERROR_CLASSES}
+        events_by_role = {role: self._total(counts) for role, counts in self.events_by_role.items()}
+        peaks = {}
+        for name, values in sorted(self.metrics.items()):
+            values = [value for second, value in values.items() if start <= second <= end]
+            if values:
+                peaks[name] = {"mean": sum(values) / len(values), "max": max(values)}
+        return {
+            "directory": self.directory,
+            "rows": self.rows,
+            "started": self.full_span()[0],
+            "durationSeconds": duration,
+            "window": self.window,
+            "events": events,
+            "requests": requests,
+            "eventsPerSecond": events / duration if duration else 0.0,
+            "peakEventsPerSecond": max((count for second, count in self.per_second["events"].items()
+                                        if start <= second <= end), default=0),
+            "requestsPerSecond": requests / duration if duration else 0.0,
+            "errors": errors,
+            "errorRate": sum(errors.values()) / requests if requests else 0.0,
+            "eventsByRole": dict(sorted(events_by_role.items(), key=lambda item: -item[1])),
+            "endpoints": self.endpoint_summary(),
+            "metrics": peaks,
+        }
+
+# ---- rendering ----
+
+def _nice_step(span: float, ticks: int = 5) -> float:
+    raw = span / ticks if span > 0 else 1.0
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for factor in (1, 2, 2.5, 5, 10):
+        if raw <= factor * magnitude:
+            return factor * magnitude
+    return 10 * magnitude
+
+# Time axis steps in seconds, so ticks land on whole minutes and hours
+CLOCK_STEPS = (1, 2, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 10800, 21600, 43200, 86400)
+
+def _clock_step(span: float, ticks: int = 6) -> float:
+    for step in CLOCK_STEPS:
+        if span / step <= ticks:
+            return step
+    return _nice_step(span / 86400, ticks) * 86400
+
+def format_clock(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}" if hours else f"{rest // 60}:{rest % 60:02d}"
+
+def format_number(value: float) -> str:
+    if value >= 1000:
+        return f"{value:,.0f}"
+    return f"{value:.3g}"
+
+def svg_chart(title: str, lines: List[Tuple[str, List[float], List[float]]], y_label: str,
+              x_ticks: Optional[List[Tuple[float, str]]] = None, x_format=format_clock, log_y: bool = False,
+              width: int = 900, height: int = 260) -> str:
+    """A line chart as an inline <svg>; each line is (label, xs, ys)"""
+    left, right, top, bottom = 64, 16, 34, 34
+    plot_w, plot_h = width - left - right, height - top - bottom
+    lines = [line for line in lines if line[1]]
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'viewBox="0 0 {width} {height}" role="img"><title>{html.escape(title)}</title>',
+             f'<text x="{left}" y="16" class="title">{html.escape(title)}</text>']
+    if not lines:
+        parts.append(f'<text x="{left + plot_w / 2}" y="{top + plot_h / 2}" text-anchor="middle" class="muted">'
+                     f'no data</text></svg>')
+        return "".join(parts)
+
+    xs = [x for _, line_xs, _ in lines for x in line_xs]
+    ys = [y for _, _, line_ys in lines for y in line_ys]
+    x_min, x_max = min(xs), max(xs)
+    if x_max == x_min:
+        x_max = x_min + 1
+    if log_y:
+        positive = [y for y in ys if y > 0] or [1.0]
+        y_min = 10 ** math.floor(math.log10(min(positive)))
+        y_max = 10 ** math.ceil(math.log10(max(positive)))
+        if y_max <= y_min:
+            y_max = y_min * 10
+        scale = lambda y: (math.log10(max(y, y_min)) - math.log10(y_min)) / (math.log10(y_max) - math.log10(y_min))
+        y_ticks = [10 ** exponent for exponent in range(int(math.log10(y_min)), int(math.log10(y_max)) + 1)]
+    else:
+        step = _nice_step(max(ys) or 1.0)
+        y_min, y_max = 0.0, step * math.ceil((max(ys) or 1.0) / step)
+        scale = lambda y: (y - y_min) / (y_max - y_min)
+        y_ticks = [step * i for i in range(int(round(y_max / step)) + 1)]
+
+    def px(x: float) -> float:
+        return left + (x - x_min) / (x_max - x_min) * plot_w
+
+    def py(y: float) -> float:
+        return top + plot_h - scale(y) * plot_h
+
+    for tick in y_ticks:
+        parts.append(f'<line x1="{left}" x2="{left + plot_w}" y1="{py(tick):.1f}" y2="{py(tick):.1f}" class="grid"/>'
+                     f'<text x="{left - 6}" y="{py(tick) + 4:.1f}" text-anchor="end">{format_number(tick)}</text>')
+    if x_ticks is None:
+        step = _clock_step(x_max - x_min) if x_format is format_clock else _nice_step(x_max - x_min)
+        first = math.ceil(x_min / step) * step
+        x_ticks = [(first + i * step, x_format(first + i * step)) for i in range(int((x_max - first) / step) + 1)]
+    for tick, label in x_ticks:
+        parts.append(f'<line x1="{px(tick):.1f}" x2="{px(tick):.1f}" y1="{top}" y2="{top + plot_h}" class="grid"/>'
+                     f'<text x="{px(tick):.1f}" y="{top + plot_h + 16}" text-anchor="middle">'
+                     f'{html.escape(label)}</text>')
+    parts.append(f'<text x="14" y="{top + plot_h / 2}" transform="rotate(-90 14 {top + plot_h / 2})" '
+                 f'text-anchor="middle">{html.escape(y_label)}</text>')
+    legend_x = left + 220
+    for index, (label, line_xs, line_ys) in enumerate(lines):
+        color = PALETTE[index % len(PALETTE)]
+        points = " ".join(f"{px(x):.1f},{py(y):.1f}" for x, y in zip(line_xs, line_ys))
+        parts.append(f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="1.5">'
+                     f'<title>{html.escape(label)}</title></polyline>')
+        if index < 8:
+            parts.append(f'<rect x="{legend_x}" y="8" width="10" height="10" fill="{color}"/>'
+                         f'<text x="{legend_x + 14}" y="17">{html.escape(label[:28])}</text>')
+            legend_x += 22 + 7 * min(len(label), 28)
+    parts.append("</svg>")
+    return "".join(parts)
+
+def bin_width(duration: int, points: int) -> int:
+    """Seconds per chart point so that no line has more than `points` points"""
+    return max(1, math.ceil(duration / points))
+
+def render_charts(report: RunReport, summary: Dict[str, Any], points: int = 600) -> List[str]:
+    width = bin_width(summary["durationSeconds"], points)
+    per = f" (per {width}s)" if width > 1 else ""
+    charts = [svg_chart(f"Throughput{per}", [
+        ("events/s", *report.series(report.per_second["events"], width)),
+        ("requests/s", *report.series(report.per_second["requests"], width)),
+    ], "per second")]
+    users = sorted(name for name in report.metrics if name.startswith("scenario.users"))
+    if users:
+        # Scenario runs: set against throughput and latency to find where the backend stops keeping up
+        charts.append(svg_chart(f"Virtual users{per}", [(name, *report.gauge(name, width)) for name in users],
+                                "users"))
+
+    endpoints = summary["endpoints"][:len(PALETTE)]
+    nines_ticks = [(float(nines), label) for nines, label in
+                   zip(range(5), ("p0", "p90", "p99", "p99.9", "p99.99"))]
+    charts.append(svg_chart("Request latency by percentile", [
+        (row["endpoint"], CURVE_NINES.tolist(), row["curve"]) for row in endpoints
+    ], "ms", x_ticks=nines_ticks, log_y=True))
+
+    charts.append(svg_chart(f"Errors{per}", [
+        (name, *report.series(report.per_second[name], width)) for name in ERROR_CLASSES
+        if report.per_second[name]
+    ], "per second"))
+
+    depth = [name for name in QUEUE_DEPTH_METRICS if name in report.metrics]
+    charts.append(svg_chart(f"Queue depth{per}", [(name, *report.gauge(name, width)) for name in depth], "count"))
+    charts.append(svg_chart(f"Load generator CPU{per}", [
+        (name, *report.gauge(name, width)) for name in ("client.cpuPercent",) if name in report.metrics
+    ], "% of one core"))
+    charts.append(svg_chart(f"Load generator memory{per}", [
+        (name, *report.gauge(name, width)) for name in ("client.rssMiB",) if name in report.metrics
+    ], "MiB"))
+    return charts
+
+def _endpoint_rows(summary: Dict[str, Any]) -> List[List[str]]:
+    return [[row["endpoint"], f"{row['count']:,}", f"{row['errors']:,}", f"{row['mean_ms']:.1f}",
+             f"{row['p50_ms']:.1f}", f"{row['p95_ms']:.1f}", f"{row['p99_ms']:.1f}", f"{row['max_ms']:.1f}"]
+            for row in summary["endpoints"]]
+
+ENDPOINT_HEADER = ["Endpoint", "Requests", "Errors", "Mean ms", "p50 ms", "p95 ms", "p99 ms", "Max ms"]
+
+def _overview(summary: Dict[str, Any]) -> List[Tuple[str, str]]:
+    errors = summary["errors"]
+    window = summary["window"]
+    rows = [
+        ("Started", time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(summary["started"]))),
+        ("Duration", f"{format_clock(summary['durationSeconds'])} measured of {format_clock(window['runSeconds'])}: "
+                     f"{format_clock(window['start'])}-{format_clock(window['end'])} "
+                     f"(warmup {window['warmup']})"),
+        ("Events", f"{summary['events']:,} ({summary['eventsPerSecond']:.2f}/s, "
+                   f"peak {summary['peakEventsPerSecond']:,}/s)"),
+        ("Requests", f"{summary['requests']:,} ({summary['requestsPerSecond']:.2f}/s)"),
+        ("Errors", f"{sum(errors.values()):,} ({summary['errorRate'] * 100:.2f}%): "
+                   + ", ".join(f"{name} {count:,}" for name, count in errors.items())),
+        ("Events by role", ", ".join(f"{role} {count:,}" for role, count in summary["eventsByRole"].items())),
+    ]
+    for name, values in summary["metrics"].items():
+        if name.startswith(("queue.", "client.")):
+            rows.append((name, f"mean {values['mean']:,.1f}, max {values['max']:,.1f}"))
+    return rows
+
+STYLE = """
+body { font-family: -apple-system, "Segoe UI", Roboto, sans-serif; margin: 24px; color: #1a202c; }
+table { border-collapse: collapse; margin: 12px 0 24px; }
+th, td { border-bottom: 1px solid #e2e8f0; padding: 4px 10px; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+svg { display: block; margin: 12px 0; }
+svg text { font-size: 11px; fill: #4a5568; }
+svg text.title { font-size: 13px; font-weight: 600; fill: #1a202c; }
+svg .grid { stroke: #edf2f7; }
+"""
+
+def render_html(report: RunReport, summary: Dict[str, Any], points: int = 600) -> str:
+    def table(header: List[str], rows: List[List[str]]) -> str:
+        head = "".join(f"<th>{html.escape(cell)}</th>" for cell in header)
+        body = "".join("<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in row) + "</tr>" for row in rows)
+        return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+    return "\n".join([
+        "<!DOCTYPE html>",
+        '<html lang="en"><head><meta charset="utf-8">',
+        f"<title>Simulator run report: {html.escape(summary['directory'])}</title>",
+        f"<style>{STYLE}</style></head><body>",
+        f"<h1>📊 Simulator run report</h1><p>{html.escape(summary['directory'])}, "
+        f"{summary['rows']:,} log rows</p>",
+        table(["", ""], [[name, value] for name, value in _overview(summary)]),
+        *render_charts(report, summary, points),
+        "<h2>Endpoints</h2>",
+        table(ENDPOINT_HEADER, _endpoint_rows(summary)),
+        "</body></html>",
+    ])
+
+def render_markdown(summary: Dict[str, Any]) -> str:
+    lines = [f"# Simulator run report: {summary['directory']}", ""]
+    lines += [f"- **{name}**: {value}" for name, value in _overview(summary)]
+    lines += ["", "## Endpoints", "", "| " + " | ".join(ENDPOINT_HEADER) + " |",
+              "|" + "|".join(["---"] + ["---:"] * (len(ENDPOINT_HEADER) - 1)) + "|"]
+    lines += ["| " + " | ".join(row) + " |" for row in _endpoint_rows(summary)]
+    return "\n".join(lines) + "\n"
+
+def main():
+    """Build the HTML and Markdown report for one event log directory"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Simulator Run Report')
+    parser.add_argument('directory',
+                       help='Event log directory (--event-log of main_simulator.py)')
+    parser.add_argument('--html', default=None,
+                       help='HTML report path (default DIRECTORY/report.html)')
+    parser.add_argument('--markdown', default=None,
+                       help='Markdown summary path (default DIRECTORY/report.md)')
+    parser.add_argument('--batch-rows', type=int, default=65_536,
+                       help='Rows read at a time')
+    parser.add_argument('--points', type=int, default=600,
+                       help='Most points per chart line; longer runs are averaged into wider bins')
+    parser.add_argument('--warmup', type=float, default=None,
+                       help='Seconds left out of the report (default: detect steady state)')
+    parser.add_argument('--steady-window', type=int, default=60,
+                       help='Seconds throughput and latency must hold steady for steady-state detection')
+    parser.add_argument('--steady-tolerance', type=float, default=0.1,
+                       help='Relative change still counted as steady')
+
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    report = RunReport(args.directory, args.warmup, args.steady_window, args.steady_tolerance).read(args.batch_rows)
+    summary = report.summary()
+    html_path = args.html or os.path.join(args.directory, "report.html")
+    markdown_path = args.markdown or os.path.join(args.directory, "report.md")
+    with open(html_path, "w", encoding="utf-8") as f:
+        f.write(render_html(report, summary, args.points))
+    with open(markdown_path, "w", encoding="utf-8") as f:
+        f.write(render_markdown(summary))
+    print(f"📊 {report.rows:,} rows in {time.perf_counter() - started:.1f}s")
+    print(f"📝 {html_path}")
+    print(f"📝 {markdown_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Benchmark Results Store
+Saves benchmark and load-run results with an environment fingerprint, and gates regressions against a stored baseline
+"""
+
+import json
+import math
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Fingerprint fields that make two results incomparable when they differ
+COMPARABLE_ENVIRONMENT = ("hostname", "cpuModel", "cpuCount", "python", "implementation")
+# Throughput verdicts that actually decided something, and the exit status when none did
+DECIDED = ("REGRESSION", "improved", "ok")
+EXIT_UNDECIDED = 3
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              timeout=5, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+def _memory_total_kib() -> Optional[int]:
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def environment_fingerprint() -> Dict[str, Any]:
+    """Where and with what a result was produced"""
+    versions = {}
+    for package in ("requests", "numpy", "pyarrow"):
+        module = sys.modules.get(package)
+        if module is None:
+            try:
+                module = __import__(package)
+            except ImportError:
+                continue
+        versions[package] = getattr(module, "__version__", "?")
+    return {
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "cpuModel": _cpu_model(),
+        "cpuCount": os.cpu_count(),
+        "memoryKiB": _memory_total_kib(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "packages": versions,
+        "gitCommit": _git_commit(),
+    }
+
+def memory_peak_kib() -> Optional[int]:
+    """Peak resident memory of this process so far"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+def memory_current_kib() -> Optional[int]:
+    """Resident memory of this process now (the peak where /proc is not available)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * (os.sysconf("SC_PAGE_SIZE") // 1024)
+    except (OSError, ValueError, AttributeError):
+        return memory_peak_kib()
+
+# ---- normalized results ----
+
+def benchmark_result(report: Dict[str, Any], name: str = "") -> Dict[str, Any]:
+    """A generator benchmark report (benchmark.py) as a stored result"""
+    throughput = {}
+    for case in report["results"]:
+        rate = case["eventsPerSecond"]
+        throughput[f"{case['role']}.{case['method']}"] = {
+            "n": len(case.get("samples", [])) or None, "median": rate["median"], "mean": rate["mean"],
+            "stdev": rate["stdev"], "samples": case.get("samples", []),
+        }
+    return {
+        "kind": "benchmark",
+        "name": name,
+        "createdAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment_fingerprint(),
+        "config": report.get("config", {}),
+        "throughput": throughput,
+        "latency": {},
+        "memoryPeakKiB": memory_peak_kib(),
+        "details": report["results"],
+    }
+
+def load_result(summary: Dict[str, Any], config: Dict[str, Any], name: str = "") -> Dict[str, Any]:
+    """A load run summary (load_stats.RunRecorder.summary) as a stored result"""
+    return {
+        "kind": "load",
+        "name": name,
+        "createdAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment_fingerprint(),
+        "config": config,
+        "throughput": summary["throughput"],
+        "latency": summary["latency"],
+        "errors": summary["errors"],
+        "window": summary["window"],
+        "stages": summary.get("stages", []),
+        "memoryPeakKiB": memory_peak_kib(),
+    }
+
+class ResultsStore:
+    """A directory of results: `<kind>/<timestamp>-<name>.json` plus `baselines/<kind>-<baseline>.json`"""
+
+    def __init__(self, directory: str = "results"):
+        self.directory = directory
+
+    def save(self, result: Dict[str, Any]) -> str:
+        folder = os.path.join(self.directory, result["kind"])
+        os.makedirs(folder, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        suffix = f"-{result['name']}" if result.get("name") else ""
+        path = os.path.join(folder, f"{stamp}{suffix}.json")
+        with open(path, "w") as f:
+            json.dump(result, f, indent=2)
+        return path
+
+    def baseline_path(self, kind: str, name: str = "default") -> str:
+        return os.path.join(self.directory, "baselines", f"{kind}-{name}.json")
+
+    def promote(self, path: str, name: str = "default") -> str:
+        """Make a saved result the baseline `name` for its kind"""
+        result = load(path)
+        target = self.baseline_path(result["kind"], name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(path, target)
+        return target
+
+    def latest(self, kind: str) -> Optional[str]:
+        folder = os.path.join(self.directory, kind)
+        if not os.path.isdir(folder):
+            return None
+        names = sorted(name for name in os.listdir(folder) if name.endswith(".json"))
+        return os.path.join(folder, names[-1]) if names else None
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+# ---- comparison ----
+
+def _exact_u_p(u: float, n1: int, n2: int) -> float:
+    """Two-sided p-value of U from its exact null distribution (no ties)"""
+    # counts[i][j][value]: orderings of i first-sample and j second-sample values with U = value. The largest
+    # value either comes from the first sample (above all j others, adding j to U) or from the second.
+    counts = [[[1] if not i or not j else [0] * (i * j + 1) for j in range(n2 + 1)] for i in range(n1 + 1)]
+    for i in range(1, n1 + 1):
+        for j in range(1, n2 + 1):
+            row = counts[i][j]
+            for value, ways in enumerate(counts[i - 1][j]):
+                row[value + j] += ways
+            for value, ways in enumerate(counts[i][j - 1]):
+                row[value] += ways
+    distribution = counts[n1][n2]
+    low = sum(distribution[:int(u) + 1])
+    high = sum(distribution[int(math.ceil(u)):])
+    return min(1.0, 2 * min(low, high) / math.comb(n1 + n2, n1))
+
+def min_mann_whitney_p(n1: int, n2: int) -> float:
+    """Smallest two-sided p-value the test can reach with these sample sizes"""
+    return min(1.0, 2 / math.comb(n1 + n2, n1))
+
+def mann_whitney_p(a: List[float], b: List[float]) -> float:
+    """Two-sided p-value of the Mann-Whitney U test
+
+    Exact for small samples without ties, where the normal approximation
+    cannot reach small p-values; normal approximation with tie correction
+    otherwise.
+    """
+    n1, n2 = len(a), len(b)
+    if n1 < 2 or n2 < 2:
+        return 1.0
+    ranked = sorted([(value, 0) for value in a] + [(value, 1) for value in b])
+    ranks = [0.0] * len(ranked)
+    ties = 0.0
+    i = 0
+    while i < len(ranked):
+        j = i
+        while j + 1 < len(ranked) and ranked[j + 1][0] == ranked[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        size = j - i + 1
+        ties += size ** 3 - size
+        i = j + 1
+    rank_a = sum(rank for rank, (_, group) in zip(ranks, ranked) if group == 0)
+    u = rank_a - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    if not ties and n <= 40:
+        return _exact_u_p(u, n1, n2)
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / math.sqrt(variance)
+    return math.erfc(max(z, 0) / math.sqrt(2))
+
+def _throughput_verdict(base: Dict[str, Any], current: Dict[str, Any], min_change: float,
+                        alpha: float) -> Tuple[str, float, str]:
+    """Regression when the drop beats both the noise band and `min_change`, and is statistically significant"""
+    before, after = base["median"], current["median"]
+    if not before:
+        return "new", 0.0, ""
+    change = (after - before) / before
+    if base.get("samples") and current.get("samples"):
+        floor = min_mann_whitney_p(len(base["samples"]), len(current["samples"]))
+        if floor >= alpha:
+            # No outcome could pass, so say so instead of quietly reporting ok
+            return "inconclusive", change, f"p≥{floor:.3f} at best, need p<{alpha:g}: repeat more"
+        p = mann_whitney_p(base["samples"], current["samples"])
+        significant = p < alpha
+        evidence = f"p={p:.3f}"
+    else:
+        # Per-second load throughput: Welch's standard error of the difference in means
+        n1, n2 = base.get("n") or 1, current.get("n") or 1
+        error = math.sqrt(base.get("stdev", 0) ** 2 / n1 + current.get("stdev", 0) ** 2 / n2)
+        difference = current.get("mean", after) - base.get("mean", before)
+        significant = error == 0 or abs(difference) > 2 * error
+        evidence = f"±{2 * error:,.1f}"
+    if significant and change <= -min_change:
+        return "REGRESSION", change, evidence
+    if significant and change >= min_change:
+        return "improved", change, evidence
+    return "ok", change, evidence
+
+def _latency_verdict(base: Dict[str, Any], current: Dict[str, Any], min_change: float) -> Tuple[str, float, str]:
+    """Regression when the current p99 interval sits wholly above the baseline's, by more than `min_change`"""
+    before, after = base["p99_ms"], current["p99_ms"]
+    change = (after - before) / before if before else 0.0
+    base_high = base.get("p99_high_ms", before)
+    current_low = current.get("p99_low_ms", after)
+    evidence = f"[{current_low}, {current.get('p99_high_ms', after)}] vs [{base.get('p99_low_ms', before)}, {base_high}]"
+    if current_low > base_high and change >= min_change:
+        return "REGRESSION", change, evidence
+    if current.get("p99_high_ms", after) < base.get("p99_low_ms", before) and change <= -min_change:
+        return "improved", change, evidence
+    return "ok", change, evidence
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], min_change: float = 0.05,
+            alpha: float = 0.01, min_requests: int = 100) -> Dict[str, Any]:
+    """Rows per throughput series and endpoint p99, plus environment differences
+
+    `undecided` is set when no throughput row reached a verdict (all were
+    inconclusive or new, or no series matched), so the gate could not have
+    caught a regression.
+    """
+    rows = []
+    for key in sorted(set(baseline["throughput"]) & set(current["throughput"])):
+        status, change, evidence = _throughput_verdict(baseline["throughput"][key], current["throughput"][key],
+                                                       min_change, alpha)
+        rows.append({"metric": f"{key} /s", "baseline": baseline["throughput"][key]["median"],
+                     "current": current["throughput"][key]["median"], "change": change, "status": status,
+                     "evidence": evidence})
+    undecided = not any(row["status"] in DECIDED for row in rows)
+    for endpoint in sorted(set(baseline.get("latency", {})) & set(current.get("latency", {}))):
+        base, now = baseline["latency"][endpoint], current["latency"][endpoint]
+        if min(base["count"], now["count"]) < min_requests:
+            continue  # too few samples for a p99 to mean anything
+        status, change, evidence = _latency_verdict(base, now, min_change)
+        rows.append({"metric": f"{endpoint} p99 ms", "baseline": base["p99_ms"], "current": now["p99_ms"],
+                     "change": change, "status": status, "evidence": evidence})
+    environment = [(field, baseline["environment"].get(field), current["environment"].get(field))
+                   for field in COMPARABLE_ENVIRONMENT
+                   if baseline["environment"].get(field) != current["environment"].get(field)]
+    return {"rows": rows, "regressions": sum(row["status"] == "REGRESSION" for row in rows),
+            "inconclusive": sum(row["status"] == "inconclusive" for row in rows),
+            "undecided": undecided,
+            "environment": environment,
+            "memoryPeakKiB": (baseline.get("memoryPeakKiB"), current.get("memoryPeakKiB")),
+            "window": (baseline.get("window"), current.get("window"))}
+
+def print_comparison(comparison: Dict[str, Any]):
+    for field, before, after in comparison["environment"]:
+        print(f"⚠️ Environment differs: {field} {before!r} → {after!r} (results may not be comparable)")
+    icons = {"REGRESSION": "❌", "improved": "🚀", "ok": "✅", "new": "🆕", "inconclusive": "❔"}
+    width = max([len(row["metric"]) for row in comparison["rows"]] + [10])
+    for row in comparison["rows"]:
+        print(f"{icons[row['status']]} {row['metric']:<{width}} {row['baseline']:>12,.1f} → {row['current']:>12,.1f} "
+              f"{row['change'] * 100:+6.1f}%  {row['evidence']}")
+    for label, window in zip(("baseline", "current"), comparison.get("window", ())):
+        if window:
+            print(f"🔥 {label}: seconds {window['start']}-{window['end']} measured "
+                  f"(warmup {window.get('warmup', 'none')})")
+    before, after = comparison["memoryPeakKiB"]
+    if before and after:
+        print(f"💾 Memory peak {before / 1024:,.0f} MiB → {after / 1024:,.0f} MiB")
+    if comparison.get("inconclusive"):
+        print(f"⚠️ {comparison['inconclusive']} comparison(s) had too few samples for --alpha "
+              f"and could not detect a regression")
+    print(f"{'❌' if comparison['regressions'] else '✅'} {comparison['regressions']} regression(s) "
+          f"in {len(comparison['rows'])} comparisons")
+    if comparison.get("undecided") and not comparison["regressions"]:
+        print(f"❔ No throughput comparison reached a verdict, so this is not a pass (exit {EXIT_UNDECIDED})")
+
+def main():
+    """List results, promote a baseline, or compare a result with a baseline (exit 1 on regression, 3 if undecided)"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark Results Store')
+    parser.add_argument('--results', default='results',
+                       help='Results directory')
+    commands = parser.add_subparsers(dest='command', required=True)
+    listing = commands.add_parser('list', help='Show stored results and baselines')
+    promote = commands.add_parser('baseline', help='Make a result the baseline')
+    promote.add_argument('result',
+                       help='Result file (or "latest-benchmark" / "latest-load")')
+    promote.add_argument('--name', default='default',
+                       help='Baseline name')
+    check = commands.add_parser('compare', help='Compare a result against a baseline')
+    check.add_argument('result',
+                       help='Result file (or "latest-benchmark" / "latest-load")')
+    check.add_argument('--baseline', default='default',
+                       help='Baseline name or result file')
+    check.add_argument('--min-change', type=float, default=0.05,
+                       help='Smallest relative change that can count as a regression')
+    check.add_argument('--alpha', type=float, default=0.01,
+                       help='Significance level for throughput samples')
+
+    args = parser.parse_args()
+    store = ResultsStore(args.results)
+
+    def resolve(path: str) -> str:
+        if path.startswith("latest-"):
+            latest = store.latest(path[len("latest-"):])
+            if latest is None:
+                parser.error(f"no {path[len('latest-'):]} results in {args.results}")
+            return latest
+        return path
+
+    if args.command == 'list':
+        for kind in ("benchmark", "load", "baselines"):
+            folder = os.path.join(args.results, kind)
+            if os.path.isdir(folder):
+                print(f"📁 {folder}")
+                for name in sorted(os.listdir(folder)):
+                    print(f"   {name}")
+    elif args.command == 'baseline':
+        print(f"📌 Baseline {store.promote(resolve(args.result), args.name)}")
+    else:
+        current = load(resolve(args.result))
+        baseline_path = args.baseline if os.path.exists(args.baseline) else store.baseline_path(current["kind"],
+                                                                                                 args.baseline)
+        if not os.path.exists(baseline_path):
+            parser.error(f"no baseline {baseline_path}; create one with: results_store.py baseline <result>")
+        comparison = compare(load(baseline_path), current, args.min_change, args.alpha)
+        print(f"🔍 {args.result} vs {baseline_path}")
+        print_comparison(comparison)
+        if comparison["regressions"]:
+            sys.exit(1)
+        sys.exit(EXIT_UNDECIDED if comparison["undecided"] else 0)
+
+if __name__ == "__main__":
+    main()
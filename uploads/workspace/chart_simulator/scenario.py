@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Load Scenario Profiles
+Declarative ramp, step, spike and soak phases (YAML or JSON) played against one live pool of virtual users
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+# Roles as recorded in logs and metrics, and the short names used in user IDs (buyer_001, hub_001, ...)
+ROLE_PREFIXES = {"buyer": "buyer", "farmer": "farmer", "admin": "admin", "hub_operator": "hub", "shg_leader": "shg"}
+ROLE_ALIASES = {**{role: role for role in ROLE_PREFIXES}, **{prefix: role for role, prefix in ROLE_PREFIXES.items()}}
+PHASE_TYPES = ("ramp", "step", "spike", "soak")
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def parse_duration(value) -> float:
+    """Seconds from a number of seconds or a string like `"90s"`, `"10m"`, `"1h30m"`"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip().replace(" ", "")
+    parts = re.findall(r"(\d+(?:\.\d+)?)([smhd]?)", text)
+    if not parts or "".join(number + unit for number, unit in parts) != text:
+        raise ValueError(f"Bad duration {value!r} (use seconds or e.g. 90s, 10m, 1h30m)")
+    return sum(float(number) * DURATION_UNITS[unit or "s"] for number, unit in parts)
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}" if hours else f"{rest // 60}:{rest % 60:02d}"
+
+def _role(name: str) -> str:
+    if name not in ROLE_ALIASES:
+        raise ValueError(f"Unknown role {name!r} (roles: {', '.join(ROLE_PREFIXES)})")
+    return ROLE_ALIASES[name]
+
+def parse_mix(mix: Optional[Dict[str, float]]) -> Dict[str, float]:
+    """Role weights as shares that sum to 1; roles left out get no users"""
+    weights = {_role(name): float(weight) for name, weight in (mix or {}).items()}
+    if not weights:
+        weights = {role: 1.0 for role in ROLE_PREFIXES}
+    total = sum(weights.values())
+    if total <= 0 or any(weight < 0 for weight in weights.values()):
+        raise ValueError(f"Mix weights must be non-negative with a positive total: {mix!r}")
+    return {role: weight / total for role, weight in weights.items()}
+
+def parse_rates(rate) -> Dict[str, float]:
+    """Events per second per user, one number for every role or a number per role"""
+    if rate is None:
+        return {}
+    if isinstance(rate, (int, float)):
+        return {role: float(rate) for role in ROLE_PREFIXES}
+    return {_role(name): float(value) for name, value in rate.items()}
+
+def allocate(total: int, mix: Dict[str, float]) -> Dict[str, int]:
+    """Split `total` users by the mix, largest remainders first, so the counts add up exactly"""
+    exact = {role: total * share for role, share in mix.items()}
+    counts = {role: int(value) for role, value in exact.items()}
+    by_remainder = sorted(exact, key=lambda role: (-(exact[role] - counts[role]), role))
+    for role in by_remainder[:total - sum(counts.values())]:
+        counts[role] += 1
+    return counts
+
+class Scenario:
+    """Phases compiled into a piecewise-linear number of users over time
+
+    A scenario file holds an optional `name`, a default `mix` (role weights),
+    a default `rate` (events/sec per user: one number or one per role; by
+    default each simulator's own think time) and a list of `phases`. Each
+    phase is written `{type: ramp, ...}` or `{ramp: {...}}` and may override
+    `mix` and `rate`:
+    - ramp: `to` users, linearly over `duration`;
+    - step: to `to` users in `steps` equal increments over `duration`, each
+      reached over `ramp` (10 s by default) and then held;
+    - spike: up to `users` over `ramp` (10 s), held for `duration`, back down over `ramp`;
+    - soak: hold the current users (or move to `users` over `ramp`) for `duration`.
+    """
+
+    def __init__(self, spec: Dict[str, Any], name: str = ""):
+        self.spec = spec
+        self.name = spec.get("name", name) or "scenario"
+        self.start_users = int(spec.get("start_users", 0))
+        default_mix = parse_mix(spec.get("mix"))
+        default_rates = parse_rates(spec.get("rate"))
+        if not spec.get("phases"):
+            raise ValueError("A scenario needs at least one phase")
+        self.phases: List[Dict[str, Any]] = []
+        # (start, end, users at start, users at end, phase index)
+        self.segments: List[Tuple[float, float, float, float, int]] = []
+        users, clock = float(self.start_users), 0.0
+        for index, raw in enumerate(spec["phases"]):
+            phase = self._normalize(raw, index)
+            mix = parse_mix(phase["mix"]) if "mix" in phase else default_mix
+            rates = {**default_rates, **parse_rates(phase.get("rate"))}
+            start = clock
+            users, clock = self._compile(phase, index, users, clock)
+            self.phases.append({"name": phase.get("name", f"{phase['type']} {index + 1}"), "type": phase["type"],
+                                "start": start, "end": clock, "mix": mix, "rates": rates,
+                                "peakUsers": max((max(segment[2], segment[3]) for segment in self.segments
+                                                  if segment[4] == index), default=users)})
+
+    @staticmethod
+    def _normalize(raw: Dict[str, Any], index: int) -> Dict[str, Any]:
+        if "type" not in raw and len(raw) == 1:
+            (kind, body), = raw.items()
+            raw = {"type": kind, **(body or {})}
+        if raw.get("type") not in PHASE_TYPES:
+            raise ValueError(f"Phase {index + 1}: type must be one of {', '.join(PHASE_TYPES)}, not {raw.get('type')!r}")
+        if "duration" not in raw:
+            raise ValueError(f"Phase {index + 1} ({raw['type']}) needs a duration")
+        return raw
+
+    def _add(self, start: float, end: float, before: float, after: float, index: int) -> float:
+        if end > start:
+            self.segments.append((start, end, before, after, index))
+        return end
+
+    def _compile(self, phase: Dict[str, Any], index: int, users: float, clock: float) -> Tuple[float, float]:
+        duration = parse_duration(phase["duration"])
+        kind = phase["type"]
+        if kind == "ramp":
+            target = float(phase["to"])
+            return target, self._add(clock, clock + duration, users, target, index)
+        if kind == "step":
+            target, steps = float(phase["to"]), int(phase.get("steps", 5))
+            hold = duration / steps
+            ramp = min(parse_duration(phase.get("ramp", 10)), hold)
+            for step in range(1, steps + 1):
+                level = users + (target - users) * step / steps
+                before = level - (target - users) / steps
+                self._add(clock, clock + ramp, before, level, index)
+                clock = self._add(clock + ramp, clock + hold, level, level, index)
+            return target, clock
+        if kind == "spike":
+            peak = float(phase["users"])
+            ramp = parse_duration(phase.get("ramp", 10))
+            clock = self._add(clock, clock + ramp, users, peak, index)
+            clock = self._add(clock, clock + duration, peak, peak, index)
+            return users, self._add(clock, clock + ramp, peak, users, index)
+        target = float(phase.get("users", users))
+        ramp = min(parse_duration(phase.get("ramp", 30 if target != users else 0)), duration)
+        self._add(clock, clock + ramp, users, target, index)
+        return target, self._add(clock + ramp, clock + duration, target, target, index)
+
+    @property
+    def duration(self) -> float:
+        return self.segments[-1][1] if self.segments else 0.0
+
+    def at(self, elapsed: float) -> Tuple[float, int]:
+        """Users wanted `elapsed` seconds in, and the phase running then"""
+        for start, end, before, after, index in self.segments:
+            if elapsed < end:
+                progress = (elapsed - start) / (end - start) if end > start else 1.0
+                return before + (after - before) * max(0.0, progress), index
+        start, end, before, after, index = self.segments[-1]
+        return after, index
+
+    def stages(self) -> List[Dict[str, Any]]:
+        """Every ramp and hold of the plan, the load levels to compare when looking for the latency knee"""
+        return [{"phase": self.phases[index]["name"], "start": start, "end": end, "usersFrom": before,
+                 "usersTo": after} for start, end, before, after, index in self.segments]
+
+    def describe(self) -> List[str]:
+        lines = []
+        for index, phase in enumerate(self.phases):
+            mix = ", ".join(f"{role} {share:.0%}" for role, share in phase["mix"].items() if share)
+            rates = (", ".join(f"{role} {rate:g}/s" for role, rate in phase["rates"].items())
+                     if phase["rates"] else "simulator think times")
+            lines.append(f"{index + 1}. {phase['name']} ({phase['type']}) {format_duration(phase['start'])}"
+                         f"-{format_duration(phase['end'])}, up to {phase['peakUsers']:.0f} users | {mix} | {rates}")
+        return lines
+
+def load_scenario(path: str) -> Scenario:
+    """Read a scenario from a .json file, or from YAML (needs pyyaml) for anything else"""
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            spec = json.load(f)
+        else:
+            import yaml
+            spec = yaml.safe_load(f)
+    return Scenario(spec, name=path.rsplit("/", 1)[-1].rsplit(".", 1)[0])
+
+class VirtualUser:
+    """One simulator instance and the thread that runs it"""
+
+    __slots__ = ("role", "simulator", "active", "thread")
+
+    def __init__(self, role: str, simulator: Any):
+        self.role = role
+        self.simulator = simulator
+        self.active = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+class ScenarioRunner:
+    """Plays a scenario on a pool of virtual users that lives for the whole run
+
+    Every virtual user is a simulator with its own thread. It runs its
+    role's event mix and waits between events for an exponential think time
+    with mean 1/rate, or for the simulator's own think time when the phase
+    sets no rate. Every `tick` seconds the runner works out how many users
+    each role should have and activates or parks users to match. Parked
+    users keep their simulator, session and chart state, and new users are
+    created only when a role needs more than it ever had. Nothing is
+    restarted, so load follows the plan smoothly. Each user waits one think
+    time before its first event, which spreads out users that start together.
+    """
+
+    def __init__(self, scenario: Scenario, make_user: Callable[[str, int], Any],
+                 existing: Optional[Dict[str, List[Any]]] = None, tick: float = 1.0):
+        self.scenario = scenario
+        self.make_user = make_user
+        self.tick = tick
+        self.users: Dict[str, List[VirtualUser]] = {role: [] for role in ROLE_PREFIXES}
+        for role, simulators in (existing or {}).items():
+            self.users[role].extend(VirtualUser(role, simulator) for simulator in simulators)
+        self.phase_index = -1
+        self.started = 0.0
+        # role -> failed attempts to create a user; the run goes on with the users it has
+        self.failed_users: Dict[str, int] = {}
+        self._stopped = threading.Event()
+
+    @property
+    def phase(self) -> Dict[str, Any]:
+        return self.scenario.phases[max(self.phase_index, 0)]
+
+    def active_users(self) -> Dict[str, int]:
+        return {role: sum(user.active.is_set() for user in users) for role, users in self.users.items()}
+
+    def think_time(self, user: VirtualUser) -> float:
+        rate = self.phase["rates"].get(user.role)
+        if rate:
+            return random.expovariate(rate)
+        return random.uniform(*user.simulator.think_seconds)
+
+    def _user_loop(self, user: VirtualUser):
+        simulator = user.simulator
+        simulator.running = True
+        while not self._stopped.is_set():
+            if not user.active.wait(0.5):
+                continue
+            if self._stopped.wait(self.think_time(user)):
+                break
+            if not user.active.is_set():
+                continue
+            try:
+                simulator.run_event()
+            except Exception as e:
+                simulator.log.error("simulation_error", "❌ Error in simulation: {error}", error=e)
+        simulator.running = False
+
+    def _start(self, user: VirtualUser, number: int):
+        user.thread = threading.Thread(target=self._user_loop, args=(user,),
+                                       name=f"Simulator-{user.role}-{number:03d}", daemon=True)
+        user.thread.start()
+
+    def apply(self, targets: Dict[str, int]):
+        """Activate the first `target` users of each role and park the rest, creating users as needed"""
+        for role, users in self.users.items():
+            target = targets.get(role, 0)
+            while len(users) < target:
+                try:
+                    simulator = self.make_user(role, len(users) + 1)
+                except Exception as e:
+                    if role not in self.failed_users:
+                        print(f"⚠️ Could not create {role} user {len(users) + 1}, keeping {len(users)}: {e!r}")
+                    self.failed_users[role] = self.failed_users.get(role, 0) + 1
+                    break
+                users.append(VirtualUser(role, simulator))
+            for index, user in enumerate(users):
+                if user.thread is None and index < target:
+                    self._start(user, index + 1)
+                if index < target:
+                    user.active.set()
+                else:
+                    user.active.clear()
+
+    def run(self):
+        """Follow the plan until the last phase ends or `stop` is called"""
+        scenario = self.scenario
+        self.started = time.time()
+        try:
+            while not self._stopped.is_set():
+                elapsed = time.time() - self.started
+                if elapsed >= scenario.duration:
+                    break
+                users, index = scenario.at(elapsed)
+                if index != self.phase_index:
+                    self.phase_index = index
+                    print(f"📈 Phase {index + 1}/{len(scenario.phases)}: {self.phase['name']} ({self.phase['type']}) "
+                          f"at {format_duration(elapsed)}, {users:.0f} users now, up to {self.phase['peakUsers']:.0f}")
+                self.apply(allocate(int(round(users)), self.phase["mix"]))
+                self._stopped.wait(self.tick)
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Park every user and wait for their current events to finish"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        threads = [user.thread for users in self.users.values() for user in users if user.thread is not None]
+        for users in self.users.values():
+            for user in users:
+                user.active.clear()
+        for thread in threads:
+            thread.join(timeout=5)
+
+def main():
+    """Print the compiled plan of a scenario file without running it"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Load Scenario Profiles check')
+    parser.add_argument('scenario',
+                       help='Scenario file (.yaml, .yml or .json)')
+    parser.add_argument('--every', default='1m',
+                       help='Print the user split at this interval')
+
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario)
+    print(f"📜 {scenario.name}: {len(scenario.phases)} phases, {format_duration(scenario.duration)}")
+    for line in scenario.describe():
+        print(f"   {line}")
+    step = parse_duration(args.every)
+    elapsed = 0.0
+    while elapsed <= scenario.duration:
+        users, index = scenario.at(elapsed)
+        split = allocate(int(round(users)), scenario.phases[index]["mix"])
+        print(f"   {format_duration(elapsed):>8}  {users:7.1f} users  "
+              + "  ".join(f"{role} {count}" for role, count in split.items() if count))
+        elapsed += step
+
+if __name__ == "__main__":
+    main()
@@ -12,15 +12,34 @@ from datetime import datetime, timedelta
 import threading
 from typing import Dict, List, Any
 
+from windows import TimeWindow
+from clock import SimulatedClock
+from loan_ledger import LoanLedger, LOAN_TYPES
+from order_lifecycle import VILLAGE_HUBS
+from sim_log import CONSOLE
+
+# Loan time runs at half a day per real second so repayment schedules move during a demo
+LOAN_CLOCK_SPEED = 43200
+
 class SHGLeaderChartSimulator:
-    def __init__(self, base_url: str = "http://localhost:3000/api/v1", user_id: str = "shg_001"):
+    # Seconds between events when running on its own
+    think_seconds = (4, 7)
+
+    def __init__(self, base_url: str = "http://localhost:3000/api/v1", user_id: str = "shg_001", token_pool=None, world=None,
+                 loan_ledger: LoanLedger = None, loan_clock=None, log=None):
         self.base_url = base_url
         self.user_id = user_id
+        self.log = (log if log is not None else CONSOLE).bind("shg_leader", user_id)
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Authorization': f'Bearer fake_token_{user_id}'
         })
+        if token_pool is not None:
+            token_pool.attach(self.session, user_id)
+        
+        # Earnings land in the calendar month they were made; old months roll out of the ring
+        self.earnings_window = TimeWindow.monthly()
         
         # Initial data state
         self.total_members = 25
@@ -30,6 +49,18 @@ class SHGLeaderChartSimulator:
         self.loans_disbursed = 8
         self.loans_repaid = 5
         
+        # Members and their produce sales live in the shared world when one is given;
+        # the SHG is keyed by its leader's user ID
+        self.world = world
+        self.other_earnings = 0
+        if world is not None:
+            world.add_user(user_id, "shg_leader")
+            world.join_shg(user_id, user_id)
+            self.total_members = 0
+            self.active_members = 0
+            self.collective_earnings = 0
+            self.sync_from_world()
+        
         # Chart data
         self.monthly_earnings = [
             {"name": "Jan", "value": 12000},
@@ -39,6 +70,8 @@ class SHGLeaderChartSimulator:
             {"name": "May", "value": 25000},
             {"name": "Jun", "value": 28000},
         ]
+        if world is None:
+            self.earnings_window.seed(month["value"] for month in self.monthly_earnings)
         
         self.member_contribution = [
             {"name": "Regular Members", "value": 18},
@@ -67,18 +100,33 @@ class SHGLeaderChartSimulator:
             {"name": "Pending Applications", "value": 2},
         ]
         
+        # Loans live in a ledger (shared across SHGs when given); a standalone run seeds its own small book
+        self.loan_clock = loan_clock if loan_clock is not None else SimulatedClock(speed=LOAN_CLOCK_SPEED)
+        self.loan_ledger = loan_ledger
+        if loan_ledger is None:
+            self.loan_ledger = LoanLedger()
+            self.loan_ledger.seed([user_id], loans_per_shg=self.loans_disbursed, now=self.loan_clock())
+            for _ in range(2):
+                self.loan_ledger.apply(user_id, random.randint(5, 50) * 1000, 0.12, 12,
+                                       timestamp=self.loan_clock())
+        self.sync_loans()
+        
         self.running = False
 
     def generate_new_member(self) -> Dict[str, Any]:
         """Generate a new member simulation"""
         activities = ["agriculture", "handicrafts", "livestock", "trading"]
-        villages = ["Khetri", "Rampur", "Bharatpur", "Alwar", "Jaipur"]
+        # Members join from the group's own village
+        if self.world is not None:
+            village = self.world.user_village_name(self.user_id)
+        else:
+            village = random.choice(list(VILLAGE_HUBS))
         
         return {
             "member_id": f"MEM_{int(time.time())}",
             "name": f"Member_{random.randint(1, 100)}",
             "activity": random.choice(activities),
-            "village": random.choice(villages),
+            "village": village,
             "joining_date": datetime.now().isoformat(),
             "monthly_contribution": random.randint(500, 2000)
         }
@@ -97,22 +145,8 @@ class SHGLeaderChartSimulator:
         }
 
     def update_monthly_earnings(self):
-        """Update monthly earnings data"""
-        for month_data in self.monthly_earnings:
-            # Seasonal variation (-8% to +15%)
-            variation = random.uniform(-0.08, 0.15)
-            month_data["value"] = int(month_data["value"] * (1 + variation))
-        
-        # Add new month if we're at the end
-        if len(self.monthly_earnings) >= 12:
-            self.monthly_earnings.pop(0)
-        
-        new_month = datetime.now().strftime("%b")
-        if not any(m["name"] == new_month for m in self.monthly_earnings):
-            self.monthly_earnings.append({
-                "name": new_month,
-                "value": random.randint(15000, 35000)
-            })
+        """Update monthly earnings data from the earnings in each month"""
+        self.monthly_earnings = self.earnings_window.series(6)
 
     def update_member_contribution(self):
         """Update member contribution data"""
@@ -133,16 +167,56 @@ class SHGLeaderChartSimulator:
     def update_savings_distribution(self):
         """Update savings distribution"""
         for savings_data in self.savings_distribution:
+            if savings_data["name"] == "Loan Fund":
+                continue
             # Small variations in savings
             variation = random.uniform(-0.01, 0.02)
             new_value = savings_data["value"] * (1 + variation)
             savings_data["value"] = max(1000, int(new_value))
 
+    def sync_loans(self):
+        """Loan counters, loan status chart and the loan fund balance from the ledger"""
+        summary = self.loan_ledger.summary(self.user_id)
+        counts = summary["counts"]
+        self.loans_disbursed = counts["disbursed"] + counts["active"] + counts["closed"] + counts["defaulted"]
+        self.loans_repaid = counts["closed"]
+        self.loan_status = [
+            {"name": "Active Loans", "value": counts["disbursed"] + counts["active"]},
+            {"name": "Repaid Loans", "value": counts["closed"]},
+            {"name": "Pending Applications", "value": counts["applied"] + counts["approved"]},
+            {"name": "Overdue Loans", "value": summary["overdue"]},
+            {"name": "Defaulted Loans", "value": counts["defaulted"]},
+        ]
+        for savings_data in self.savings_distribution:
+            if savings_data["name"] == "Loan Fund":
+                savings_data["value"] = self.loan_ledger.fund_balance(self.user_id)
+                break
+        return summary
+
+    def sync_from_world(self):
+        """Membership and produce-sale earnings from the shared world"""
+        members = self.world.shg_member_count(self.user_id)
+        self.active_members += members - self.total_members
+        self.total_members = members
+        earnings = self.world.shg_collective_earnings(self.user_id) + self.other_earnings
+        if earnings > self.collective_earnings:
+            self.earnings_window.add(time.time(), earnings - self.collective_earnings)
+        self.collective_earnings = earnings
+
     def simulate_new_member_joining(self):
         """Simulate a new member joining the SHG"""
         new_member = self.generate_new_member()
-        self.total_members += 1
-        self.active_members += 1
+        if self.world is not None:
+            member_id = f"{self.user_id}_mem_{self.world.shg_member_count(self.user_id):05d}"
+            self.world.add_user(member_id, "farmer", new_member["village"])
+            self.world.join_shg(member_id, self.user_id)
+            # Members sell produce on the marketplace; those sales become collective earnings
+            self.world.add_listing(member_id, random.choice(["Wheat", "Tomatoes", "Potatoes", "Fresh Onions"]),
+                                   random.randint(20, 200), random.randint(15, 60))
+            self.sync_from_world()
+        else:
+            self.total_members += 1
+            self.active_members += 1
         
         # Update member contribution
         for member_data in self.member_contribution:
@@ -150,12 +224,15 @@ class SHGLeaderChartSimulator:
                 member_data["value"] += 1
                 break
         
-        print(f"👥 New member joined: {new_member['name']} - {new_member['activity']}")
+        self.log.info("new_member", "👥 New member joined: {name} - {activity}", name=new_member['name'],
+                      activity=new_member['activity'])
 
     def simulate_collective_earning(self):
         """Simulate collective earning from group activities"""
         earning_amount = random.randint(2000, 8000)
         self.collective_earnings += earning_amount
+        self.other_earnings += earning_amount
+        self.earnings_window.add(time.time(), earning_amount)
         
         # Update income sources
         sources = ["Agricultural Sales", "Handicrafts", "Livestock", "Other Activities"]
@@ -166,7 +243,8 @@ class SHGLeaderChartSimulator:
                 income_data["value"] = min(60, income_data["value"] + 1)
                 break
         
-        print(f"💰 Collective earning: ₹{earning_amount:,} from {source}")
+        self.log.info("collective_earning", "💰 Collective earning: ₹{amount:,} from {source}", amount=earning_amount,
+                      source=source)
 
     def simulate_savings_contribution(self):
         """Simulate member savings contribution"""
@@ -177,57 +255,47 @@ class SHGLeaderChartSimulator:
         funds = ["Emergency Fund", "Investment Fund", "Loan Fund", "Development Fund"]
         fund = random.choice(funds)
         
-        for savings_data in self.savings_distribution:
-            if savings_data["name"] == fund:
-                savings_data["value"] += contribution_amount
-                break
+        if fund == "Loan Fund":
+            self.loan_ledger.deposit(self.user_id, contribution_amount)
+            self.sync_loans()
+        else:
+            for savings_data in self.savings_distribution:
+                if savings_data["name"] == fund:
+                    savings_data["value"] += contribution_amount
+                    break
         
-        print(f"💳 Savings contribution: ₹{contribution_amount:,} to {fund}")
+        self.log.info("savings_contribution", "💳 Savings contribution: ₹{amount:,} to {fund}",
+                      amount=contribution_amount, fund=fund)
 
     def simulate_loan_disbursement(self):
-        """Simulate loan disbursement"""
+        """Simulate a loan application, disbursed once the loan fund can cover it"""
         loan_app = self.generate_loan_application()
         loan_amount = loan_app["amount"]
+        now = self.loan_clock()
         
-        self.loans_disbursed += 1
+        self.loan_ledger.apply(self.user_id, loan_amount, random.choice([0.0, 0.07, 0.12]),
+                               random.choice([6, 12, 18, 24]), random.choice(LOAN_TYPES), now)
+        disbursed = self.loan_ledger.disburse_pending(self.user_id, now)
+        self.sync_loans()
         
-        # Update loan status
-        for loan_data in self.loan_status:
-            if loan_data["name"] == "Active Loans":
-                loan_data["value"] += 1
-                break
-        
-        # Reduce loan fund
-        for savings_data in self.savings_distribution:
-            if savings_data["name"] == "Loan Fund":
-                savings_data["value"] = max(0, savings_data["value"] - loan_amount)
-                break
-        
-        print(f"🏦 Loan disbursed: ₹{loan_amount:,} for {loan_app['purpose']}")
+        if disbursed:
+            self.log.info("loan_disbursed", "🏦 {count} loan(s) disbursed, latest ₹{amount:,} for {purpose}",
+                          count=len(disbursed), amount=loan_amount, purpose=loan_app['purpose'])
+        else:
+            self.log.info("loan_pending", "📝 Loan application ₹{amount:,} pending (loan fund ₹{fund:,})",
+                          amount=loan_amount, fund=self.loan_ledger.fund_balance(self.user_id))
 
     def simulate_loan_repayment(self):
-        """Simulate loan repayment"""
-        if self.loans_disbursed > self.loans_repaid:
-            repayment_amount = random.randint(5000, 25000)
-            self.loans_repaid += 1
-            
-            # Update loan status
-            for loan_data in self.loan_status:
-                if loan_data["name"] == "Repaid Loans":
-                    loan_data["value"] += 1
-                    break
-                elif loan_data["name"] == "Active Loans":
-                    loan_data["value"] = max(0, loan_data["value"] - 1)
-                    break
-            
-            # Add to loan fund
-            for savings_data in self.savings_distribution:
-                if savings_data["name"] == "Loan Fund":
-                    savings_data["value"] += repayment_amount
-                    break
-            
-            print(f"✅ Loan repaid: ₹{repayment_amount:,}")
-
+        """Collect installments that have fallen due and reclassify loans"""
+        before = self.loan_ledger.summary(self.user_id)["repaid"]
+        self.loan_ledger.tick(self.loan_clock())
+        summary = self.sync_loans()
+        
+        repayment_amount = summary["repaid"] - before
+        if repayment_amount > 0:
+            self.log.info("loan_repayment", "✅ Loan repayments: ₹{amount:,} (overdue loans: {overdue})",
+                          amount=repayment_amount, overdue=summary['overdue'])
+        
     def simulate_member_activity(self):
         """Simulate member activity changes"""
         if random.random() < 0.2:  # 20% chance
@@ -240,16 +308,19 @@ class SHGLeaderChartSimulator:
                     member_data["value"] = max(0, member_data["value"] - 1)
                     break
             
-            print(f"📈 Member became active contributor")
+            self.log.info("member_active", "📈 Member became active contributor")
 
     def send_analytics_update(self):
         """Send updated analytics data to the API"""
         try:
             # Update chart data
+            if self.world is not None:
+                self.sync_from_world()
             self.update_monthly_earnings()
             self.update_member_contribution()
             self.update_income_sources()
             self.update_savings_distribution()
+            self.sync_loans()
             
             payload = {
                 "success": True,
@@ -277,12 +348,31 @@ class SHGLeaderChartSimulator:
             )
             
             if response.status_code in [200, 201]:
-                print(f"✅ Analytics updated for SHG leader {self.user_id}")
+                self.log.info("analytics_updated", "✅ Analytics updated for SHG leader {user}", user=self.user_id)
             else:
-                print(f"⚠️ Analytics update failed: {response.status_code}")
+                self.log.warning("analytics_failed", "⚠️ Analytics update failed: {status}", status=response.status_code)
                 
         except requests.exceptions.RequestException as e:
-            print(f"❌ Network error: {e}")
+            self.log.error("network_error", "❌ Network error: {error}", error=e)
+
+    def run_event(self):
+        """Trigger one event from the SHG leader dashboard mix"""
+        event_probability = random.random()
+
+        if event_probability < 0.2:  # 20% chance - new member
+            self.simulate_new_member_joining()
+        elif event_probability < 0.4:  # 20% chance - collective earning
+            self.simulate_collective_earning()
+        elif event_probability < 0.6:  # 20% chance - savings contribution
+            self.simulate_savings_contribution()
+        elif event_probability < 0.75:  # 15% chance - loan disbursement
+            self.simulate_loan_disbursement()
+        elif event_probability < 0.85:  # 10% chance - loan repayment
+            self.simulate_loan_repayment()
+        elif event_probability < 0.95:  # 10% chance - member activity
+            self.simulate_member_activity()
+        else:  # 5% chance - analytics update
+            self.send_analytics_update()
 
     def run_simulation(self, duration_minutes: int = 10):
         """Run the simulation for specified duration"""
@@ -297,31 +387,16 @@ class SHGLeaderChartSimulator:
         while self.running and time.time() < end_time:
             try:
                 # Randomly trigger different events
-                event_probability = random.random()
-                
-                if event_probability < 0.2:  # 20% chance - new member
-                    self.simulate_new_member_joining()
-                elif event_probability < 0.4:  # 20% chance - collective earning
-                    self.simulate_collective_earning()
-                elif event_probability < 0.6:  # 20% chance - savings contribution
-                    self.simulate_savings_contribution()
-                elif event_probability < 0.75:  # 15% chance - loan disbursement
-                    self.simulate_loan_disbursement()
-                elif event_probability < 0.85:  # 10% chance - loan repayment
-                    self.simulate_loan_repayment()
-                elif event_probability < 0.95:  # 10% chance - member activity
-                    self.simulate_member_activity()
-                else:  # 5% chance - analytics update
-                    self.send_analytics_update()
+                self.run_event()
                 
                 # Wait 4-7 seconds before next event
-                time.sleep(random.uniform(4, 7))
+                time.sleep(random.uniform(*self.think_seconds))
                 
             except KeyboardInterrupt:
                 print("\n🛑 Simulation stopped by user")
                 break
             except Exception as e:
-                print(f"❌ Error in simulation: {e}")
+                self.log.error("simulation_error", "❌ Error in simulation: {error}", error=e)
                 time.sleep(1)
         
         print(f"✅ SHG leader simulation completed after {duration_minutes} minutes")
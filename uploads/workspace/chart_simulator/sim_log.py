@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Simulator Logging
+Levelled, sampled, structured logging for simulators with a background JSON-lines writer and a live summary line
+"""
+
+import collections
+import json
+import random
+import sys
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+from metrics import Counter
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+# Bound once: AsyncLog.log runs on every simulator event
+_random = random.random
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """`"analytics_updated=0.01,network_error=0.1,*=0.2"` → {event type: rate}; ValueError if malformed"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, sep, rate = item.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(f"expected event_type=rate, got {item!r}")
+        try:
+            value = float(rate)
+        except ValueError:
+            raise ValueError(f"rate for {name.strip()!r} must be a number, got {rate!r}") from None
+        if not 0.0 <= value <= 1.0:
+            raise ValueError(f"rate for {name.strip()!r} must be between 0 and 1, got {value:g}")
+        rates[name.strip()] = value
+    return rates
+
+class SimLog:
+    """Prints each message as it is logged, the standalone default
+
+    Calls name an event type and pass a message template plus fields, e.g.
+    `log.info("new_purchase", "🛒 New purchase: {product} - ₹{amount:,}", product=p, amount=a)`.
+    The level and sample rate are checked before anything is formatted.
+    Subclasses decide what happens to a message that is kept.
+    """
+
+    def __init__(self, level: str = "info", sample_rates: Optional[Dict[str, float]] = None):
+        self.level = LEVELS[level]
+        self.sample_rates = dict(sample_rates or {})
+        self.default_rate = self.sample_rates.pop("*", 1.0)
+
+    def bind(self, role: str, user_id: str) -> "BoundLog":
+        return BoundLog(self, role, user_id)
+
+    def log(self, level: int, role: str, user_id: str, event_type: str, template: str, fields: Dict[str, Any]):
+        if level < self.level:
+            return
+        rate = self.sample_rates.get(event_type, self.default_rate)
+        if rate < 1.0 and random.random() >= rate:
+            return
+        self.write(time.time(), level, role, user_id, event_type, template, fields)
+
+    def write(self, ts: float, level: int, role: str, user_id: str, event_type: str, template: str,
+              fields: Dict[str, Any]):
+        print(template.format(**fields))
+
+    def close(self):
+        pass
+
+class BoundLog:
+    """A log with the role and user of one simulator filled in"""
+
+    __slots__ = ("target", "role", "user_id")
+
+    def __init__(self, target: SimLog, role: str, user_id: str):
+        self.target = target
+        self.role = role
+        self.user_id = user_id
+
+    def debug(self, event_type: str, template: str, **fields):
+        self.target.log(10, self.role, self.user_id, event_type, template, fields)
+
+    def info(self, event_type: str, template: str, **fields):
+        self.target.log(20, self.role, self.user_id, event_type, template, fields)
+
+    def warning(self, event_type: str, template: str, **fields):
+        self.target.log(30, self.role, self.user_id, event_type, template, fields)
+
+    def error(self, event_type: str, template: str, **fields):
+        self.target.log(40, self.role, self.user_id, event_type, template, fields)
+
+# Shared by simulators constructed without a log: prints like they always have
+CONSOLE = SimLog()
+
+class NullLog(SimLog):
+    """Drops every message, for benchmarks that should measure the simulators and not their output"""
+
+    def log(self, level: int, role: str, user_id: str, event_type: str, template: str, fields: Dict[str, Any]):
+        pass
+
+class AsyncLog(SimLog):
+    """Hands kept messages to a writer thread; stdout only gets a periodic summary line
+
+    The level and sample rate are checked first, so a message that is not
+    kept costs a dict lookup and a random draw. A kept message is appended
+    to a deque as one tuple. Counting, formatting, JSON encoding and file
+    writes all happen on the writer thread. Each kept message counts as
+    1/rate calls (by level and event type), so the summary estimates all
+    activity, including what was sampled out. When the writer falls
+    `max_pending` records behind, new records are dropped and counted
+    instead of blocking simulators.
+    """
+
+    def __init__(self, path: Optional[str] = None, level: str = "info",
+                 sample_rates: Optional[Dict[str, float]] = None, summary_seconds: float = 5.0,
+                 flush_seconds: float = 0.2, max_pending: int = 100_000, stream=None):
+        super().__init__(level, sample_rates)
+        self.path = path
+        self.file = open(path, "a", encoding="utf-8", buffering=1 << 16) if path else None
+        self.summary_seconds = summary_seconds
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.stream = stream if stream is not None else sys.stdout
+        self.calls = Counter("simulator_log_calls_total", "Log calls before sampling", ("level", "event_type"))
+        self.dropped = Counter("simulator_log_dropped_total", "Records dropped with the writer behind", ())
+        self.written = 0
+        self.encoder = json.JSONEncoder(ensure_ascii=False, default=str)
+        self._pending: "collections.deque" = collections.deque()
+        self._stopped = threading.Event()
+        self._started = time.time()
+        self._last_summary: Tuple[float, float] = (self._started, 0)
+        self._writer = threading.Thread(target=self._write_loop, name="LogWriter", daemon=True)
+        self._writer.start()
+
+    def log(self, level: int, role: str, user_id: str, event_type: str, template: str, fields: Dict[str, Any]):
+        if level < self.level:
+            return
+        rate = self.sample_rates.get(event_type, self.default_rate)
+        if rate < 1.0 and _random() >= rate:
+            return
+        if len(self._pending) >= self.max_pending:
+            self.dropped.inc()
+            self.calls.inc((level, event_type), 1 / rate)
+            return
+        self._pending.append((time.time(), level, role, user_id, event_type, template, fields, rate))
+
+    # ---- writer thread ----
+
+    def _drain(self):
+        pending = self._pending
+        names = {value: name for name, value in LEVELS.items()}
+        encode = self.encoder.encode
+        counts: Dict[Tuple[int, str], float] = {}
+        lines: List[str] = []
+        while pending:
+            ts, level, role, user_id, event_type, template, fields, rate = pending.popleft()
+            key = (level, event_type)
+            counts[key] = counts.get(key, 0) + 1 / rate
+            if self.file is None:
+                continue
+            record = {"ts": ts, "level": names.get(level, level), "role": role, "user": user_id,
+                      "event": event_type, "msg": template.format(**fields)}
+            record.update(fields)
+            lines.append(encode(record))
+        for key, count in counts.items():
+            self.calls.inc(key, count)
+        if lines:
+            self.file.write("\n".join(lines) + "\n")
+            self.written += len(lines)
+
+    def _write_loop(self):
+        next_summary = time.time() + self.summary_seconds
+        while not self._stopped.wait(self.flush_seconds):
+            self._drain()
+            if self.summary_seconds and time.time() >= next_summary:
+                self.stream.write(self.summary_line() + "\n")
+                self.stream.flush()
+                next_summary += self.summary_seconds
+        self._drain()
+
+    def summary_line(self) -> str:
+        """One line: call rate since the last summary, busiest event types, warnings/errors, drops"""
+        now = time.time()
+        totals = self.calls.values
+        calls = sum(totals.values())
+        since, before = self._last_summary
+        self._last_summary = (now, calls)
+        by_type: Dict[str, float] = {}
+        warnings = errors = 0
+        for (level, event_type), count in totals.items():
+            by_type[event_type] = by_type.get(event_type, 0) + count
+            if level >= 40:
+                errors += count
+            elif level >= 30:
+                warnings += count
+        top = sorted(by_type.items(), key=lambda item: -item[1])[:4]
+        dropped = sum(self.dropped.values.values())
+        return (f"📊 {time.strftime('%H:%M:%S', time.localtime(now))} "
+                f"{calls:,.0f} messages ({(calls - before) / max(now - since, 1e-9):,.0f}/s) | "
+                + " ".join(f"{name} {count:,.0f}" for name, count in top)
+                + f" | ⚠️ {warnings:,.0f} ❌ {errors:,.0f}"
+                + (f" | dropped {dropped:,.0f}" if dropped else ""))
+
+    def close(self):
+        """Write everything pending, print a final summary and close the file"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._writer.join()
+        if self.file is not None:
+            self.file.close()
+        self.stream.write(self.summary_line() + "\n")
+        self.stream.flush()
+
+class RecordingLog(SimLog):
+    """Keeps every call, so the same messages can be replayed against each logger"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls: List[Tuple[int, str, str, str, str, Dict[str, Any]]] = []
+
+    def log(self, level: int, role: str, user_id: str, event_type: str, template: str, fields: Dict[str, Any]):
+        self.calls.append((level, role, user_id, event_type, template, fields))
+
+def main():
+    """Measure logging overhead against the cost of a generator-only simulator event
+
+    The messages of `--events` buyer events are recorded once and replayed
+    against each logger, which times the logger alone (writer thread
+    included) far more precisely than timing whole events with and without
+    it. The overhead per event is set against the event's own cost.
+    """
+    import argparse
+    import io
+    import os
+    import tempfile
+
+    from buyer_simulator import BuyerChartSimulator
+
+    parser = argparse.ArgumentParser(description='Simulator Logging overhead check')
+    parser.add_argument('--events', type=int, default=50_000,
+                       help='Events per case')
+    parser.add_argument('--sample', default='*=0.01',
+                       help='Sample rates for the sampled case, e.g. "new_purchase=0.01,*=0.1"')
+
+    args = parser.parse_args()
+    try:
+        sample_rates = parse_sample_rates(args.sample)
+    except ValueError as e:
+        parser.error(f"--sample: {e}")
+
+    directory = tempfile.mkdtemp(prefix="sim_log_")
+    cases = [
+        ("no logging", lambda: NullLog()),
+        ("print", lambda: SimLog()),
+        ("async, all", lambda: AsyncLog(os.path.join(directory, "all.jsonl"), summary_seconds=0,
+                                        stream=io.StringIO())),
+        (f"async, {args.sample}", lambda: AsyncLog(os.path.join(directory, "sampled.jsonl"), summary_seconds=0,
+                                                   sample_rates=sample_rates,
+                                                   stream=io.StringIO())),
+    ]
+    # Generator cost per event, fastest of several rounds so drift in the machine cancels out
+    rounds = 7
+    per_round = max(1, args.events // rounds)
+    simulator = BuyerChartSimulator("http://127.0.0.1:9/api/v1", log=NullLog())
+    random.seed(1)
+    event_micros = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(per_round):
+            simulator.simulate_new_purchase()
+        event_micros = min(event_micros, (time.perf_counter() - started) / per_round * 1e6)
+
+    recording = RecordingLog()
+    simulator.log = recording.bind("buyer", simulator.user_id)
+    for _ in range(args.events):
+        simulator.simulate_new_purchase()
+
+    results = {name: float("inf") for name, _ in cases}
+    for _ in range(rounds):
+        for name, make_log in cases:
+            log = make_log()
+            random.seed(1)
+            stdout, sys.stdout = sys.stdout, open(os.devnull, "w", encoding="utf-8")
+            try:
+                started = time.perf_counter()
+                for call in recording.calls:
+                    log.log(*call)
+                # The writer's share of the CPU counts against the logger it belongs to
+                log.close()
+                elapsed = time.perf_counter() - started
+            finally:
+                sys.stdout.close()
+                sys.stdout = stdout
+            results[name] = min(results[name], elapsed / args.events * 1e6)
+
+    base = results["no logging"]
+    print(f"⏱️ Buyer simulate_new_purchase, {args.events:,} events, {len(recording.calls) / args.events:.2f} "
+          f"messages per event, {event_micros:.2f} µs per event without logging, no network")
+    for name, micros in results.items():
+        overhead = micros - base
+        print(f"   {name:<24} +{overhead:6.2f} µs/event  ({overhead / event_micros * 100:5.1f}% of the event)")
+    print(f"📝 JSON lines in {directory}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Shared Authenticated Token Pool
+Logs each simulated identity in once and shares its token across sessions and worker processes
+"""
+
+import requests
+import base64
+import json
+import os
+import time
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Tuple
+
+from auth_simulator import DEFAULT_OTP, extract_token
+
+try:
+    import fcntl
+except ImportError:  # Windows: cache file is still shared, just not locked
+    fcntl = None
+
+# Simulator user IDs mapped to the mock backend's test mobile numbers
+DEFAULT_IDENTITIES = {
+    "buyer_001": "9876543211",
+    "farmer_001": "9876543210",
+    "admin_001": "9999999999",
+    "hub_001": "8888888888",
+    "shg_001": "7777777777",
+}
+# Bearer tokens are cached in the user's cache directory, never in the working tree
+DEFAULT_CACHE_FILE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                                  "gram_vikas", "token_cache.json")
+
+def token_expiry(token: str, default_ttl: float) -> float:
+    """Expiry timestamp from a JWT `exp` claim, or now + default_ttl"""
+    parts = token.split(".")
+    if len(parts) == 3:
+        try:
+            padded = parts[1] + "=" * (-len(parts[1]) % 4)
+            claims = json.loads(base64.urlsafe_b64decode(padded))
+            if "exp" in claims:
+                return float(claims["exp"])
+        except (ValueError, TypeError):
+            pass
+    return time.time() + default_ttl
+
+class TokenPool:
+    def __init__(self, base_url: str = "http://localhost:3000/api/v1",
+                 identities: Optional[Dict[str, str]] = None, cache_file: Optional[str] = None,
+                 otp: str = DEFAULT_OTP, refresh_margin: float = 300, default_ttl: float = 3600):
+        self.base_url = base_url
+        self.identities = dict(identities or DEFAULT_IDENTITIES)
+        self.cache_file = cache_file
+        if cache_file:
+            os.makedirs(os.path.dirname(os.path.abspath(cache_file)), exist_ok=True)
+        self.otp = otp
+        self.refresh_margin = refresh_margin
+        self.default_ttl = default_ttl
+
+        # user_id -> {"token": str, "expires_at": float}
+        self.tokens: Dict[str, Dict[str, Any]] = {}
+        self.logins = 0
+        self._attached: List[Tuple[weakref.ref, str]] = []
+        # _lock guards the dicts only and is never held over the network; _login_lock runs one login at a time
+        self._lock = threading.RLock()
+        self._login_lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
+
+    def is_fresh(self, entry: Optional[Dict[str, Any]]) -> bool:
+        """Token exists and will not expire within the refresh margin"""
+        return bool(entry) and entry["expires_at"] - self.refresh_margin > time.time()
+
+    @contextmanager
+    def cache_lock(self):
+        """Exclusive lock on the cache file so worker processes log in once"""
+        if not self.cache_file or fcntl is None:
+            yield
+            return
+        with open(self.cache_file + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Read tokens other workers have stored"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_cache(self):
+        """Atomically write the current tokens to the cache file, readable by this user only"""
+        if not self.cache_file:
+            return
+        cached = self.load_cache()
+        with self._lock:
+            cached.update(self.tokens)
+        tmp_path = f"{self.cache_file}.{os.getpid()}.tmp"
+        with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as f:
+            json.dump(cached, f)
+        os.replace(tmp_path, self.cache_file)
+
+    def login(self, user_id: str) -> Dict[str, Any]:
+        """Run the OTP flow for one identity"""
+        if user_id not in self.identities:
+            raise KeyError(f"No mobile number configured for {user_id}")
+        mobile = self.identities[user_id]
+
+        self.session.post(f"{self.base_url}/auth/login", json={"mobile_number": mobile}, timeout=10)
+        response = self.session.post(
+            f"{self.base_url}/auth/login-otp",
+            json={"mobile_number": mobile, "otp": self.otp},
+            timeout=10
+        )
+        if response.status_code == 404:
+            # Not registered yet: verify-otp signs the number up
+            response = self.session.post(
+                f"{self.base_url}/auth/verify-otp",
+                json={"mobile_number": mobile, "otp": self.otp},
+                timeout=10
+            )
+
+        token = extract_token(response) if response.status_code in [200, 201] else None
+        if not token:
+            raise RuntimeError(f"Login failed for {user_id}: HTTP {response.status_code}")
+
+        self.logins += 1
+        return {"token": token, "expires_at": token_expiry(token, self.default_ttl)}
+
+    def get_token(self, user_id: str, force_refresh: bool = False) -> str:
+        """Cached token for an identity, logging in only when needed"""
+        with self._lock:
+            entry = self.tokens.get(user_id)
+        if not force_refresh and self.is_fresh(entry):
+            return entry["token"]
+
+        with self._login_lock:
+            with self._lock:
+                current = self.tokens.get(user_id)
+            if current is not entry and self.is_fresh(current):
+                return current["token"]  # another thread logged in while this one waited
+
+            with self.cache_lock():
+                cached = self.load_cache().get(user_id)
+                if not force_refresh and self.is_fresh(cached):
+                    entry = cached
+                else:
+                    entry = self.login(user_id)
+                with self._lock:
+                    self.tokens[user_id] = entry
+                self.save_cache()
+
+        return entry["token"]
+
+    def authorization(self, user_id: str) -> str:
+        """Authorization header value for an identity"""
+        return f"Bearer {self.get_token(user_id)}"
+
+    def attach(self, session: requests.Session, user_id: str):
+        """Put the identity's token on a session and keep it current on refresh
+
+        When the login fails (backend down, OTP rejected) the session keeps
+        its current header and the refresher retries the login.
+        """
+        with self._lock:
+            self._attached.append((weakref.ref(session), user_id))
+        try:
+            session.headers['Authorization'] = self.authorization(user_id)
+        except (requests.exceptions.RequestException, RuntimeError) as e:
+            print(f"⚠️ Login failed for {user_id}, will retry in the background: {e}")
+
+    def refresh_expiring(self) -> int:
+        """Refresh tokens close to expiry (or never obtained) and update attached sessions"""
+        with self._lock:
+            due = [user_id for user_id in dict.fromkeys([*self.tokens, *(user for _, user in self._attached)])
+                   if not self.is_fresh(self.tokens.get(user_id))]
+        refreshed = 0
+        for user_id in due:
+            try:
+                self.get_token(user_id, force_refresh=True)
+                refreshed += 1
+            except (requests.exceptions.RequestException, RuntimeError) as e:
+                print(f"⚠️ Token refresh failed for {user_id}: {e}")
+
+        with self._lock:
+            alive = []
+            for session_ref, user_id in self._attached:
+                session = session_ref()
+                if session is None:
+                    continue
+                if user_id in self.tokens:
+                    session.headers['Authorization'] = f"Bearer {self.tokens[user_id]['token']}"
+                alive.append((session_ref, user_id))
+            self._attached = alive
+        return refreshed
+
+    def start_refresher(self, interval: float = 30):
+        """Refresh tokens in the background until stop() is called"""
+        if self._refresher is not None:
+            return
+
+        def refresh_loop():
+            while not self._stop_event.wait(interval):
+                self.refresh_expiring()
+
+        self._refresher = threading.Thread(target=refresh_loop, name="TokenRefresher", daemon=True)
+        self._refresher.start()
+
+    def stop(self):
+        """Stop the background refresher"""
+        self._stop_event.set()
+
+def main():
+    """Log in every identity once and write the shared token cache"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Shared Token Pool')
+    parser.add_argument('--url', default='http://localhost:3000/api/v1',
+                       help='API base URL')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_FILE,
+                       help='Token cache file shared by worker processes (default: %(default)s)')
+
+    args = parser.parse_args()
+
+    pool = TokenPool(args.url, cache_file=args.cache)
+    for user_id in pool.identities:
+        try:
+            pool.get_token(user_id)
+            print(f"🔑 Token ready for {user_id}")
+        except (requests.exceptions.RequestException, RuntimeError) as e:
+            print(f"❌ Could not log in {user_id}: {e}")
+    print(f"✅ {pool.logins} logins performed, cache at {args.cache}")
+
+if __name__ == "__main__":
+    main()
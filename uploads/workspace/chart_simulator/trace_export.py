@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Simulator Trace Export
+Ring-buffered, sampled spans of simulator events and HTTP requests, written as Chrome trace-event JSON
+"""
+
+import collections
+import json
+import random
+import threading
+import time
+from typing import Dict, List, Any, Optional
+
+from instrumentation import EVENT_METHOD
+
+class TraceRecorder:
+    """Instrumentation observer that keeps recent events and requests as spans
+
+    Spans go into a ring buffer of `capacity`, so memory stays flat however
+    long the run; the file holds the most recent spans. Sampling is per event:
+    an event that is kept keeps all the requests it issued, and requests made
+    outside any event are sampled on their own. The output opens in
+    chrome://tracing, Perfetto (ui.perfetto.dev) or speedscope. Each simulator
+    thread is one track, with requests nested under the event that sent them.
+    """
+
+    def __init__(self, path: str, sample_rate: float = 1.0, capacity: int = 200_000):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.capacity = capacity
+        self.spans: "collections.deque" = collections.deque(maxlen=capacity)
+        self.thread_names: Dict[int, str] = {}
+        self.recorded = 0
+        self._local = threading.local()
+        self._closed = False
+
+    def _keep(self) -> bool:
+        # One decision per event, made at its first request (or at its end if it sent none)
+        keep = getattr(self._local, "keep", None)
+        if keep is None:
+            keep = self._local.keep = self.sample_rate >= 1.0 or random.random() < self.sample_rate
+        return keep
+
+    def _tid(self) -> int:
+        tid = threading.get_ident()
+        if tid not in self.thread_names:
+            self.thread_names[tid] = threading.current_thread().name
+        return tid
+
+    # ---- instrumentation observer ----
+
+    def event(self, role: str, user_id: str, name: str, started: float, latency_ms: float):
+        keep = self._keep()
+        self._local.keep = None
+        if keep:
+            self.spans.append(("event", name, started, latency_ms, self._tid(), role, user_id, None, None))
+            self.recorded += 1
+
+    def request(self, role: str, user_id: str, event_type: str, endpoint: str, started: float,
+                latency_ms: float, status: int, size: int):
+        keep = self._keep()
+        if not EVENT_METHOD.match(event_type):
+            self._local.keep = None
+        if keep:
+            self.spans.append(("request", endpoint, started, latency_ms, self._tid(), role, user_id,
+                               status, size))
+            self.recorded += 1
+
+    # ---- output ----
+
+    def trace_events(self) -> List[Dict[str, Any]]:
+        """Chrome trace-event dicts: thread names first, then complete ("X") spans in start order"""
+        events: List[Dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+            for tid, name in sorted(self.thread_names.items(), key=lambda item: item[1])
+        ]
+        for cat, name, started, latency_ms, tid, role, user_id, status, size in sorted(
+                list(self.spans), key=lambda span: span[2]):
+            args = {"role": role, "user": user_id}
+            if cat == "request":
+                args["status"] = status
+                args["bytes"] = size
+            events.append({"name": name, "cat": cat, "ph": "X", "ts": round(started * 1e6),
+                           "dur": max(1, round(latency_ms * 1000)), "pid": 1, "tid": tid, "args": args})
+        return events
+
+    def write(self, path: Optional[str] = None) -> str:
+        path = path or self.path
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms",
+                       "otherData": {"sampleRate": self.sample_rate, "spansRecorded": self.recorded,
+                                     "spansKept": len(self.spans), "capacity": self.capacity}},
+                      f, separators=(",", ":"))
+        return path
+
+    def close(self) -> Optional[str]:
+        if self._closed:
+            return None
+        self._closed = True
+        return self.write()
+
+def main():
+    """Measure span recording overhead and write a synthetic trace"""
+    import argparse
+    import timeit
+
+    parser = argparse.ArgumentParser(description='Simulator Trace Export check')
+    parser.add_argument('--output', default='trace_check.json',
+                       help='Trace file to write')
+    parser.add_argument('--sample', type=float, default=0.01,
+                       help='Fraction of events kept')
+    parser.add_argument('--capacity', type=int, default=200_000,
+                       help='Spans kept in the ring buffer')
+
+    args = parser.parse_args()
+
+    recorder = TraceRecorder(args.output, args.sample, args.capacity)
+    now = time.time()
+
+    def one_event():
+        recorder.request("buyer", "buyer_001", "simulate_order_tracking", "GET /orders", now, 12.0, 200, 512)
+        recorder.request("buyer", "buyer_001", "simulate_order_tracking", "GET /orders/:id", now, 8.0, 200, 256)
+        recorder.event("buyer", "buyer_001", "simulate_order_tracking", now, 21.0)
+
+    events = 200_000
+    seconds = min(timeit.repeat(one_event, number=events, repeat=3))
+    print(f"⏱️ {seconds / events * 1e6:.2f} µs per event with two requests at sample rate {args.sample}")
+    print(f"🧵 {recorder.recorded:,} spans recorded, {len(recorder.spans):,} in the ring buffer")
+    print(f"📝 Wrote {recorder.write()}")
+
+if __name__ == "__main__":
+    main()
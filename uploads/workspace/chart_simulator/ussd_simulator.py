@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+USSD Session Simulator
+Emulates feature-phone USSD menu sessions arriving through a gateway and checks per-hop latency budgets
+"""
+
+import requests
+import json
+import time
+import random
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Dict, List, Any, Tuple
+
+from load_stats import LatencyRecorder
+
+CROPS = ["1", "2", "3", "4", "5"]  # Rice, Wheat, Onion, Tomato, Potato in the USSD crop menu
+
+# Main menu: 1. Check Prices 2. List Produce 3. My Bids
+# Each flow is a list of (step name, input generator); inputs are joined with "*"
+MENU_FLOWS = {
+    "check_price": [
+        ("menu", lambda: "1"),
+        ("crop", lambda: random.choice(CROPS)),
+    ],
+    "list_produce": [
+        ("menu", lambda: "2"),
+        ("crop", lambda: random.choice(CROPS)),
+        ("quantity", lambda: str(random.randint(1, 50) * 10)),
+        ("price", lambda: str(random.randint(15, 120))),
+    ],
+    "accept_bid": [
+        ("menu", lambda: "3"),
+        ("listing", lambda: str(random.randint(1, 3))),
+        ("bid", lambda: str(random.randint(1, 3))),
+        ("confirm", lambda: "1"),
+    ],
+}
+
+FLOW_WEIGHTS = {"check_price": 0.6, "list_produce": 0.25, "accept_bid": 0.15}
+
+class USSDSessionSimulator:
+    def __init__(self, base_url: str = "http://localhost:3000/api/v1", phones: int = 5000,
+                 concurrency: int = 500, hop_budget_ms: float = 3000, service_code: str = "*123#",
+                 think_time: Tuple[float, float] = (1.0, 4.0), network_code: str = "40410"):
+        self.base_url = base_url
+        self.endpoint = f"{base_url}/ussd"
+        self.concurrency = concurrency
+        self.hop_budget = hop_budget_ms / 1000.0
+        self.service_code = service_code
+        self.think_time = think_time
+        self.network_code = network_code
+        self.phone_numbers = [f"+91{random.randint(6000000000, 9999999999)}" for _ in range(phones)]
+
+        self.recorder = LatencyRecorder()
+        self.session_results: Dict[str, Dict[str, int]] = {flow: {} for flow in MENU_FLOWS}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.running = False
+
+    def get_session(self) -> requests.Session:
+        """One HTTP session per worker thread, like one gateway connection"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({'Content-Type': 'application/x-www-form-urlencoded'})
+            self._local.session = session
+        return session
+
+    def choose_flow(self) -> str:
+        """Pick a menu flow according to FLOW_WEIGHTS"""
+        return random.choices(list(FLOW_WEIGHTS), weights=list(FLOW_WEIGHTS.values()))[0]
+
+    def send_hop(self, session_id: str, phone: str, inputs: List[str]) -> Tuple[str, float, str]:
+        """Send one gateway callback; returns (outcome, latency, response text)"""
+        form = {
+            "sessionId": session_id,
+            "serviceCode": self.service_code,
+            "phoneNumber": phone,
+            "networkCode": self.network_code,
+            "text": "*".join(inputs)
+        }
+        started = time.perf_counter()
+        try:
+            # Wait past the budget so the latency tail is still measured
+            response = self.get_session().post(self.endpoint, data=form, timeout=self.hop_budget * 2)
+        except requests.exceptions.Timeout:
+            return "timeout", time.perf_counter() - started, ""
+        except requests.exceptions.RequestException:
+            return "network_error", time.perf_counter() - started, ""
+        latency = time.perf_counter() - started
+
+        if response.status_code != 200:
+            return f"http_{response.status_code}", latency, response.text
+        if latency > self.hop_budget:
+            return "over_budget", latency, response.text
+        if not response.text.startswith(("CON", "END")):
+            return "bad_response", latency, response.text
+        return "ok", latency, response.text
+
+    def run_session(self, flow: str, phone: str) -> str:
+        """Walk one phone number through a menu flow"""
+        session_id = f"ATUid_{uuid.uuid4().hex}"
+        steps = MENU_FLOWS[flow]
+        # Dialling the service code is the first hop, with empty text
+        hops = [("dial", None)] + steps
+        inputs: List[str] = []
+        outcome = "completed"
+
+        for index, (step_name, next_input) in enumerate(hops):
+            if next_input is not None:
+                inputs.append(next_input())
+                time.sleep(random.uniform(*self.think_time))
+
+            hop_outcome, latency, text = self.send_hop(session_id, phone, inputs)
+            if hop_outcome in ("timeout", "network_error"):
+                self.recorder.count_outcome(f"{flow}/{step_name}", hop_outcome)
+            else:
+                self.recorder.record(f"{flow}/{step_name}", latency, hop_outcome)
+
+            if hop_outcome != "ok":
+                # The gateway drops the session once a hop misses its budget
+                outcome = hop_outcome
+                break
+            is_last = index == len(hops) - 1
+            if text.startswith("END") and not is_last:
+                outcome = "ended_early"
+                break
+            if is_last and not text.startswith("END"):
+                outcome = "not_terminated"
+
+        with self._lock:
+            results = self.session_results[flow]
+            results[outcome] = results.get(outcome, 0) + 1
+        return outcome
+
+    def worker(self, end_time: float):
+        """Run sessions back to back from random phones until end_time"""
+        while self.running and time.time() < end_time:
+            self.run_session(self.choose_flow(), random.choice(self.phone_numbers))
+
+    def run_simulation(self, duration_minutes: float = 10) -> Dict[str, Any]:
+        """Run concurrent USSD sessions for the specified duration"""
+        print(f"🚀 Starting USSD session simulation for {duration_minutes} minutes...")
+        print(f"📱 {len(self.phone_numbers)} phone numbers, {self.concurrency} concurrent sessions")
+        print(f"⏱️ Per-hop gateway budget: {self.hop_budget * 1000:.0f}ms")
+        print(f"🌐 Gateway callback URL: {self.endpoint}")
+
+        self.running = True
+        end_time = time.time() + duration_minutes * 60
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            workers = [executor.submit(self.worker, end_time) for _ in range(self.concurrency)]
+            try:
+                wait(workers)
+            except KeyboardInterrupt:
+                # Workers only check `running` between sessions, so stop them before the executor joins
+                print("\n🛑 Simulation interrupted, finishing sessions in progress")
+                self.stop()
+
+        report = self.build_report()
+        self.print_report(report)
+        return report
+
+    def build_report(self) -> Dict[str, Any]:
+        """Per-step latency against budget and per-flow completion"""
+        with self._lock:
+            sessions = {flow: dict(results) for flow, results in self.session_results.items()}
+        total = sum(sum(results.values()) for results in sessions.values())
+        completed = sum(results.get("completed", 0) for results in sessions.values())
+        return {
+            "hopBudgetMs": self.hop_budget * 1000,
+            "sessions": sessions,
+            "totalSessions": total,
+            "completionRate": round(completed / total, 4) if total else 0.0,
+            "steps": self.recorder.report(),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def print_report(self, report: Dict[str, Any]):
+        """Print completion rate and the slowest steps"""
+        print("=" * 60)
+        print(f"📞 Sessions: {report['totalSessions']}, completion rate {report['completionRate']:.1%} (target 90%)")
+        for flow, results in report["sessions"].items():
+            print(f"   {flow}: {results}")
+        for step, stats in report["steps"].items():
+            latency = stats["latency"]
+            over = stats["outcomes"].get("over_budget", 0) + stats["outcomes"].get("timeout", 0)
+            print(f"   {step}: p95 {latency.get('p95_ms', '-')}ms, p99 {latency.get('p99_ms', '-')}ms, "
+                  f"{over} over budget")
+
+    def stop(self):
+        """Stop the simulation"""
+        self.running = False
+
+def main():
+    """Main function to run USSD session simulation"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='USSD Session Simulator')
+    parser.add_argument('--url', default='http://localhost:3000/api/v1',
+                       help='API base URL')
+    parser.add_argument('--duration', type=float, default=10,
+                       help='Simulation duration in minutes')
+    parser.add_argument('--phones', type=int, default=5000,
+                       help='Number of distinct phone numbers')
+    parser.add_argument('--concurrency', type=int, default=500,
+                       help='Concurrent USSD sessions')
+    parser.add_argument('--hop-budget-ms', type=float, default=3000,
+                       help='Gateway time budget per hop in milliseconds')
+    parser.add_argument('--output', help='Write the JSON report to this file')
+
+    args = parser.parse_args()
+
+    simulator = USSDSessionSimulator(args.url, phones=args.phones, concurrency=args.concurrency,
+                                     hop_budget_ms=args.hop_budget_ms)
+
+    try:
+        report = simulator.run_simulation(args.duration)
+    except KeyboardInterrupt:
+        print("\n🛑 Simulation interrupted")
+        simulator.stop()
+        return
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
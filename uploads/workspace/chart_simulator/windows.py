@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Time-Window Aggregations
+Fixed-size ring buffers of per-day or per-month buckets with tumbling series and sliding totals
+"""
+
+import calendar
+import time
+from array import array
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Any, Optional
+
+# Local-time day boundaries without a datetime call per event
+UTC_OFFSET = datetime.now().astimezone().utcoffset().total_seconds()
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+def day_index(ts: float) -> int:
+    """Local days since the epoch"""
+    return int((ts + UTC_OFFSET) // 86400)
+
+@lru_cache(maxsize=4096)
+def _month_of_day(day: int) -> int:
+    day_date = date.fromordinal(EPOCH_ORDINAL + day)
+    return day_date.year * 12 + day_date.month - 1
+
+def month_index(ts: float) -> int:
+    """Months since year 0 (year * 12 + month - 1)"""
+    return _month_of_day(day_index(ts))
+
+def day_label(day: int) -> str:
+    # 1970-01-01 was a Thursday
+    return calendar.day_abbr[(day + 3) % 7]
+
+def month_label(month: int) -> str:
+    return calendar.month_abbr[month % 12 + 1]
+
+class TimeWindow:
+    """Ring buffer holding the last `size` buckets of counts and sums
+
+    Events are placed by their own timestamp, so late events still land in the
+    right bucket while it is inside the window and anything older is dropped
+    (counted in `dropped`). Moving the head forward zeroes at most `size`
+    slots, so rotation is O(1) amortized and memory never grows. The head also
+    follows `clock` when the window is read, so a quiet day reads as zero;
+    pass a SimulatedClock to run windows faster than real time.
+    """
+
+    def __init__(self, size: int, bucket_of: Callable[[float], int] = day_index,
+                 label_of: Callable[[int], str] = day_label, clock: Callable[[], float] = time.time):
+        self.size = size
+        self.bucket_of = bucket_of
+        self.label_of = label_of
+        self.clock = clock
+        self.counts = array('q', [0] * size)
+        self.sums = array('d', [0.0] * size)
+        self.head = bucket_of(clock())
+        self.window_count = 0
+        self.window_sum = 0.0
+        self.dropped = 0
+
+    @classmethod
+    def daily(cls, days: int = 7, clock: Callable[[], float] = time.time) -> "TimeWindow":
+        return cls(days, day_index, day_label, clock)
+
+    @classmethod
+    def monthly(cls, months: int = 12, clock: Callable[[], float] = time.time) -> "TimeWindow":
+        return cls(months, month_index, month_label, clock)
+
+    def advance(self, bucket: int):
+        """Rotate the head forward to `bucket`, clearing the slots it passes"""
+        steps = bucket - self.head
+        if steps <= 0:
+            return
+        for b in range(self.head + 1, self.head + 1 + min(steps, self.size)):
+            slot = b % self.size
+            self.window_count -= self.counts[slot]
+            self.window_sum -= self.sums[slot]
+            self.counts[slot] = 0
+            self.sums[slot] = 0.0
+        self.head = bucket
+
+    def add(self, ts: float, value: float = 1.0):
+        """Count one event with `value` in the bucket of its timestamp"""
+        bucket = self.bucket_of(ts)
+        if bucket > self.head:
+            self.advance(bucket)
+        elif bucket <= self.head - self.size:
+            self.dropped += 1
+            return
+        slot = bucket % self.size
+        self.counts[slot] += 1
+        self.sums[slot] += value
+        self.window_count += 1
+        self.window_sum += value
+
+    def seed(self, values: Iterable[float], end: Optional[int] = None):
+        """Load historical bucket sums, oldest first, ending at bucket `end` (default: the one before now)"""
+        values = list(values)[-self.size:]
+        end = end if end is not None else self.head - 1
+        for offset, value in enumerate(values):
+            bucket = end - len(values) + 1 + offset
+            if bucket > self.head - self.size:
+                slot = bucket % self.size
+                self.counts[slot] += 1
+                self.sums[slot] += value
+                self.window_count += 1
+                self.window_sum += value
+
+    def _sync(self, now: Optional[float]):
+        self.advance(self.bucket_of(now if now is not None else self.clock()))
+
+    def series(self, buckets: Optional[int] = None, attribute: str = "sum", scale: float = 1.0,
+               now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Tumbling view: the last `buckets` buckets (oldest first) as chart points"""
+        self._sync(now)
+        column = self.sums if attribute == "sum" else self.counts
+        buckets = min(buckets or self.size, self.size)
+        return [{"name": self.label_of(b), "value": int(column[b % self.size] * scale)}
+                for b in range(self.head - buckets + 1, self.head + 1)]
+
+    def total(self, buckets: Optional[int] = None, attribute: str = "sum", now: Optional[float] = None) -> float:
+        """Sliding view: sum over the last `buckets` buckets; the full window is O(1)"""
+        self._sync(now)
+        if buckets is None or buckets >= self.size:
+            return self.window_sum if attribute == "sum" else self.window_count
+        column = self.sums if attribute == "sum" else self.counts
+        return sum(column[b % self.size] for b in range(self.head - buckets + 1, self.head + 1))
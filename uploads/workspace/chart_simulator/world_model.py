@@ -0,0 +1,529 @@
+#!/usr/bin/env python3
+"""
+Shared World Model
+Single in-memory store of users, listings, orders and SHG memberships shared by all role simulators
+"""
+
+import random
+import threading
+import time
+from array import array
+from typing import Dict, List, Any, Callable, Optional
+
+from order_lifecycle import OrderLifecycleEngine, KeyTable, VILLAGE_HUBS
+
+ROLES = ("farmer", "buyer", "hub_operator", "shg_leader", "aggregator", "admin")
+ROLE_INDEX = {role: i for i, role in enumerate(ROLES)}
+# Population mix used when seeding (admins are created explicitly)
+ROLE_WEIGHTS = {"farmer": 0.55, "buyer": 0.21, "hub_operator": 0.03, "shg_leader": 0.18, "aggregator": 0.03}
+
+PRODUCTS = {
+    "Basmati Rice": "Cereals",
+    "Wheat": "Cereals",
+    "Fresh Onions": "Vegetables",
+    "Tomatoes": "Vegetables",
+    "Potatoes": "Vegetables",
+    "Carrots": "Vegetables",
+    "Cauliflower": "Vegetables",
+    "Mangoes": "Fruits",
+    "Bananas": "Fruits",
+    "Chana Dal": "Pulses",
+    "Moong Dal": "Pulses",
+}
+CATEGORIES = ("Cereals", "Vegetables", "Fruits", "Pulses")
+
+LISTING_ACTIVE = 0
+LISTING_SOLD = 1
+
+PLATFORM_FEE = 0.05
+
+def category_for(product_name: str) -> str:
+    """Category of a product name that is not in PRODUCTS"""
+    name = product_name.lower()
+    if any(word in name for word in ["rice", "wheat", "barley", "maize", "bajra"]):
+        return "Cereals"
+    if any(word in name for word in ["onion", "tomato", "potato", "carrot", "cauliflower", "cabbage"]):
+        return "Vegetables"
+    if any(word in name for word in ["apple", "banana", "orange", "mango", "guava"]):
+        return "Fruits"
+    return "Pulses"
+
+class MultiIndex:
+    """Append-only secondary index: key -> array of row ids"""
+
+    def __init__(self):
+        self.rows: Dict[int, array] = {}
+
+    def add(self, key: int, row: int):
+        bucket = self.rows.get(key)
+        if bucket is None:
+            bucket = self.rows[key] = array('l')
+        bucket.append(row)
+
+    def count(self, key: int) -> int:
+        bucket = self.rows.get(key)
+        return len(bucket) if bucket is not None else 0
+
+    def random(self, key: int, rng=random) -> Optional[int]:
+        bucket = self.rows.get(key)
+        if not bucket:
+            return None
+        return bucket[rng.randrange(len(bucket))]
+
+class BucketIndex:
+    """Secondary index with O(1) removal: key -> array of rows, plus each row's position"""
+
+    def __init__(self):
+        self.rows: Dict[int, array] = {}
+        self.pos = array('l')
+
+    def add(self, key: int, row: int):
+        while len(self.pos) <= row:
+            self.pos.append(-1)
+        bucket = self.rows.get(key)
+        if bucket is None:
+            bucket = self.rows[key] = array('l')
+        self.pos[row] = len(bucket)
+        bucket.append(row)
+
+    def remove(self, key: int, row: int):
+        bucket = self.rows[key]
+        index = self.pos[row]
+        last = bucket.pop()
+        if last != row:
+            bucket[index] = last
+            self.pos[last] = index
+        self.pos[row] = -1
+
+    def count(self, key: int) -> int:
+        bucket = self.rows.get(key)
+        return len(bucket) if bucket is not None else 0
+
+    def random(self, key: int, rng=random) -> Optional[int]:
+        bucket = self.rows.get(key)
+        if not bucket:
+            return None
+        return bucket[rng.randrange(len(bucket))]
+
+class WorldModel:
+    """Column-oriented store linking every role simulator to the same entities
+
+    Entities are rows in typed arrays; string IDs are interned once. Purchases
+    go through purchase(), which creates the order, credits the farmer and
+    the farmer's SHG, debits the buyer and counts platform revenue in one
+    step, then notifies subscribers (e.g. aggregators) with the event.
+    With a Geography, its villages and hubs replace the demo villages and
+    village rows line up with geography rows.
+    """
+
+    def __init__(self, order_engine: Optional[OrderLifecycleEngine] = None, geography=None):
+        self.orders = order_engine if order_engine is not None else OrderLifecycleEngine()
+        self.geography = geography
+
+        # Places
+        self.villages = KeyTable()
+        self.hubs = KeyTable()
+        self.village_hub = array('l')
+
+        # Users
+        self.user_keys = KeyTable()
+        self.user_role = array('b')
+        self.user_village = array('l')
+        self.user_shg = array('l')
+        self.user_earnings = array('q')
+        self.user_spent = array('q')
+        # Buyer row -> spend per category, in CATEGORIES order
+        self.user_category_spent: Dict[int, List[int]] = {}
+        self.registered_users = 0
+        self.users_by_role = MultiIndex()
+        self.users_by_village = MultiIndex()
+        self.users_by_hub = MultiIndex()
+
+        # SHG memberships
+        self.shgs = KeyTable()
+        self.shg_members = MultiIndex()
+        self.shg_earnings: Dict[int, int] = {}
+
+        # Listings
+        self.products = KeyTable()
+        self.product_category = array('b')
+        self.listing_farmer = array('l')
+        self.listing_product = array('l')
+        self.listing_village = array('l')
+        self.listing_quantity = array('l')
+        self.listing_price = array('l')
+        self.listing_status = array('b')
+        self.listing_created_at = array('d')
+        # Active listings by hub and farmer, plus every active listing under key 0
+        self.active_by_hub = BucketIndex()
+        self.active_by_farmer = BucketIndex()
+        self.active_all = BucketIndex()
+
+        # Platform totals
+        self.total_transactions = 0
+        self.platform_revenue = 0
+        self.revenue_by_category = {category: 0 for category in CATEGORIES}
+
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.RLock()
+
+        for product in PRODUCTS:
+            self.product_id(product)
+        if geography is not None:
+            for village in range(len(geography)):
+                self.add_village(geography.village_names[village], geography.hub_for(village))
+        else:
+            for village, hub in VILLAGE_HUBS.items():
+                self.add_village(village, hub)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Users, listings and totals without the lock, so benchmarks can deepcopy the world"""
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
+    # ---- events ----
+
+    def subscribe(self, listener: Callable[[Dict[str, Any]], None]):
+        """Call listener(event) for every world event"""
+        self.listeners.append(listener)
+
+    def emit(self, event: Dict[str, Any]):
+        for listener in self.listeners:
+            listener(event)
+
+    # ---- places ----
+
+    def add_village(self, name: str, hub_id: str) -> int:
+        """Register a village and the hub that serves it"""
+        with self._lock:
+            village = self.villages.intern(name)
+            hub = self.hubs.intern(hub_id)
+            if village == len(self.village_hub):
+                self.village_hub.append(hub)
+            else:
+                self.village_hub[village] = hub
+            return village
+
+    def hub_for_village(self, village_name: str) -> str:
+        return self.hubs.keys[self.village_hub[self.villages.ids[village_name]]]
+
+    def random_village(self, rng=random) -> str:
+        return self.villages.keys[rng.randrange(len(self.villages.keys))]
+
+    def farmer_catchment(self, hub_id: str, bands_km=(5.0, 25.0)) -> Optional[List[int]]:
+        """Farmers served by a hub, counted per distance band (the last band is open-ended)
+
+        Needs a geography; returns None without one.
+        """
+        hub = self.hubs.lookup(hub_id)
+        if self.geography is None or hub is None:
+            return None
+        counts = [0] * (len(bands_km) + 1)
+        farmer = ROLE_INDEX["farmer"]
+        with self._lock:
+            for row in self.users_by_hub.rows.get(hub, ()):
+                if self.user_role[row] != farmer:
+                    continue
+                distance = self.geography.distance_to_hub(self.user_village[row])
+                band = 0
+                while band < len(bands_km) and distance > bands_km[band]:
+                    band += 1
+                counts[band] += 1
+        return counts
+
+    # ---- users ----
+
+    def add_user(self, user_id: str, role: str, village_name: Optional[str] = None,
+                 timestamp: Optional[float] = None) -> int:
+        """Register a user (idempotent on user_id); returns the user row"""
+        with self._lock:
+            existing = self.user_keys.lookup(user_id)
+            if existing is not None:
+                return existing
+
+            village = self.villages.ids[village_name or self.random_village()]
+            row = self.user_keys.intern(user_id)
+            self.user_role.append(ROLE_INDEX[role])
+            self.user_village.append(village)
+            self.user_shg.append(-1)
+            self.user_earnings.append(0)
+            self.user_spent.append(0)
+            self.users_by_role.add(ROLE_INDEX[role], row)
+            self.users_by_village.add(village, row)
+            self.users_by_hub.add(self.village_hub[village], row)
+
+        now = timestamp if timestamp is not None else time.time()
+        self.emit({"type": "user_registered", "ts": now, "user_id": user_id,
+                   "role": role, "village": self.villages.keys[village],
+                   "hub": self.hubs.keys[self.village_hub[village]]})
+        return row
+
+    def register_user(self, role: str, village_name: Optional[str] = None,
+                      timestamp: Optional[float] = None) -> str:
+        """Register a user under a new `user_NNNNNNN` id; the id is taken under the lock, so callers never collide"""
+        with self._lock:
+            while True:
+                self.registered_users += 1
+                user_id = f"user_{self.registered_users:07d}"
+                if user_id not in self.user_keys.ids:
+                    break
+        self.add_user(user_id, role, village_name, timestamp)
+        return user_id
+
+    def user_count(self, role: Optional[str] = None) -> int:
+        if role is None:
+            return len(self.user_keys.keys)
+        return self.users_by_role.count(ROLE_INDEX[role])
+
+    def random_user(self, role: str, rng=random) -> Optional[str]:
+        row = self.users_by_role.random(ROLE_INDEX[role], rng)
+        return self.user_keys.keys[row] if row is not None else None
+
+    def user_village_name(self, user_id: str) -> str:
+        return self.villages.keys[self.user_village[self.user_keys.ids[user_id]]]
+
+    def earnings(self, user_id: str) -> int:
+        row = self.user_keys.lookup(user_id)
+        return self.user_earnings[row] if row is not None else 0
+
+    def spent(self, user_id: str) -> int:
+        row = self.user_keys.lookup(user_id)
+        return self.user_spent[row] if row is not None else 0
+
+    def spent_by_category(self, user_id: str) -> Dict[str, int]:
+        row = self.user_keys.lookup(user_id)
+        with self._lock:
+            spent = list(self.user_category_spent.get(row, ())) or [0] * len(CATEGORIES)
+        return dict(zip(CATEGORIES, spent))
+
+    # ---- SHGs ----
+
+    def join_shg(self, user_id: str, shg_id: str):
+        """Make a user a member of an SHG"""
+        with self._lock:
+            row = self.user_keys.ids[user_id]
+            shg = self.shgs.intern(shg_id)
+            if self.user_shg[row] == shg:
+                return
+            self.user_shg[row] = shg
+            self.shg_members.add(shg, row)
+        self.emit({"type": "shg_joined", "ts": time.time(), "user_id": user_id, "shg": shg_id})
+
+    def shg_member_count(self, shg_id: str) -> int:
+        shg = self.shgs.lookup(shg_id)
+        return self.shg_members.count(shg) if shg is not None else 0
+
+    def shg_collective_earnings(self, shg_id: str) -> int:
+        shg = self.shgs.lookup(shg_id)
+        return self.shg_earnings.get(shg, 0) if shg is not None else 0
+
+    # ---- listings ----
+
+    def product_id(self, product_name: str) -> int:
+        """Interned product row, registering its category on first sight"""
+        product = self.products.intern(product_name)
+        if product == len(self.product_category):
+            category = PRODUCTS.get(product_name) or category_for(product_name)
+            self.product_category.append(CATEGORIES.index(category))
+        return product
+
+    def add_listing(self, farmer_id: str, product_name: str, quantity: int, asking_price: int,
+                    timestamp: Optional[float] = None) -> int:
+        """Create an active listing for a farmer; returns the listing row"""
+        now = timestamp if timestamp is not None else time.time()
+        with self._lock:
+            farmer = self.user_keys.ids[farmer_id]
+            village = self.user_village[farmer]
+            row = len(self.listing_status)
+            self.listing_farmer.append(farmer)
+            self.listing_product.append(self.product_id(product_name))
+            self.listing_village.append(village)
+            self.listing_quantity.append(quantity)
+            self.listing_price.append(asking_price)
+            self.listing_status.append(LISTING_ACTIVE)
+            self.listing_created_at.append(now)
+            self.active_by_hub.add(self.village_hub[village], row)
+            self.active_by_farmer.add(farmer, row)
+            self.active_all.add(0, row)
+
+        self.emit({"type": "listing_created", "ts": now, "user_id": farmer_id, "listing": row,
+                   "product": product_name, "village": self.villages.keys[village],
+                   "quantity": quantity, "price": asking_price})
+        return row
+
+    def active_listing_count(self, farmer_id: Optional[str] = None) -> int:
+        if farmer_id is None:
+            return self.active_all.count(0)
+        farmer = self.user_keys.lookup(farmer_id)
+        return self.active_by_farmer.count(farmer) if farmer is not None else 0
+
+    def random_active_listing(self, farmer_id: Optional[str] = None, hub_id: Optional[str] = None,
+                              rng=random) -> Optional[int]:
+        """Random active listing of one farmer, at one hub, or anywhere"""
+        with self._lock:
+            if farmer_id is not None:
+                farmer = self.user_keys.lookup(farmer_id)
+                return self.active_by_farmer.random(farmer, rng) if farmer is not None else None
+            if hub_id is not None:
+                hub = self.hubs.lookup(hub_id)
+                return self.active_by_hub.random(hub, rng) if hub is not None else None
+            return self.active_all.random(0, rng)
+
+    def listing(self, row: int) -> Dict[str, Any]:
+        product = self.listing_product[row]
+        return {
+            "listing_id": f"LST_{row}",
+            "farmer_id": self.user_keys.keys[self.listing_farmer[row]],
+            "product_name": self.products.keys[product],
+            "category": CATEGORIES[self.product_category[product]],
+            "village_name": self.villages.keys[self.listing_village[row]],
+            "hub_id": self.hubs.keys[self.village_hub[self.listing_village[row]]],
+            "quantity": self.listing_quantity[row],
+            "asking_price": self.listing_price[row],
+            "status": "active" if self.listing_status[row] == LISTING_ACTIVE else "sold",
+        }
+
+    # ---- purchases ----
+
+    def purchase(self, buyer_id: str, listing_row: int, quantity: Optional[int] = None,
+                 price: Optional[int] = None, timestamp: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Buy from a listing: creates the order and updates every affected total"""
+        now = timestamp if timestamp is not None else time.time()
+        with self._lock:
+            if self.listing_status[listing_row] != LISTING_ACTIVE:
+                return None
+            buyer = self.user_keys.ids[buyer_id]
+            farmer = self.listing_farmer[listing_row]
+            village = self.listing_village[listing_row]
+            hub = self.village_hub[village]
+
+            available = self.listing_quantity[listing_row]
+            quantity = min(quantity or available, available)
+            price = price or self.listing_price[listing_row]
+            amount = quantity * price
+
+            self.listing_quantity[listing_row] = available - quantity
+            if self.listing_quantity[listing_row] == 0:
+                self.listing_status[listing_row] = LISTING_SOLD
+                self.active_by_hub.remove(hub, listing_row)
+                self.active_by_farmer.remove(farmer, listing_row)
+                self.active_all.remove(0, listing_row)
+
+            self.user_spent[buyer] += amount
+            self.user_earnings[farmer] += amount
+            shg = self.user_shg[farmer]
+            if shg >= 0:
+                self.shg_earnings[shg] = self.shg_earnings.get(shg, 0) + amount
+
+            category_index = self.product_category[self.listing_product[listing_row]]
+            category = CATEGORIES[category_index]
+            spent = self.user_category_spent.get(buyer)
+            if spent is None:
+                spent = self.user_category_spent[buyer] = [0] * len(CATEGORIES)
+            spent[category_index] += amount
+            fee = int(amount * PLATFORM_FEE)
+            self.total_transactions += 1
+            self.platform_revenue += fee
+            self.revenue_by_category[category] += amount
+
+            farmer_id = self.user_keys.keys[farmer]
+            hub_id = self.hubs.keys[hub]
+            order_row = self.orders.create(buyer_id, farmer_id, hub_id, amount, now)
+            order = {
+                "order_id": self.orders.order_id(order_row),
+                "buyer_id": buyer_id,
+                "farmer_id": farmer_id,
+                "hub_id": hub_id,
+                "village": self.villages.keys[village],
+                "product_name": self.products.keys[self.listing_product[listing_row]],
+                "category": category,
+                "quantity": quantity,
+                "agreed_price": price,
+                "amount": amount,
+                "platform_fee": fee,
+                "status": "confirmed",
+            }
+
+        self.emit(dict(order, type="purchase", ts=now))
+        return order
+
+    # ---- seeding ----
+
+    def populate(self, users: int = 1000, listings_per_farmer: float = 2.0, history_days: int = 0, rng=random,
+                 price_model=None):
+        """Seed a consistent population: role mix, SHG memberships and active listings
+
+        With history_days, registration and listing times are spread uniformly
+        over that many past days so time-bucketed charts start with history.
+        With a price_model, asking prices follow the mandi price on the day of
+        each listing in the farmer's market.
+        """
+        now = time.time()
+        roles = rng.choices(list(ROLE_WEIGHTS), weights=list(ROLE_WEIGHTS.values()), k=users)
+        products = list(PRODUCTS)
+
+        for i, role in enumerate(roles):
+            user_id = f"{role}_{i + 1000:06d}"
+            registered = now - rng.random() * history_days * 86400
+            self.add_user(user_id, role, timestamp=registered)
+            if role == "farmer":
+                village = self.user_village_name(user_id)
+                if rng.random() < 0.4:
+                    self.join_shg(user_id, f"shg_{village.lower()}")
+                market = price_model.market_for(village, self.geography) if price_model is not None else 0
+                for _ in range(int(listings_per_farmer + rng.random())):
+                    product = rng.choice(products)
+                    listed = registered + rng.random() * (now - registered)
+                    if price_model is not None:
+                        price = price_model.quote(product, market, listed, rng)
+                    else:
+                        price = rng.randint(15, 120)
+                    self.add_listing(user_id, product, rng.randint(20, 500), price, timestamp=listed)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "users": self.user_count(),
+            "activeListings": self.active_listing_count(),
+            "ordersInFlight": len(self.orders),
+            "totalTransactions": self.total_transactions,
+            "platformRevenue": self.platform_revenue,
+        }
+
+def main():
+    """Populate a large world and report memory use"""
+    import argparse
+    import tracemalloc
+
+    parser = argparse.ArgumentParser(description='Shared World Model capacity check')
+    parser.add_argument('--users', type=int, default=1_000_000,
+                       help='Users to create')
+    parser.add_argument('--purchases', type=int, default=500_000,
+                       help='Purchases to run through the world')
+
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    world = WorldModel()
+    started = time.perf_counter()
+    world.populate(args.users)
+    print(f"🌍 Populated {args.users:,} users in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    for _ in range(args.purchases):
+        listing = world.random_active_listing()
+        if listing is None:
+            break
+        world.purchase(world.random_user("buyer"), listing, quantity=random.randint(5, 50))
+    print(f"🛒 Ran {args.purchases:,} purchases in {time.perf_counter() - started:.1f}s")
+
+    current, peak = tracemalloc.get_traced_memory()
+    print(f"📊 {world.stats()}")
+    print(f"💾 Memory: {current / 2**20:.0f} MiB current, {peak / 2**20:.0f} MiB peak")
+
+if __name__ == "__main__":
+    main()